@@ -1,15 +1,37 @@
 # app.py
 """시리얼 모니터 애플리케이션"""
 
+import signal
 import threading
 import time
+from dataclasses import replace
+from datetime import datetime
 from typing import Dict
-from queue import Queue
-from flask import Flask, jsonify, request
+import numpy as np
+import serial
+from flask import Flask, Response, jsonify, request
 
 from database import DatabaseHandler
+from history import HistoryStore
+from hub import EventHub, sse_frame
+from downsample import METHODS as DOWNSAMPLE_METHODS, downsample
+from recording import RecordingFilter
+from retention import PartitionManager
+from archive import LogArchiver
 from monitor import SerialMonitor
+from discovery import DeviceIdentifier, PortWatcher
+from workers import IngestWorkerPool
+from models import LinkConfig
 from queue_processor import CMORequest, QueueProcessor
+from lanes import CommandLanes, LaneFull
+from rules import RuleEngine
+from climate import ClimateController
+from cluster import FORWARDED_HEADER, ClusterNode, KeepAliveRequestHandler
+from journal import CommandJournal, TERMINAL_STATUSES
+from config import diff_ports, load_config
+
+# /api/history 응답 최대 점 개수 (화면 폭보다 충분히 큼)
+MAX_HISTORY_POINTS = 5000
 
 
 class SystemState:
@@ -21,7 +43,7 @@ class SystemState:
         self.metric_name = ''
         self.value = ''
         self.lock = threading.Lock()
-
+    
     def update(self, device_id:str, data_type: str, metric_name: str, value: str):
         """상태 업데이트 """
         with self.lock:
@@ -29,7 +51,7 @@ class SystemState:
             self.data_type = data_type
             self.metric_name = metric_name
             self.value = value
-
+    
     def to_dict(self):
         """딕셔너리로 반환 """
         with self.lock:
@@ -44,17 +66,66 @@ class SystemState:
 class SerialMonitorApp:
     """시리얼 모니터 애플리케이션"""
     
-    def __init__(self, db_config: dict, port_config: dict):
+    def __init__(self, db_config: dict, port_config: dict, history_config: dict = None,
+                 recording_policies: dict = None, retention_config: dict = None,
+                 worker_processes: int = 0, discovery_config: dict = None,
+                 queue_config: dict = None, rules_path: str = None,
+                 climate_config: dict = None, cluster_config: dict = None,
+                 journal_config: dict = None, config_path: str = None):
+        self.db_config = db_config
         self.db_handler = DatabaseHandler(**db_config)
+        self.config_path = config_path  # 다시 읽을 설정 파일 (None이면 reload 불가)
+        # monitors / available_devices 변경 (attach, detach, reload, 핫플러그 감지)은 이 락 안에서만
+        self.monitors_lock = threading.RLock()
         self.port_config = port_config
-        self.cmd_queue = Queue()
+        # device_id -> 링크 설정 (port_config 값은 경로 문자열 또는 LinkConfig 필드 dict)
+        self.links = {device_id: LinkConfig.from_config(value) for device_id, value in port_config.items()}
+        self.worker_processes = worker_processes  # 0이면 포트별 스레드, 1 이상이면 작업 프로세스
+        self.worker_pool = None
+        self.discovery_config = discovery_config  # None이면 port_config만 사용 (핫플러그 감지 없음)
+        self.port_watcher = None
+        self.available_devices = list(port_config.keys())  # 모든 모니터가 같은 리스트를 공유
+        self.cmd_queue = CommandLanes(**(queue_config or {}))  # 장치별 제한 크기 큐
+        # 명령 저널 (None이면 재시작 시 처리 중이던 명령이 사라지고 멱등 키를 무시)
+        self.journal = CommandJournal(**journal_config) if journal_config else None
+        
+        # CMD 라우팅 / 자동화 규칙 (rules_path가 없으면 기본 라우팅만)
+        self.rules = RuleEngine.load(rules_path) if rules_path else RuleEngine()
+        self.remote_devices = []  # 다른 게이트웨이가 소유한 장치 (클러스터)
+        self.rules.update_devices(self.available_devices)
+        
+        # 실내 환경 제어 (None이면 비활성 - 대시보드/펌웨어 자동 제어만)
+        self.climate = ClimateController(**climate_config) if climate_config else None
+        
         self.monitors: Dict[str, SerialMonitor] = {}
         self.threads = []
         self.queue_processor = None
+        self.retention_config = retention_config
+        self.partition_manager = None
         
         # 시스템 상태
         self.system_state = SystemState()
         
+        # 대시보드 푸시 (모든 구독자가 한 번 직렬화한 이벤트를 공유)
+        self.event_hub = EventHub()
+        
+        # 다중 게이트웨이 클러스터 (None이면 단독 실행)
+        # cluster_hub = 로컬 이벤트 + 다른 노드 이벤트 (클라이언트용 /api/events)
+        self.cluster = ClusterNode(**cluster_config) if cluster_config else None
+        self.cluster_hub = None
+        self.peer_states = {}  # node_id -> 그 노드의 마지막 state 이벤트
+        if self.cluster:
+            self.cluster_hub = EventHub()
+            self.event_hub.mirrors.append(self.cluster_hub)
+            self.cluster.on_event = self._on_peer_event
+            self.cluster.on_directory = self._on_cluster_directory
+        
+        # 최근 이력 (DB 조회 없이 메모리에서 구간 조회)
+        self.history_store = HistoryStore(**(history_config or {}))
+        
+        # DB 기록 정책 (None이면 recording.DEFAULT_POLICIES)
+        self.recording_filter = RecordingFilter(recording_policies)
+        
         # Flask 앱 생성
         self.flask_app = Flask(__name__)
         self._setup_routes()
@@ -67,6 +138,26 @@ class SerialMonitorApp:
             """현재 시스템 상태 조회"""
             return jsonify(self.system_state.to_dict())
         
+        @self.flask_app.route('/api/events', methods=['GET'])
+        def events():
+            """이벤트 스트림 (SSE)
+            
+            event: state   - 수신 데이터 (/api/state와 같은 필드 + ts)
+            event: command - 명령 처리 결과 (/api/command/<request_id>와 같은 필드)
+            연결 직후 현재 상태를 state 이벤트로 한 번 보냄
+            클러스터면 다른 노드 이벤트도 포함 (node 필드), scope=local이면 이 노드 이벤트만
+            """
+            hub = self.event_hub
+            if self.cluster_hub and request.args.get('scope') != 'local':
+                hub = self.cluster_hub
+            subscriber = hub.subscribe()
+            initial = sse_frame('state', self.system_state.to_dict())
+            return Response(
+                hub.stream(subscriber, initial),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        
         @self.flask_app.route('/api/command', methods=['POST'])
         def send_command():
             """명령 전송
@@ -75,14 +166,23 @@ class SerialMonitorApp:
             {
                 "device_id": "ele_001",  # 대상 디바이스
                 "metric_name": "FLOOR",  # 명령 종류
-                "value": "1"             # 값
+                "value": "1",            # 값
+                "timeout": 30,           # ACK 대기 시간 (초, 선택) - 큐에서 이보다 오래 기다리면 전송하지 않음
+                "idempotency_key": "..." # 선택 (Idempotency-Key 헤더도 가능)
             }
+            
+            응답의 request_id로 /api/command/<request_id>에서 처리 결과 조회
+            장치 큐가 가득 차면 429 + Retry-After
+            같은 멱등 키로 다시 보내면 새로 큐에 넣지 않고 처음 요청의 request_id/상태를 돌려줌 (duplicate)
+            클러스터면 다른 노드가 소유한 장치 요청은 그 노드로 전달 (응답에 node 필드)
             """
             try:
                 data = request.json
                 device_id = data.get('device_id')
                 metric_name = data.get('metric_name')
                 value = data.get('value')
+                timeout = data.get('timeout')
+                key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
                 
                 if not all([device_id, metric_name, value]):
                     return jsonify({
@@ -91,6 +191,12 @@ class SerialMonitorApp:
                     }), 400
                 
                 if device_id not in self.monitors:
+                    if self.cluster and not request.headers.get(FORWARDED_HEADER):
+                        payload = {**data, 'idempotency_key': key} if key else data
+                        forwarded = self.cluster.forward_command(device_id, payload)
+                        if forwarded is not None:
+                            body, status, headers = forwarded
+                            return jsonify(body), status, headers
                     return jsonify({
                         'success': False,
                         'error': f'Device "{device_id}" not found'
@@ -98,21 +204,58 @@ class SerialMonitorApp:
                 
                 # CMO 명령 생성
                 command = f"CMO,{metric_name},{value}"
-
+                
                 cmo = CMORequest(
                     device_id=device_id,
                     metric_name=metric_name,
                     value=value,
                     command=command
                 )
-                self.cmd_queue.put(cmo)
+                if timeout is not None:
+                    cmo.timeout = float(timeout)
+                
+                # 재시도 중복 확인 (키 → request_id 조회 한 번)
+                if key and self.journal:
+                    existing = self.journal.claim(key, cmo.request_id)
+                    if existing is not None:
+                        result = ((self.queue_processor and self.queue_processor.get_result(existing))
+                                  or self.journal.get(existing) or {})
+                        print(f"[QUEUE] 중복 요청 무시: {device_id} (키: {key})")
+                        return jsonify({
+                            'success': True,
+                            'duplicate': True,
+                            'device_id': result.get('device_id', device_id),
+                            'command': f"CMO,{result.get('metric_name', metric_name)},{result.get('value', value)}",
+                            'request_id': existing,
+                            'status': result.get('status')
+                        })
+                
+                if self.queue_processor:
+                    self.queue_processor.track(cmo)
+                try:
+                    self.cmd_queue.put(cmo)
+                except LaneFull as e:
+                    if self.queue_processor:
+                        self.queue_processor.discard(cmo, 'rejected')
+                    if key and self.journal:
+                        self.journal.release(key)
+                    response = jsonify({
+                        'success': False,
+                        'error': str(e),
+                        'device_id': device_id,
+                        'request_id': cmo.request_id,
+                        'queue_depth': e.depth,
+                        'retry_after': e.retry_after
+                    })
+                    return response, 429, {'Retry-After': str(e.retry_after)}
                 
                 print(f"[QUEUE] CMO 큐에 추가: {device_id} (명령: {command})")
                 
                 return jsonify({
                     'success': True,
                     'device_id': device_id,
-                    'command': command
+                    'command': command,
+                    'request_id': cmo.request_id
                 })
             
             except Exception as e:
@@ -121,14 +264,248 @@ class SerialMonitorApp:
                     'error': str(e)
                 }), 500
         
+        @self.flask_app.route('/api/command/<request_id>', methods=['GET'])
+        def command_status(request_id):
+            """명령 처리 결과 조회 (queued/sent/acked/timeout/failed/superseded/...)
+            
+            terminal - 더 바뀌지 않는 상태인지 (journal.TERMINAL_STATUSES, 클라이언트는 이 값으로 대기 종료)
+            """
+            result = self.queue_processor.get_result(request_id) if self.queue_processor else None
+            if result is None and self.journal:
+                result = self.journal.get(request_id)  # 재시작 전 요청
+            if result is None and self.cluster and not request.headers.get(FORWARDED_HEADER):
+                forwarded = self.cluster.forward_status(request_id)
+                if forwarded is not None:
+                    body, status = forwarded
+                    return jsonify(body), status
+            if result is None:
+                return jsonify({
+                    'success': False,
+                    'error': f'Request "{request_id}" not found'
+                }), 404
+            
+            return jsonify({'success': True, **result, 'terminal': result['status'] in TERMINAL_STATUSES})
+        
+        @self.flask_app.route('/api/history', methods=['GET'])
+        def get_history():
+            """이력 조회 (메모리 링 버퍼, 버퍼보다 오래된 구간은 DB)
+            
+            쿼리: device_id, metric_name, start, end (epoch 초, 선택)
+                  points (최대 점 개수, 선택 - 지정하면 구간 길이와 무관하게 points개 이하)
+                  method (lttb | minmax, 기본 lttb)
+            """
+            device_id = request.args.get('device_id')
+            metric_name = request.args.get('metric_name')
+            if not device_id or not metric_name:
+                return jsonify({
+                    'success': False,
+                    'error': 'Missing parameters: device_id, metric_name'
+                }), 400
+            
+            method = request.args.get('method', 'lttb')
+            if method not in DOWNSAMPLE_METHODS:
+                return jsonify({
+                    'success': False,
+                    'error': f'Unknown method: {method}'
+                }), 400
+            
+            try:
+                start = request.args.get('start', type=float)
+                end = request.args.get('end', type=float)
+                points = request.args.get('points', type=int)
+                timestamps, values, source = self._query_history(device_id, metric_name, start, end)
+                total = len(timestamps)
+                if points:
+                    timestamps, values = downsample(timestamps, values,
+                                                    min(points, MAX_HISTORY_POINTS), method)
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 500
+            
+            return jsonify({
+                'success': True,
+                'device_id': device_id,
+                'metric_name': metric_name,
+                'source': source,
+                'total': total,
+                'timestamps': timestamps.tolist(),
+                'values': values.tolist()
+            })
+        
         @self.flask_app.route('/api/health', methods=['GET'])
         def health_check():
             """헬스 체크"""
             return jsonify({
                 'status': 'ok',
                 'devices': len(self.monitors),
-                'queue_size': self.cmd_queue.qsize()
+                'queue_size': self.cmd_queue.qsize(),
+                'queue': self.cmd_queue.stats(),
+                'recording': self.recording_filter.totals(),
+                'events': self.event_hub.stats(),
+                'workers': self.worker_pool.stats() if self.worker_pool else None,
+                'cluster': self.cluster.stats() if self.cluster else None,
+                'journal': self.journal.stats() if self.journal else None,
+                'ports': {device_id: monitor.health()
+                          for device_id, monitor in list(self.monitors.items())}
             })
+        
+        @self.flask_app.route('/api/cluster', methods=['GET'])
+        def cluster_state():
+            """클러스터 노드/장치 소유 관계와 다른 노드별 마지막 상태"""
+            if not self.cluster:
+                return jsonify({'enabled': False})
+            return jsonify({
+                'enabled': True,
+                **self.cluster.stats(),
+                'local_devices': list(self.monitors),
+                'remote_devices': list(self.remote_devices),
+                'peer_states': dict(self.peer_states),
+            })
+        
+        @self.flask_app.route('/api/rules', methods=['GET'])
+        def rules_stats():
+            """라우팅 테이블과 규칙별 카운터 (matched/fired/suppressed/unroutable/errors)"""
+            return jsonify(self.rules.stats())
+        
+        @self.flask_app.route('/api/climate', methods=['GET'])
+        def climate_stats():
+            """환경 제어 루프별 상태 (on/off/unknown, 수동 여부, 전환 수)"""
+            if not self.climate:
+                return jsonify({'enabled': False})
+            return jsonify({'enabled': True, **self.climate.stats()})
+        
+        @self.flask_app.route('/api/admin/reload', methods=['POST'])
+        def reload_config():
+            """설정 파일 다시 읽기 - 바뀐 포트만 다시 연결, db가 바뀌면 연결 교체"""
+            result = self.reload_config()
+            return jsonify(result), 200 if result['success'] else 400
+        
+        @self.flask_app.route('/api/recording', methods=['GET'])
+        def recording_stats():
+            """메트릭별 DB 기록/억제 카운터"""
+            return jsonify(self.recording_filter.stats())
+    
+    def reload_config(self) -> dict:
+        """config_path를 다시 읽어 바뀐 부분만 반영 (나머지 모니터, 큐, 상태는 그대로)
+        
+        파일을 읽거나 검증하다 실패하면 아무것도 바꾸지 않는다.
+        """
+        if not self.config_path:
+            return {'success': False, 'error': 'No config file'}
+        
+        with self.monitors_lock:
+            try:
+                config = load_config(self.config_path)
+            except (OSError, ValueError) as e:
+                print(f"[RELOAD] 설정 파일 오류 - 기존 설정 유지: {e}")
+                return {'success': False, 'error': str(e)}
+            
+            ports = self._reload_ports(config['ports'])
+            db = self._reload_db(config['db'])
+            print(f"[RELOAD] 추가 {ports['added']}, 제거 {ports['removed']}, "
+                  f"변경 {ports['changed']}, 실패 {ports['failed']}, DB {db}")
+            return {'success': db != 'failed' and 'error' not in ports, **ports, 'db': db}
+    
+    def _reload_ports(self, port_config: dict) -> dict:
+        """port_config 비교 → 추가/제거/링크가 바뀐 장치의 모니터만 붙이거나 뗌"""
+        links = {device_id: LinkConfig.from_config(value) for device_id, value in port_config.items()}
+        added, removed, changed = diff_ports(self.links, links)
+        result = {'added': added, 'removed': removed, 'changed': changed, 'failed': []}
+        if self.worker_pool and (added or removed or changed):
+            result['error'] = 'Port changes need a restart in worker mode'
+            return result
+        
+        self.port_config = port_config
+        self.links = links
+        
+        for device_id in removed:
+            self.detach_monitor(device_id)
+            if device_id in self.available_devices:
+                self.available_devices.remove(device_id)
+                self._update_routing()
+        
+        for device_id in changed:
+            self.detach_monitor(device_id)
+        
+        for device_id in changed + added:
+            if not self.attach_monitor(device_id, links[device_id].port):
+                result['failed'].append(device_id)  # 핫플러그 감지가 켜져 있으면 나중에 다시 연결
+                if device_id not in self.available_devices:
+                    self.available_devices.append(device_id)
+                    self._update_routing()
+        return result
+    
+    def _reload_db(self, db_config: dict) -> str:
+        """DB 설정이 바뀌면 새 연결을 먼저 열고 교체 (실패하면 기존 연결 유지)"""
+        if db_config == self.db_config:
+            return 'unchanged'
+        
+        handler = DatabaseHandler(**db_config)
+        if not handler.connect():
+            return 'failed'
+        
+        old = self.db_handler
+        self.db_handler = handler
+        self.db_config = db_config
+        for monitor in list(self.monitors.values()):
+            monitor.db_handler = handler
+        if self.partition_manager:
+            self.partition_manager.db_handler = handler
+            if self.partition_manager.archiver:
+                self.partition_manager.archiver.db_config = handler.config
+        
+        # 기존 연결로 진행 중인 쓰기가 끝난 뒤 닫고, 옛 핸들러로 들어오는 쓰기는 새 핸들러로 넘김
+        old.retire(handler)
+        return 'swapped'
+    
+    def _on_sighup(self, signum, frame):
+        """SIGHUP → 설정 다시 읽기 (포트 연결/DB 연결이 오래 걸릴 수 있어 별도 스레드)"""
+        threading.Thread(target=self.reload_config, daemon=True, name="ConfigReload").start()
+    
+    def _on_peer_event(self, node_id: str, event: str, data: dict):
+        """다른 노드 이벤트 → 클러스터 허브 (state는 /api/state에도 반영)"""
+        if event == 'state' and data.get('device_id'):
+            self.peer_states[node_id] = data
+            self.system_state.update(data['device_id'], data.get('data_type', ''),
+                                     data.get('metric_name', ''), data.get('value', ''))
+        self.cluster_hub.publish(event, {**data, 'node': node_id})
+    
+    def _on_cluster_directory(self, remote_devices: list):
+        """디렉터리 갱신 - 원격 장치도 CMD 라우팅/규칙 대상에 포함"""
+        if set(remote_devices) != set(self.remote_devices):
+            self.remote_devices = remote_devices
+            self._update_routing()
+    
+    def _update_routing(self):
+        """라우팅 테이블 갱신 (로컬 장치 우선, 그다음 다른 노드 장치)"""
+        remote = [device_id for device_id in self.remote_devices if device_id not in self.available_devices]
+        self.rules.update_devices(self.available_devices + remote)
+    
+    def _query_history(self, device_id: str, metric_name: str, start: float = None,
+                       end: float = None):
+        """(timestamps, values, source) - 메모리 버퍼가 start까지 덮지 못하면 DB에서 조회
+        
+        버퍼가 없는 메트릭을 start 없이 조회하면 DB에서 end 이전 history 보관 기간만큼 조회
+        """
+        oldest = self.history_store.oldest(device_id, metric_name)
+        in_memory = oldest is not None and (start is None or start >= oldest[0])
+        if in_memory or not self.db_handler.conn:
+            timestamps, values = self.history_store.query(device_id, metric_name, start, end)
+            return np.frombuffer(timestamps), np.frombuffer(values), 'memory'
+        
+        end_time = datetime.fromtimestamp(end) if end is not None else datetime.now()
+        if start is None:
+            start = end_time.timestamp() - self.history_store.retention_sec
+        rows = self.db_handler.query_range(
+            device_id, metric_name,
+            datetime.fromtimestamp(start),
+            end_time
+        )
+        rows = [(ts.timestamp(), value) for ts, value, _ in rows if value is not None]
+        data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        return data[:, 0], data[:, 1], 'db'
     
     def start(self) -> bool:
         """애플리케이션 시작"""
@@ -142,7 +519,7 @@ class SerialMonitorApp:
         
         # 포트 연결
         self._setup_monitors()
-        if not self.monitors:
+        if not self.monitors and not self.discovery_config:
             print("[✗] 연결된 포트가 없습니다")
             self.db_handler.close()
             return False
@@ -153,6 +530,18 @@ class SerialMonitorApp:
         # 큐 처리 스레드 시작
         self._start_queue_processor()
         
+        # 포트 핫플러그 감지 스레드 시작
+        if self.discovery_config and not self.worker_pool:
+            self._start_port_watcher()
+        
+        # 클러스터 하트비트 스레드 시작
+        if self.cluster:
+            self._start_cluster()
+        
+        # 파티션/보관 기간 관리 스레드 시작
+        if self.retention_config:
+            self._start_partition_manager()
+        
         # Flask API 서버 시작
         self._start_flask_server()
         
@@ -161,16 +550,102 @@ class SerialMonitorApp:
         return True
     
     def _setup_monitors(self):
-        """모니터 설정"""
-        for device_id, port in self.port_config.items():
-            monitor = SerialMonitor(device_id, port, self.cmd_queue, self.db_handler)
-            monitor.available_devices = list(self.port_config.keys())
-            monitor.system_state = self.system_state  # 상태 관리 객체 할당
+        """모니터 설정 (worker_processes가 있으면 포트는 작업 프로세스가 열고 여기는 RemoteMonitor)"""
+        if self.worker_processes:
+            self.worker_pool = IngestWorkerPool(self.links, self.worker_processes)
+            monitors = self.worker_pool.create_monitors(self.cmd_queue, self.db_handler)
+        else:
+            monitors = {device_id: SerialMonitor(device_id, link.port, self.cmd_queue, self.db_handler,
+                                                 link=link)
+                        for device_id, link in self.links.items()}
+        
+        for device_id, monitor in monitors.items():
+            self._wire_monitor(monitor)
             if monitor.connect():
                 self.monitors[device_id] = monitor
     
+    def _wire_monitor(self, monitor: SerialMonitor):
+        """모니터에 공유 객체 할당"""
+        monitor.available_devices = self.available_devices
+        monitor.system_state = self.system_state  # 상태 관리 객체 할당
+        monitor.history_store = self.history_store
+        monitor.recording_filter = self.recording_filter
+        monitor.event_hub = self.event_hub
+        monitor.rules = self.rules
+        monitor.climate = self.climate
+        monitor.queue_processor = self.queue_processor
+    
+    def attach_monitor(self, device_id: str, port: str, ser=None) -> bool:
+        """실행 중 모니터 추가 (ser: 식별에 사용한 열린 포트, 없으면 새로 연결)
+        
+        이미 같은 device_id의 모니터가 있으면 추가하지 않는다 (바꾸려면 먼저 detach_monitor).
+        """
+        if self.worker_pool:
+            print(f"[✗] 작업 프로세스 모드에서는 {device_id}를 실행 중에 추가할 수 없음")
+            return False
+        
+        with self.monitors_lock:
+            if device_id in self.monitors:
+                print(f"[✗] {device_id} 모니터가 이미 있음 ({self.monitors[device_id].port})")
+                if ser is not None:
+                    ser.close()
+                return False
+            # 설정된 장치면 그 링크 설정을 새 경로로 사용
+            link = replace(self.links[device_id], port=port) if device_id in self.links else LinkConfig(port)
+        
+        # 포트 설정 / 속도 협상(재시도 포함 수 초)은 락 밖에서 - reload와 명령 경로를 막지 않도록
+        monitor = SerialMonitor(device_id, port, self.cmd_queue, self.db_handler, link=link)
+        self._wire_monitor(monitor)
+        connected = monitor.adopt(ser) if ser is not None else monitor.connect()
+        if not connected:
+            return False
+        
+        with self.monitors_lock:
+            if device_id in self.monitors:  # 협상하는 동안 다른 스레드가 먼저 붙임
+                print(f"[✗] {device_id} 모니터가 이미 있음 ({self.monitors[device_id].port})")
+                monitor.close()
+                return False
+            self.monitors[device_id] = monitor
+            if device_id not in self.available_devices:
+                self.available_devices.append(device_id)
+                self._update_routing()
+            
+            thread = threading.Thread(
+                target=monitor.run,
+                daemon=True,
+                name=f"Monitor-{device_id}"
+            )
+            thread.start()
+            self.threads.append(thread)
+        print(f"[✓] {device_id} 모니터 추가 ({port})")
+        return True
+    
+    def detach_monitor(self, device_id: str) -> bool:
+        """실행 중 모니터 제거 (포트가 사라진 경우)"""
+        with self.monitors_lock:
+            monitor = self.monitors.pop(device_id, None)
+            if monitor is None:
+                return False
+            
+            try:
+                monitor.close()
+            except (OSError, serial.SerialException) as e:
+                print(f"[WARNING] {device_id} 닫기 오류: {e}")
+            
+            if device_id not in self.port_config and device_id in self.available_devices:
+                self.available_devices.remove(device_id)
+                self._update_routing()
+            self.threads = [t for t in self.threads if t.is_alive()]
+        print(f"[○] {device_id} 모니터 제거")
+        return True
+    
     def _start_monitor_threads(self):
         """모니터 스레드 시작"""
+        if self.worker_pool:
+            self.worker_pool.start()
+            self.threads.extend(self.worker_pool.threads)
+            return
+        
         for device_id, monitor in self.monitors.items():
             thread = threading.Thread(
                 target=monitor.run,
@@ -183,6 +658,13 @@ class SerialMonitorApp:
     def _start_queue_processor(self):
         """큐 처리 스레드 시작"""
         self.queue_processor = QueueProcessor(self.cmd_queue, self.monitors)
+        self.queue_processor.event_hub = self.event_hub
+        self.cmd_queue.on_drop = self.queue_processor.discard
+        if self.cluster:
+            self.queue_processor.forwarder = self.cluster.forward_cmo
+            self.queue_processor.forward_owner = lambda device_id: (self.cluster.owner(device_id) or (None,))[0]
+        if self.journal:
+            self._recover_commands()
         
         for monitor in self.monitors.values():
             monitor.queue_processor = self.queue_processor
@@ -195,6 +677,61 @@ class SerialMonitorApp:
         thread.start()
         self.threads.append(thread)
     
+    def _recover_commands(self):
+        """저널의 미완료 명령 복구 - timeout이 남았으면 다시 큐에, 지났으면 expired"""
+        resend, expired = self.journal.recover()
+        self.queue_processor.journal = self.journal
+        for cmo in expired:
+            self.queue_processor.discard(cmo, 'expired')
+        for cmo in resend:
+            self.queue_processor.track(cmo)
+            try:
+                self.cmd_queue.put(cmo)
+                print(f"[QUEUE] 복구된 CMO 재전송 대기: {cmo.device_id} (명령: {cmo.command})")
+            except LaneFull:
+                self.queue_processor.discard(cmo, 'rejected')
+    
+    def _start_port_watcher(self):
+        """포트 핫플러그 감지 스레드 시작"""
+        config = dict(self.discovery_config)
+        identifier = DeviceIdentifier(**config.pop('identifier', {}))
+        self.port_watcher = PortWatcher(self, identifier, **config)
+        
+        thread = threading.Thread(
+            target=self.port_watcher.run,
+            daemon=True,
+            name="PortWatcher"
+        )
+        thread.start()
+        self.threads.append(thread)
+    
+    def _start_cluster(self):
+        """클러스터 하트비트 스레드 시작 (연결된 로컬 장치를 소유 장치로 등록)"""
+        thread = threading.Thread(
+            target=self.cluster.run,
+            args=(lambda: list(self.monitors),),
+            daemon=True,
+            name="ClusterNode"
+        )
+        thread.start()
+        self.threads.append(thread)
+    
+    def _start_partition_manager(self):
+        """파티션 관리 스레드 시작"""
+        config = dict(self.retention_config)
+        archive_dir = config.pop('archive_dir', None)
+        if archive_dir:
+            config['archiver'] = LogArchiver(self.db_handler.config, archive_dir)
+        self.partition_manager = PartitionManager(self.db_handler, **config)
+        
+        thread = threading.Thread(
+            target=self.partition_manager.run,
+            daemon=True,
+            name="PartitionManager"
+        )
+        thread.start()
+        self.threads.append(thread)
+    
     def _start_flask_server(self):
         """Flask API 서버 시작"""
         flask_thread = threading.Thread(
@@ -208,7 +745,8 @@ class SerialMonitorApp:
     
     def _run_flask(self):
         """Flask 서버 실행"""
-        self.flask_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+        options = {'request_handler': KeepAliveRequestHandler} if self.cluster else {}
+        self.flask_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False, **options)
     
     def stop(self):
         """애플리케이션 종료"""
@@ -219,11 +757,26 @@ class SerialMonitorApp:
         if self.queue_processor:
             self.queue_processor.stop()
         
-        for monitor in self.monitors.values():
+        if self.partition_manager:
+            self.partition_manager.stop()
+        
+        if self.port_watcher:
+            self.port_watcher.stop()
+        
+        if self.cluster:
+            self.cluster.stop()
+        
+        for monitor in list(self.monitors.values()):
             monitor.close()
         
+        if self.worker_pool:
+            self.worker_pool.stop()
+        
         self.db_handler.close()
         
+        if self.journal:
+            self.journal.close()
+        
         for thread in self.threads:
             thread.join(timeout=1)
         
@@ -234,6 +787,10 @@ class SerialMonitorApp:
         if not self.start():
             return
         
+        if self.config_path and hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self._on_sighup)
+            print(f"[✓] SIGHUP으로 설정 다시 읽기 ({self.config_path})")
+        
         try:
             while True:
                 time.sleep(1)
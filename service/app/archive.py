@@ -0,0 +1,355 @@
+# archive.py
+"""로그 아카이브 - 서버 측 커서로 스트리밍하여 일/장치별 압축 컬럼 파일로 저장
+
+저장 구조:
+    <root>/date=YYYY-MM-DD/device_id=<id>/part-<시작>-<끝>-<n>.parquet   (pyarrow 설치 시)
+    <root>/date=YYYY-MM-DD/device_id=<id>/part-<시작>-<끝>-<n>.npz       (없으면 NumPy 압축)
+
+<시작>-<끝>은 그 날짜로 자른 내보내기 구간(YYYYMMDDTHHMMSS)이다. 같은 구간을 다시
+내보내면 그 구간 안의 기존 파일을 지우고 새로 쓰므로 재시도해도 행이 중복되지 않는다.
+
+사용법:
+    python archive.py export --start 2026-10-01 --end 2026-10-19 --out ./archive
+    python archive.py read --root ./archive --device dht_001 --metric TEM
+"""
+
+import argparse
+import glob
+import os
+import re
+from datetime import datetime, date, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pymysql
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 없으면 .npz로 저장
+    pa = None
+    pq = None
+
+COLUMNS = ['timestamp', 'data_type', 'metric_name', 'value_num', 'value_text']
+
+# (timestamp, device_id, data_type, metric_name, value_num, value_text)
+ArchiveRow = Tuple[datetime, str, str, str, Optional[float], Optional[str]]
+
+RANGE_FORMAT = '%Y%m%dT%H%M%S'
+PART_PATTERN = re.compile(r'^part-(\d{8}T\d{6})-(\d{8}T\d{6})-\d+\.')
+
+
+def default_format() -> str:
+    return 'parquet' if pq is not None else 'npz'
+
+
+class ArchiveWriter:
+    """(일, 장치)별 버퍼에 모았다가 chunk_rows 단위로 파일 기록
+
+    입력은 timestamp 순서라고 가정하며 날짜가 바뀌면 이전 날짜 버퍼를 모두 기록한다.
+    버퍼 전체 행 수도 max_buffered_rows를 넘지 않으므로 메모리 사용량은 구간 길이와 무관하다.
+    [start, end)는 내보내는 구간 (None이면 그 날짜 전체) - 파일 이름과 기존 파일 정리에 쓰인다.
+    """
+
+    def __init__(self, root: str, chunk_rows: int = 50_000, fmt: Optional[str] = None,
+                 max_buffered_rows: int = 200_000, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, device_id: Optional[str] = None):
+        self.root = root
+        self.start = start
+        self.end = end
+        self.device_id = device_id
+        self.chunk_rows = chunk_rows
+        self.max_buffered_rows = max_buffered_rows
+        self.fmt = fmt or default_format()
+        if self.fmt == 'parquet' and pq is None:
+            raise RuntimeError("parquet 형식에는 pyarrow가 필요합니다")
+        self.buffers: Dict[Tuple[date, str], Dict[str, list]] = {}
+        self.buffered_rows = 0
+        self.current_day: Optional[date] = None
+        self.files_written: List[str] = []
+        self.rows_written = 0
+        self.part_counts: Dict[Tuple[date, str], int] = {}
+
+    def add(self, row: ArchiveRow):
+        ts, device_id, data_type, metric_name, value_num, value_text = row
+        day = ts.date()
+        if self.current_day is not None and day != self.current_day:
+            self.flush_all()
+        self.current_day = day
+
+        key = (day, device_id)
+        buf = self.buffers.get(key)
+        if buf is None:
+            buf = self.buffers[key] = {c: [] for c in COLUMNS}
+        buf['timestamp'].append(ts)
+        buf['data_type'].append(data_type)
+        buf['metric_name'].append(metric_name)
+        buf['value_num'].append(np.nan if value_num is None else value_num)
+        buf['value_text'].append(value_text)
+        self.buffered_rows += 1
+
+        if len(buf['timestamp']) >= self.chunk_rows:
+            self._flush(key)
+        elif self.buffered_rows >= self.max_buffered_rows:
+            self.flush_all()
+
+    def write_rows(self, rows: Iterable[ArchiveRow]) -> int:
+        """구간 안의 기존 파일을 지운 뒤 기록 (같은 구간 재내보내기는 덮어쓰기)"""
+        self.clear_range()
+        for row in rows:
+            self.add(row)
+        self.flush_all()
+        return self.rows_written
+
+    def flush_all(self):
+        for key in list(self.buffers):
+            self._flush(key)
+
+    def _day_range(self, day: date) -> Tuple[datetime, datetime]:
+        """내보내기 구간을 하루 단위로 자른 [시작, 끝)"""
+        lower = datetime.combine(day, time.min)
+        upper = lower + timedelta(days=1)
+        if self.start is not None:
+            lower = max(lower, self.start)
+        if self.end is not None:
+            upper = min(upper, self.end)
+        return lower, upper
+
+    def clear_range(self) -> int:
+        """[start, end) 안에 완전히 들어가는 기존 파일 삭제 - 지운 파일 수 반환
+
+        이름에 구간이 없는 예전 파일과 구간에 일부만 걸친 파일은 그대로 둔다.
+        """
+        removed = 0
+        for day_dir in glob.glob(os.path.join(self.root, 'date=*')):
+            day = date.fromisoformat(os.path.basename(day_dir)[len('date='):])
+            lower, upper = self._day_range(day)
+            if lower >= upper:
+                continue
+            device_glob = f"device_id={self.device_id}" if self.device_id else 'device_id=*'
+            for path in glob.glob(os.path.join(day_dir, device_glob, 'part-*')):
+                match = PART_PATTERN.match(os.path.basename(path))
+                if not match:
+                    continue
+                part_start, part_end = (datetime.strptime(g, RANGE_FORMAT) for g in match.groups())
+                if lower <= part_start and part_end <= upper:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def _part_path(self, day: date, device_id: str) -> str:
+        directory = os.path.join(self.root, f"date={day.isoformat()}", f"device_id={device_id}")
+        os.makedirs(directory, exist_ok=True)
+        lower, upper = self._day_range(day)
+        index = self.part_counts.get((day, device_id), 0)
+        self.part_counts[(day, device_id)] = index + 1
+        return os.path.join(directory, f"part-{lower.strftime(RANGE_FORMAT)}-"
+                                       f"{upper.strftime(RANGE_FORMAT)}-{index:05d}.{self.fmt}")
+
+    def _flush(self, key: Tuple[date, str]):
+        buf = self.buffers.pop(key, None)
+        if not buf or not buf['timestamp']:
+            return
+        count = len(buf['timestamp'])
+        path = self._part_path(*key)
+        timestamps = np.array(buf['timestamp'], dtype='datetime64[ms]')
+        values = np.array(buf['value_num'], dtype=np.float64)
+
+        if self.fmt == 'parquet':
+            table = pa.table({
+                'timestamp': pa.array(timestamps),
+                'data_type': pa.array(buf['data_type'], pa.string()),
+                'metric_name': pa.array(buf['metric_name'], pa.string()),
+                'value_num': pa.array(values, from_pandas=True),
+                'value_text': pa.array(buf['value_text'], pa.string()),
+            })
+            pq.write_table(table, path, compression='zstd')
+        else:
+            text = buf['value_text']
+            np.savez_compressed(
+                path,
+                timestamp=timestamps,
+                data_type=np.array(buf['data_type'], dtype=str),
+                metric_name=np.array(buf['metric_name'], dtype=str),
+                value_num=values,
+                value_text=np.array(['' if t is None else t for t in text], dtype=str),
+                value_text_valid=np.array([t is not None for t in text], dtype=bool),
+            )
+
+        self.buffered_rows -= count
+        self.rows_written += count
+        self.files_written.append(path)
+
+
+def stream_log_rows(conn, start: Optional[datetime], end: datetime,
+                    device_id: Optional[str] = None,
+                    table: str = 'log_entries') -> Iterable[ArchiveRow]:
+    """서버 측 커서(SSCursor)로 log_entries를 timestamp 순으로 스트리밍"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT metric_id, data_type, metric_name FROM metrics")
+        metrics = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+    sql = (f"SELECT timestamp, device_id, metric_id, value_num, value_text FROM `{table}` "
+           "WHERE timestamp < %s")
+    params: list = [end]
+    if start is not None:
+        sql += " AND timestamp >= %s"
+        params.append(start)
+    if device_id:
+        sql += " AND device_id = %s"
+        params.append(device_id)
+    sql += " ORDER BY timestamp"
+
+    with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+        cursor.execute(sql, params)
+        for ts, dev, metric_id, value_num, value_text in cursor:
+            data_type, metric_name = metrics.get(metric_id, ('', str(metric_id)))
+            yield ts, dev, data_type, metric_name, value_num, value_text
+
+
+class LogArchiver:
+    """보관 기간 정리 전 파티션 구간을 아카이브 (retention.PartitionManager의 archiver)"""
+
+    def __init__(self, db_config: dict, root: str, chunk_rows: int = 50_000,
+                 fmt: Optional[str] = None):
+        self.db_config = db_config
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.fmt = fmt
+
+    def export_range(self, start: Optional[datetime], end: datetime,
+                     device_id: Optional[str] = None) -> bool:
+        """[start, end) 구간 내보내기 - 공유 연결을 막지 않도록 별도 연결 사용"""
+        try:
+            conn = pymysql.connect(**self.db_config)
+        except pymysql.Error as e:
+            print(f"[ERROR] 아카이브 DB 연결 실패: {e}")
+            return False
+
+        try:
+            writer = ArchiveWriter(self.root, self.chunk_rows, self.fmt,
+                                   start=start, end=end, device_id=device_id)
+            count = writer.write_rows(stream_log_rows(conn, start, end, device_id))
+            print(f"[ARCHIVE] {start} ~ {end}: {count}행, {len(writer.files_written)}개 파일")
+            return True
+        except (pymysql.Error, OSError) as e:
+            print(f"[ERROR] 아카이브 실패: {e}")
+            return False
+        finally:
+            conn.close()
+
+
+def _read_part(path: str) -> Dict[str, np.ndarray]:
+    if path.endswith('.parquet'):
+        table = pq.read_table(path)
+        return {
+            'timestamp': table.column('timestamp').to_numpy().astype('datetime64[ms]'),
+            'data_type': np.array(table.column('data_type').to_pylist(), dtype=str),
+            'metric_name': np.array(table.column('metric_name').to_pylist(), dtype=str),
+            'value_num': table.column('value_num').to_numpy(zero_copy_only=False).astype(np.float64),
+            'value_text': np.array(table.column('value_text').to_pylist(), dtype=object),
+        }
+    with np.load(path) as data:
+        text = data['value_text'].astype(object)
+        text[~data['value_text_valid']] = None
+        return {
+            'timestamp': data['timestamp'],
+            'data_type': data['data_type'],
+            'metric_name': data['metric_name'],
+            'value_num': data['value_num'],
+            'value_text': text,
+        }
+
+
+def read_archive(root: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 device_id: Optional[str] = None,
+                 metric_name: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """아카이브를 컬럼 배열 dict로 읽기 (날짜/장치 디렉터리 단위로 먼저 걸러냄)"""
+    parts = []
+    for day_dir in sorted(glob.glob(os.path.join(root, 'date=*'))):
+        day = date.fromisoformat(os.path.basename(day_dir)[len('date='):])
+        if start is not None and day < start.date():
+            continue
+        if end is not None and day > end.date():
+            continue
+        for device_dir in sorted(glob.glob(os.path.join(day_dir, 'device_id=*'))):
+            dev = os.path.basename(device_dir)[len('device_id='):]
+            if device_id and dev != device_id:
+                continue
+            for path in sorted(glob.glob(os.path.join(device_dir, 'part-*'))):
+                part = _read_part(path)
+                part['device_id'] = np.full(len(part['timestamp']), dev)
+                parts.append(part)
+
+    names = ['timestamp', 'device_id'] + COLUMNS[1:]
+    if not parts:
+        return {
+            'timestamp': np.array([], dtype='datetime64[ms]'),
+            'device_id': np.array([], dtype=str),
+            'data_type': np.array([], dtype=str),
+            'metric_name': np.array([], dtype=str),
+            'value_num': np.array([], dtype=np.float64),
+            'value_text': np.array([], dtype=object),
+        }
+
+    result = {name: np.concatenate([p[name] for p in parts]) for name in names}
+    mask = np.ones(len(result['timestamp']), dtype=bool)
+    if start is not None:
+        mask &= result['timestamp'] >= np.datetime64(start, 'ms')
+    if end is not None:
+        mask &= result['timestamp'] < np.datetime64(end, 'ms')
+    if metric_name:
+        mask &= result['metric_name'] == metric_name
+    if not mask.all():
+        result = {name: values[mask] for name, values in result.items()}
+    return result
+
+
+def _db_config() -> dict:
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        'host': os.getenv('DB_HOST'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME'),
+        'charset': 'utf8mb4'
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="로그 아카이브 내보내기/읽기")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export')
+    export.add_argument('--start', type=datetime.fromisoformat)
+    export.add_argument('--end', type=datetime.fromisoformat, required=True)
+    export.add_argument('--out', required=True)
+    export.add_argument('--device')
+    export.add_argument('--chunk-rows', type=int, default=50_000)
+    export.add_argument('--format', choices=['parquet', 'npz'])
+
+    read = sub.add_parser('read')
+    read.add_argument('--root', required=True)
+    read.add_argument('--start', type=datetime.fromisoformat)
+    read.add_argument('--end', type=datetime.fromisoformat)
+    read.add_argument('--device')
+    read.add_argument('--metric')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        archiver = LogArchiver(_db_config(), args.out, args.chunk_rows, args.format)
+        return 0 if archiver.export_range(args.start, args.end, args.device) else 1
+
+    data = read_archive(args.root, args.start, args.end, args.device, args.metric)
+    count = len(data['timestamp'])
+    print(f"{count}행")
+    if count:
+        print(f"구간: {data['timestamp'].min()} ~ {data['timestamp'].max()}")
+        print(f"장치: {', '.join(sorted(set(data['device_id'])))}")
+        print(f"메트릭: {', '.join(sorted(set(data['metric_name'])))}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
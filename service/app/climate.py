@@ -0,0 +1,177 @@
+# climate.py
+"""서버 측 실내 환경 제어 - dht SEN(TEM/HUM)을 받아 히스테리시스로 에어컨/히터/가습기 제어
+
+climate_config:
+{
+  'rooms': {
+    'dht_001': {                                        # 센서 device_id (같은 보드가 액추에이터)
+      'AIR':  {'on_above': 28, 'off_below': 26},        # 냉방 (TEM)
+      'HEAT': {'on_below': 20, 'off_above': 22},        # 난방 (TEM)
+      'HUMI': {'on_below': 40, 'off_above': 50},        # 가습 (HUM)
+    },
+  },
+  'min_on_sec': 120,    # 켠 뒤 최소 유지 시간
+  'min_off_sec': 120,   # 끈 뒤 최소 유지 시간
+}
+
+상태가 바뀔 때만 CMO(AIR/HEAT/HUMI, 1=켜기 0=끄기)를 내므로 명령 수는 센서 수신 수보다 훨씬 적다.
+대시보드에서 수동으로 켜고 끄면(ACK 값이 마지막 자동 명령과 다름) 그 장치는 자동 제어를 멈추고,
+Auto(-1)로 돌리면 다시 자동 제어한다.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from models import CMORequest
+
+# 액추에이터 metric_name -> 입력 센서 metric_name
+ACTUATOR_INPUTS = {'AIR': 'TEM', 'HEAT': 'TEM', 'HUMI': 'HUM'}
+
+
+class HysteresisLoop:
+    """액추에이터 하나의 on/off 히스테리시스 + 최소 유지 시간"""
+
+    def __init__(self, device_id: str, metric_name: str, on_above: float = None,
+                 off_below: float = None, on_below: float = None, off_above: float = None):
+        if on_above is not None and off_below is not None:
+            if off_below >= on_above:
+                raise ValueError(f"{device_id}/{metric_name}: off_below < on_above 이어야 함")
+            self.should_on = lambda value: value >= on_above
+            self.should_off = lambda value: value <= off_below
+        elif on_below is not None and off_above is not None:
+            if off_above <= on_below:
+                raise ValueError(f"{device_id}/{metric_name}: off_above > on_below 이어야 함")
+            self.should_on = lambda value: value <= on_below
+            self.should_off = lambda value: value >= off_above
+        else:
+            raise ValueError(f"{device_id}/{metric_name}: on_above/off_below 또는 on_below/off_above 필요")
+
+        self.device_id = device_id
+        self.metric_name = metric_name
+        self.state: Optional[bool] = None  # None: 아직 모름 (시작 직후)
+        self.changed_at: Optional[float] = None
+        self.manual = False  # 수동 제어 중이면 자동 명령을 내지 않음
+        self.samples = 0
+        self.transitions = 0
+        self.held = 0  # 최소 유지 시간 때문에 미룬 전환
+
+    def update(self, value: float, now: float, min_on: float, min_off: float) -> Optional[bool]:
+        """새 측정값 → 전환할 상태 (전환 없으면 None)"""
+        self.samples += 1
+        if self.manual:
+            return None
+
+        if self.state is not True and self.should_on(value):
+            desired = True
+        elif self.state is not False and self.should_off(value):
+            desired = False
+        else:
+            return None
+
+        if self.state is not None:
+            min_hold = min_on if self.state else min_off
+            if now - self.changed_at < min_hold:
+                self.held += 1
+                return None
+
+        self.state = desired
+        self.changed_at = now
+        self.transitions += 1
+        return desired
+
+    def stats(self) -> dict:
+        return {
+            'state': {True: 'on', False: 'off', None: 'unknown'}[self.state],
+            'manual': self.manual,
+            'samples': self.samples,
+            'transitions': self.transitions,
+            'held': self.held,
+        }
+
+
+class ClimateController:
+    """방(센서)별 히스테리시스 제어 - 모니터가 수신 데이터마다 evaluate 호출"""
+
+    def __init__(self, rooms: Dict[str, dict], min_on_sec: float = 120.0, min_off_sec: float = 120.0,
+                 command_timeout: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.min_on_sec = min_on_sec
+        self.min_off_sec = min_off_sec
+        self.command_timeout = command_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        # (device_id, 센서 metric) -> [HysteresisLoop, ...]
+        self.inputs: Dict[tuple, List[HysteresisLoop]] = {}
+        self.loops: Dict[tuple, HysteresisLoop] = {}  # (device_id, 액추에이터 metric) -> loop
+        for device_id, actuators in rooms.items():
+            for metric_name, thresholds in actuators.items():
+                if metric_name not in ACTUATOR_INPUTS:
+                    raise ValueError(f"알 수 없는 액추에이터: {metric_name}")
+                loop = HysteresisLoop(device_id, metric_name, **thresholds)
+                self.loops[(device_id, metric_name)] = loop
+                self.inputs.setdefault((device_id, ACTUATOR_INPUTS[metric_name]), []).append(loop)
+
+    def evaluate(self, parsed) -> List[CMORequest]:
+        """SEN → 전환 명령 목록, ACK → 수동/자동 모드 반영"""
+        if parsed.data_type == 'ACK':
+            self._observe_ack(parsed)
+            return []
+        if parsed.data_type != 'SEN':
+            return []
+        loops = self.inputs.get((parsed.device_id, parsed.metric_name))
+        if not loops:
+            return []
+        try:
+            value = float(parsed.value)
+        except ValueError:
+            return []
+
+        commands = []
+        now = self.clock()
+        with self.lock:
+            for loop in loops:
+                state = loop.update(value, now, self.min_on_sec, self.min_off_sec)
+                if state is None:
+                    continue
+                command_value = '1' if state else '0'
+                print(f"[CLIMATE] {loop.device_id} {loop.metric_name} "
+                      f"{'ON' if state else 'OFF'} ({parsed.metric_name}={parsed.value})")
+                commands.append(CMORequest(
+                    device_id=loop.device_id,
+                    metric_name=loop.metric_name,
+                    value=command_value,
+                    command=f"CMO,{loop.metric_name},{command_value}",
+                    timeout=self.command_timeout
+                ))
+        return commands
+
+    def _observe_ack(self, parsed):
+        """ACK,AIR|HEAT|HUMI,v - 마지막 자동 명령과 다르면 수동, -1이면 자동 복귀"""
+        loop = self.loops.get((parsed.device_id, parsed.metric_name))
+        if loop is None:
+            return
+        with self.lock:
+            if parsed.value == '-1':
+                if loop.manual:
+                    print(f"[CLIMATE] {loop.device_id} {loop.metric_name} 자동 제어 재개")
+                loop.manual = False
+                loop.state = None  # 펌웨어 자동 모드에서 상태를 모르므로 다음 측정값으로 다시 결정
+            elif parsed.value in ('0', '1') and loop.state != (parsed.value == '1'):
+                if not loop.manual:
+                    print(f"[CLIMATE] {loop.device_id} {loop.metric_name} 수동 제어 - 자동 제어 중지")
+                loop.manual = True
+                loop.state = parsed.value == '1'
+                loop.changed_at = self.clock()
+
+    def stats(self) -> dict:
+        with self.lock:
+            loops = {f"{device_id}/{metric_name}": loop.stats()
+                     for (device_id, metric_name), loop in self.loops.items()}
+        samples = sum(loop['samples'] for loop in loops.values())
+        transitions = sum(loop['transitions'] for loop in loops.values())
+        return {
+            'loops': loops,
+            'samples': samples,
+            'commands': transitions,
+            'command_ratio': round(transitions / samples, 4) if samples else 0.0,
+        }
@@ -0,0 +1,345 @@
+# cluster.py
+"""다중 게이트웨이 클러스터 - 장치 소유 디렉터리, 명령 전달, 이벤트 집계
+
+게이트웨이(SerialMonitorApp)마다 포트가 연결된 장치가 다르므로:
+- 코디네이터(python cluster.py)가 노드별 소유 장치 디렉터리를 유지한다.
+  노드는 heartbeat_sec마다 자신의 장치 목록을 등록하고, 응답으로 전체 디렉터리를 받는다.
+  ttl 동안 등록이 없는 노드는 디렉터리에서 빠진다.
+  같은 장치를 두 노드가 등록하면 먼저 합류한 노드가 소유한다 (conflicts에 표시).
+- 어느 노드든 /api/command의 장치가 로컬에 없으면 소유 노드로 전달한다.
+  노드 간 요청은 keep-alive 세션 하나로 보내므로 명령마다 TCP 연결을 새로 맺지 않는다.
+  전달된 요청에는 X-Cluster-Forwarded 헤더가 붙어 다시 전달되지 않는다.
+- 노드는 다른 노드의 /api/events?scope=local 스트림을 구독해 자신의 클러스터 허브로 다시 발행한다.
+  클라이언트는 아무 노드의 /api/events 하나로 전체 장치의 상태/명령 결과를 받는다.
+
+사용법:
+    python cluster.py [--host 0.0.0.0] [--port 5100] [--ttl 15]
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from flask import Flask, jsonify, request
+from werkzeug.serving import WSGIRequestHandler
+
+FORWARDED_HEADER = 'X-Cluster-Forwarded'
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """HTTP/1.1 - 노드 간 세션이 연결을 재사용 (스트리밍 응답은 chunked)"""
+    protocol_version = 'HTTP/1.1'
+
+
+class Coordinator:
+    """노드 등록/만료와 장치 → 노드 소유 디렉터리"""
+
+    def __init__(self, ttl: float = 15.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.nodes: Dict[str, dict] = {}  # node_id -> {url, devices, joined_at, seen_at}
+        self.lock = threading.Lock()
+
+    def register(self, node_id: str, url: str, devices: List[str]) -> dict:
+        """등록/하트비트 - 갱신 후 전체 디렉터리 반환"""
+        now = self.clock()
+        with self.lock:
+            node = self.nodes.get(node_id)
+            if node is None:
+                print(f"[CLUSTER] 노드 합류: {node_id} ({url}, 장치 {len(devices)}개)")
+                node = self.nodes[node_id] = {'joined_at': now}
+            node.update(url=url, devices=list(devices), seen_at=now)
+            return self._directory(now)
+
+    def leave(self, node_id: str) -> bool:
+        with self.lock:
+            removed = self.nodes.pop(node_id, None) is not None
+        if removed:
+            print(f"[CLUSTER] 노드 탈퇴: {node_id}")
+        return removed
+
+    def directory(self) -> dict:
+        with self.lock:
+            return self._directory(self.clock())
+
+    def _directory(self, now: float) -> dict:
+        """lock 안에서 호출 - 만료 노드 제거 후 소유 관계 계산 (먼저 합류한 노드 우선)"""
+        for node_id in [node_id for node_id, node in self.nodes.items()
+                        if now - node['seen_at'] > self.ttl]:
+            del self.nodes[node_id]
+            print(f"[CLUSTER] 노드 만료: {node_id} ({self.ttl}초 동안 하트비트 없음)")
+
+        owners, conflicts = {}, {}
+        for node_id, node in sorted(self.nodes.items(), key=lambda item: item[1]['joined_at']):
+            for device_id in node['devices']:
+                if device_id in owners:
+                    conflicts.setdefault(device_id, [owners[device_id]]).append(node_id)
+                else:
+                    owners[device_id] = node_id
+
+        return {
+            'nodes': {node_id: {'url': node['url'], 'devices': node['devices'],
+                                'age': round(now - node['seen_at'], 1)}
+                      for node_id, node in self.nodes.items()},
+            'owners': owners,
+            'conflicts': conflicts,
+        }
+
+    def create_app(self) -> Flask:
+        app = Flask(__name__)
+
+        @app.route('/api/cluster/nodes/<node_id>', methods=['PUT'])
+        def register(node_id):
+            data = request.json or {}
+            if not data.get('url'):
+                return jsonify({'success': False, 'error': 'Missing parameter: url'}), 400
+            return jsonify(self.register(node_id, data['url'], data.get('devices', [])))
+
+        @app.route('/api/cluster/nodes/<node_id>', methods=['DELETE'])
+        def leave(node_id):
+            return jsonify({'success': self.leave(node_id)})
+
+        @app.route('/api/cluster', methods=['GET'])
+        def directory():
+            return jsonify(self.directory())
+
+        return app
+
+
+class ClusterNode:
+    """게이트웨이 쪽 클러스터 참여 - 하트비트, 원격 장치 명령 전달, 다른 노드 이벤트 구독"""
+
+    def __init__(self, node_id: str, coordinator: str, advertise_url: str,
+                 heartbeat_sec: float = 5.0, timeout: float = 3.0, stream_retry: float = 2.0,
+                 max_forwarded: int = 1000):
+        self.node_id = node_id
+        self.coordinator = coordinator.rstrip('/')
+        self.advertise_url = advertise_url.rstrip('/')
+        self.heartbeat_sec = heartbeat_sec
+        self.timeout = timeout
+        self.stream_retry = stream_retry
+        self.session = requests.Session()  # 코디네이터/다른 노드와 연결 재사용
+        self.lock = threading.Lock()
+        self.nodes: Dict[str, str] = {}  # node_id -> url (자신 제외)
+        self.owners: Dict[str, str] = {}  # device_id -> node_id
+        self.forwarded = OrderedDict()  # 전달한 request_id -> node_id (상태 조회 전달용)
+        self.max_forwarded = max_forwarded
+        self.streams: Dict[str, threading.Thread] = {}  # node_id -> 이벤트 구독 스레드
+        self.on_event: Optional[Callable[[str, str, dict], None]] = None  # app.py에서 할당됨
+        self.on_directory: Optional[Callable[[List[str]], None]] = None  # app.py에서 할당됨
+        self.running = False
+        self.registered = False
+        self.counters = Counter()
+        self._wake = threading.Event()
+
+    def heartbeat(self, devices: List[str]) -> bool:
+        """로컬 장치 등록 + 디렉터리 갱신 (실패하면 마지막 디렉터리 유지)"""
+        try:
+            response = self.session.put(
+                f"{self.coordinator}/api/cluster/nodes/{self.node_id}",
+                json={'url': self.advertise_url, 'devices': devices},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            directory = response.json()
+        except (requests.RequestException, ValueError) as e:
+            if self.registered:
+                print(f"[CLUSTER] 코디네이터 연결 실패: {e}")
+            self.registered = False
+            self.counters['heartbeat_errors'] += 1
+            return False
+
+        if not self.registered:
+            print(f"[✓] 클러스터 참여: {self.node_id} → {self.coordinator}")
+        self.registered = True
+        self.apply_directory(directory)
+        return True
+
+    def apply_directory(self, directory: dict):
+        with self.lock:
+            self.nodes = {node_id: node['url'] for node_id, node in directory.get('nodes', {}).items()
+                          if node_id != self.node_id}
+            self.owners = dict(directory.get('owners', {}))
+        for device_id, claimants in directory.get('conflicts', {}).items():
+            if self.node_id in claimants[1:]:
+                print(f"[CLUSTER] {device_id}는 {claimants[0]}가 소유 - 이 노드로 명령이 전달되지 않음")
+        if self.on_directory:
+            self.on_directory(self.remote_devices())
+
+    def remote_devices(self) -> List[str]:
+        """다른 노드가 소유한 장치"""
+        with self.lock:
+            return [device_id for device_id, node_id in self.owners.items() if node_id != self.node_id]
+
+    def owner(self, device_id: str) -> Optional[Tuple[str, str]]:
+        """(node_id, url) - 다른 노드가 소유한 장치만 (로컬/모르는 장치는 None)"""
+        with self.lock:
+            node_id = self.owners.get(device_id)
+            if node_id is None or node_id == self.node_id or node_id not in self.nodes:
+                return None
+            return node_id, self.nodes[node_id]
+
+    def forward_command(self, device_id: str, payload: dict) -> Optional[Tuple[dict, int, dict]]:
+        """/api/command 요청을 소유 노드로 전달 → (응답 본문, 상태 코드, 헤더), 소유 노드가 없으면 None"""
+        owner = self.owner(device_id)
+        if owner is None:
+            return None
+        node_id, url = owner
+        try:
+            response = self.session.post(f"{url}/api/command", json=payload, timeout=self.timeout,
+                                         headers={FORWARDED_HEADER: self.node_id})
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.counters['forward_errors'] += 1
+            print(f"[CLUSTER] {device_id} 명령 전달 실패 ({node_id}): {e}")
+            return {'success': False, 'error': f'Owner node "{node_id}" unreachable',
+                    'device_id': device_id, 'node': node_id}, 502, {}
+
+        self.counters['forwarded'] += 1
+        request_id = body.get('request_id')
+        if request_id:
+            with self.lock:
+                self.forwarded[request_id] = node_id
+                while len(self.forwarded) > self.max_forwarded:
+                    self.forwarded.popitem(last=False)
+        headers = {'Retry-After': response.headers['Retry-After']} if 'Retry-After' in response.headers else {}
+        return {**body, 'node': node_id}, response.status_code, headers
+
+    def forward_cmo(self, cmo) -> Optional[dict]:
+        """큐에서 꺼낸 CMO(CMD 라우팅/규칙/환경 제어)를 소유 노드로 전달 → 응답 본문 (실패하면 None)"""
+        forwarded = self.forward_command(cmo.device_id, {
+            'device_id': cmo.device_id,
+            'metric_name': cmo.metric_name,
+            'value': cmo.value,
+            'timeout': max(0.0, cmo.timeout - cmo.elapsed_time()),
+        })
+        if forwarded is None:
+            return None
+        body, status, _ = forwarded
+        return body if status == 200 else None
+
+    def forward_status(self, request_id: str) -> Optional[Tuple[dict, int]]:
+        """다른 노드로 전달한 요청의 처리 결과 조회 (전달한 적 없으면 None)"""
+        with self.lock:
+            node_id = self.forwarded.get(request_id)
+            url = self.nodes.get(node_id)
+        if url is None:
+            return None
+        try:
+            response = self.session.get(f"{url}/api/command/{request_id}", timeout=self.timeout,
+                                        headers={FORWARDED_HEADER: self.node_id})
+            return {**response.json(), 'node': node_id}, response.status_code
+        except (requests.RequestException, ValueError) as e:
+            return {'success': False, 'error': f'Owner node "{node_id}" unreachable: {e}'}, 502
+
+    def run(self, devices: Callable[[], List[str]]):
+        """하트비트 루프 - devices()는 현재 연결된 로컬 장치 목록"""
+        self.running = True
+        while self.running:
+            self.heartbeat(devices())
+            self._follow_peers()
+            self._wake.wait(self.heartbeat_sec)
+        self._leave()
+
+    def _follow_peers(self):
+        """디렉터리의 다른 노드마다 이벤트 구독 스레드 (없거나 끝났으면 새로)"""
+        with self.lock:
+            peers = list(self.nodes)
+        for node_id in peers:
+            thread = self.streams.get(node_id)
+            if thread is not None and thread.is_alive():
+                continue
+            thread = threading.Thread(target=self._follow, args=(node_id,), daemon=True,
+                                      name=f"ClusterEvents-{node_id}")
+            self.streams[node_id] = thread
+            thread.start()
+
+    def _follow(self, node_id: str):
+        """다른 노드의 로컬 이벤트 스트림을 읽어 on_event로 전달 (노드가 디렉터리에서 빠지면 종료)"""
+        while self.running:
+            with self.lock:
+                url = self.nodes.get(node_id)
+            if url is None:
+                return
+            try:
+                self._read_stream(node_id, url)
+            except (requests.RequestException, ValueError) as e:
+                if not self.running:
+                    return
+                self.counters['stream_errors'] += 1
+                print(f"[CLUSTER] {node_id} 이벤트 스트림 끊김: {e}")
+            self._wake.wait(self.stream_retry)
+
+    def _read_stream(self, node_id: str, url: str):
+        response = self.session.get(f"{url}/api/events", params={'scope': 'local'}, stream=True,
+                                    timeout=(self.timeout, 60))  # 노드는 15초마다 ping을 보냄
+        response.raise_for_status()
+        try:
+            event, data = 'message', []
+            for line in response.iter_lines(decode_unicode=True):
+                if not self.running:
+                    break
+                if line:
+                    field, _, content = line.partition(': ')
+                    if field == 'event':
+                        event = content
+                    elif field == 'data':
+                        data.append(content)
+                    continue
+
+                # 빈 줄 = 이벤트 끝
+                if data and self.on_event:
+                    self.counters['events'] += 1
+                    self.on_event(node_id, event, json.loads('\n'.join(data)))
+                event, data = 'message', []
+        finally:
+            response.close()
+
+    def _leave(self):
+        try:
+            self.session.delete(f"{self.coordinator}/api/cluster/nodes/{self.node_id}",
+                                timeout=self.timeout)
+        except requests.RequestException:
+            pass
+        self.registered = False
+
+    def stop(self):
+        """하트비트 루프 종료 (구독 스레드는 다음 이벤트/ping에서 종료)"""
+        self.running = False
+        self._wake.set()
+
+    def stats(self) -> dict:
+        with self.lock:
+            nodes = dict(self.nodes)
+            owners = dict(self.owners)
+        return {
+            'node_id': self.node_id,
+            'coordinator': self.coordinator,
+            'registered': self.registered,
+            'peers': nodes,
+            'owners': owners,
+            'streams': sorted(node_id for node_id, thread in self.streams.items() if thread.is_alive()),
+            **{name: self.counters[name]
+               for name in ('forwarded', 'forward_errors', 'events', 'stream_errors', 'heartbeat_errors')},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="게이트웨이 클러스터 코디네이터")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5100)
+    parser.add_argument('--ttl', type=float, default=15.0, help="하트비트가 없으면 노드를 제외할 시간 (초)")
+    args = parser.parse_args()
+
+    coordinator = Coordinator(ttl=args.ttl)
+    print(f"[✓] 클러스터 코디네이터 실행 중 (http://{args.host}:{args.port})")
+    coordinator.create_app().run(host=args.host, port=args.port, debug=False, use_reloader=False,
+                                 request_handler=KeepAliveRequestHandler)
+
+
+if __name__ == '__main__':
+    main()
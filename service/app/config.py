@@ -0,0 +1,71 @@
+# config.py
+"""서비스 설정 파일 - 장치 포트(ports)와 DB 접속 정보(db)
+
+config.json:
+{
+  "db": {"host": "${DB_HOST}", "user": "${DB_USER}", "password": "${DB_PASSWORD}", "database": "${DB_NAME}"},
+  "ports": {
+    "ele_001": "/dev/ttyACM0",
+    "cur_001": {"port": "/dev/ttyACM#", "baudrate": 9600, "write_timeout": 1.0}
+  }
+}
+
+- 문자열 안의 ${NAME}은 환경 변수(.env)로 바꾼다 (비밀번호를 파일에 적지 않도록)
+- ports 값은 main.py의 port_config와 같음 (경로 또는 models.LinkConfig 필드 dict)
+- 실행 중 SIGHUP 또는 POST /api/admin/reload로 다시 읽으면 바뀐 포트의 모니터만
+  다시 연결하고, db가 바뀌었으면 새 연결을 연 뒤 교체한다 (SerialMonitorApp.reload_config)
+"""
+
+import json
+import os
+from typing import Dict, List, Tuple
+
+from models import LinkConfig
+
+DB_FIELDS = ('host', 'user', 'password', 'database')
+
+
+def _expand(value):
+    """설정 값 안의 ${NAME}을 환경 변수로 (dict/list는 재귀)"""
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, dict):
+        return {key: _expand(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    return value
+
+
+def load_config(path: str) -> dict:
+    """설정 파일 읽기 + 검증 - 잘못된 설정이면 ValueError (실행 중 설정은 그대로 둠)"""
+    with open(path, encoding='utf-8') as f:
+        try:
+            config = _expand(json.load(f))
+        except ValueError as e:
+            raise ValueError(f"{path}: JSON 형식 오류 ({e})")
+
+    db = config.get('db')
+    if not isinstance(db, dict) or set(db) != set(DB_FIELDS):
+        raise ValueError(f"{path}: db에는 {', '.join(DB_FIELDS)}가 필요함")
+    unset = [field for field in DB_FIELDS if '${' in str(db[field])]
+    if unset:
+        raise ValueError(f"{path}: 환경 변수가 없는 db 항목: {', '.join(unset)}")
+
+    ports = config.get('ports')
+    if not isinstance(ports, dict):
+        raise ValueError(f"{path}: ports가 필요함")
+    for device_id, value in ports.items():
+        try:
+            LinkConfig.from_config(value)
+        except TypeError as e:
+            raise ValueError(f"{path}: {device_id} 링크 설정 오류 ({e})")
+    return config
+
+
+def diff_ports(old: Dict[str, LinkConfig],
+               new: Dict[str, LinkConfig]) -> Tuple[List[str], List[str], List[str]]:
+    """(추가된 장치, 제거된 장치, 링크 설정이 바뀐 장치)"""
+    added = [device_id for device_id in new if device_id not in old]
+    removed = [device_id for device_id in old if device_id not in new]
+    changed = [device_id for device_id in new if device_id in old and new[device_id] != old[device_id]]
+    return added, removed, changed
@@ -2,12 +2,35 @@
 """MySQL 데이터베이스 관리"""
 
 import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
 import pymysql
 
 
+def split_value(value) -> Tuple[Optional[float], Optional[str]]:
+    """값을 (숫자, 문자열) 컬럼으로 분리 - 숫자로 해석되면 value_num, 아니면 value_text"""
+    if value is None:
+        return None, None
+    try:
+        return float(value), None
+    except (TypeError, ValueError):
+        return None, str(value)[:255]
+
+
 class DatabaseHandler:
     """MySQL 데이터베이스 관리"""
     
+    INSERT_SQL = (
+        "INSERT INTO log_entries (device_id, metric_id, value_num, value_text) "
+        "VALUES (%s, %s, %s, %s)"
+    )
+    
+    INSERT_MANY_SQL = (
+        "INSERT INTO log_entries (timestamp, device_id, metric_id, value_num, value_text) "
+        "VALUES (%s, %s, %s, %s, %s)"
+    )
+    
     def __init__(self, host: str, user: str, password: str, database: str):
         self.config = {
             'host': host, 'user': user, 'password': password,
@@ -15,9 +38,15 @@ class DatabaseHandler:
         }
         self.conn = None
         self.lock = threading.Lock()
+        self.replaced_by: Optional['DatabaseHandler'] = None  # 설정 다시 읽기로 교체된 경우 새 핸들러
+        self.metric_ids: Dict[Tuple[str, str], int] = {}  # (data_type, metric_name) -> metric_id
+        # 이번 트랜잭션에서 만든 metric_id - commit이 성공해야 metric_ids로 옮김 (롤백되면 다시 조회)
+        self.uncommitted_metric_ids: Dict[Tuple[str, str], int] = {}
     
     def connect(self) -> bool:
         """DB 연결"""
+        if self.replaced_by is not None:
+            return False  # 교체된 핸들러는 이전 접속 정보로 다시 연결하지 않음
         try:
             self.conn = pymysql.connect(**self.config)
             print(f"[✓] DB 연결 성공: {self.config['host']}/{self.config['database']}")
@@ -26,29 +55,136 @@ class DatabaseHandler:
             print(f"[✗] DB 연결 실패: {e}")
             return False
     
+    def metric_id(self, cursor, data_type: str, metric_name: str) -> int:
+        """metrics 차원 테이블의 metric_id 조회 (없으면 생성, commit 후 commit_metric_ids로 캐시)"""
+        key = (data_type, metric_name)
+        metric_id = self.metric_ids.get(key) or self.uncommitted_metric_ids.get(key)
+        if metric_id is None:
+            cursor.execute(
+                "INSERT INTO metrics (data_type, metric_name) VALUES (%s, %s) "
+                "ON DUPLICATE KEY UPDATE metric_id = LAST_INSERT_ID(metric_id)",
+                key
+            )
+            metric_id = cursor.lastrowid
+            self.uncommitted_metric_ids[key] = metric_id
+        return metric_id
+    
+    def commit_metric_ids(self):
+        """commit 성공 후 호출 - 이번 트랜잭션에서 만든 metric_id를 캐시에 반영"""
+        self.metric_ids.update(self.uncommitted_metric_ids)
+        self.uncommitted_metric_ids.clear()
+    
+    def discard_metric_ids(self):
+        """트랜잭션 실패 시 호출 - 커밋되지 않은 metric_id는 캐시하지 않음"""
+        self.uncommitted_metric_ids.clear()
+    
+    def rollback(self):
+        """실패한 쓰기 정리 - 열린 트랜잭션을 되돌리고 커밋되지 않은 metric_id 폐기"""
+        self.discard_metric_ids()
+        try:
+            self.conn.rollback()
+        except pymysql.Error as e:
+            print(f"[✗] DB 롤백 실패: {e}")
+    
     def insert_log(self, device_id: str, data_type: str, metric_name: str, value: str) -> bool:
-        """데이터 저장"""
-        if not self.conn:
-            print("[✗] DB 연결이 없습니다")
+        """데이터 저장 (교체된 핸들러면 새 핸들러에 저장)"""
+        try:
+            with self.lock:
+                replaced_by = self.replaced_by
+                if replaced_by is None:
+                    if not self.conn:
+                        print("[✗] DB 연결이 없습니다")
+                        return False
+                    try:
+                        with self.conn.cursor() as cursor:
+                            metric_id = self.metric_id(cursor, data_type, metric_name)
+                            value_num, value_text = split_value(value)
+                            cursor.execute(self.INSERT_SQL, (device_id, metric_id, value_num, value_text))
+                            self.conn.commit()
+                    except pymysql.Error:
+                        self.rollback()
+                        raise
+                    self.commit_metric_ids()
+        except pymysql.Error as e:
+            print(f"[✗] DB 저장 실패: {e}")
+            self._reconnect()
+            return False
+        
+        if replaced_by is not None:
+            return replaced_by.insert_log(device_id, data_type, metric_name, value)
+        print(f"[✓] DB 저장: {device_id},{data_type},{metric_name},{value}")
+        return True
+    
+    def insert_logs(self, rows: List[tuple]) -> bool:
+        """여러 행을 executemany 한 번, 커밋 한 번으로 저장 (교체된 핸들러면 새 핸들러에 저장)
+        
+        rows: [(timestamp, device_id, data_type, metric_name, value), ...]
+        """
+        if self.replaced_by is not None:
+            return self.replaced_by.insert_logs(rows)
+        if not self.conn and not self.connect():
             return False
         
         try:
             with self.lock:
-                with self.conn.cursor() as cursor:
-                    cursor.execute(
-                        "INSERT INTO logs (device_id, data_type, metric_name, value) VALUES (%s, %s, %s, %s)",
-                        (device_id, data_type, metric_name, value)
-                    )
-                    self.conn.commit()
-            print(f"[✓] DB 저장: {device_id},{data_type},{metric_name},{value}")
-            return True
+                replaced_by = self.replaced_by
+                if replaced_by is None:
+                    try:
+                        with self.conn.cursor() as cursor:
+                            params = []
+                            for ts, device_id, data_type, metric_name, value in rows:
+                                metric_id = self.metric_id(cursor, data_type, metric_name)
+                                value_num, value_text = split_value(value)
+                                params.append((ts, device_id, metric_id, value_num, value_text))
+                            cursor.executemany(self.INSERT_MANY_SQL, params)
+                            self.conn.commit()
+                    except pymysql.Error:
+                        self.rollback()
+                        raise
+                    self.commit_metric_ids()
         except pymysql.Error as e:
-            print(f"[✗] DB 저장 실패: {e}")
+            print(f"[✗] DB 일괄 저장 실패 ({len(rows)}행): {e}")
             self._reconnect()
             return False
+        
+        if replaced_by is not None:
+            return replaced_by.insert_logs(rows)
+        return True
+    
+    def query_range(self, device_id: str, metric_name: str, start: datetime, end: datetime,
+                    data_type: str = 'SEN') -> List[tuple]:
+        """(device_id, metric, 시간 구간) 조회 - ix_log_device_metric_ts 인덱스 범위 탐색
+        
+        반환: [(timestamp, value_num, value_text), ...] (시간순)
+        """
+        if self.replaced_by is not None:
+            return self.replaced_by.query_range(device_id, metric_name, start, end, data_type)
+        if not self.conn:
+            return []
+        
+        with self.lock:
+            if not self.conn:
+                return []
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT metric_id FROM metrics WHERE data_type = %s AND metric_name = %s",
+                    (data_type, metric_name)
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return []
+                cursor.execute(
+                    "SELECT timestamp, value_num, value_text FROM log_entries "
+                    "WHERE device_id = %s AND metric_id = %s AND timestamp BETWEEN %s AND %s "
+                    "ORDER BY timestamp",
+                    (device_id, row[0], start, end)
+                )
+                return list(cursor.fetchall())
     
     def _reconnect(self):
         """DB 재연결"""
+        if self.replaced_by is not None:
+            return
         try:
             if self.conn:
                 self.conn.ping()
@@ -59,4 +195,102 @@ class DatabaseHandler:
         """연결 종료"""
         if self.conn:
             self.conn.close()
-            print("[○] DB 연결 종료")
\ No newline at end of file
+            print("[○] DB 연결 종료")
+    
+    def retire(self, replacement: 'DatabaseHandler'):
+        """설정 다시 읽기로 교체 - 진행 중인 쓰기가 끝나면 연결을 닫고, 이후 호출은 replacement로
+        
+        옛 핸들러를 아직 들고 lock을 기다리던 스레드도 닫힌 연결 대신 새 핸들러에 저장한다.
+        """
+        with self.lock:
+            self.replaced_by = replacement
+            conn, self.conn = self.conn, None
+        if conn:
+            try:
+                conn.close()
+            except pymysql.Error:
+                pass
+        print(f"[○] DB 연결 교체: {self.config['host']} → {replacement.config['host']}")
+
+
+class BatchedLogWriter:
+    """insert_log 호출을 모아 batch_size개 또는 flush_interval초마다 한 번에 저장
+    
+    DatabaseHandler.insert_log와 같은 시그니처라 SerialMonitor의 db_handler로 쓸 수 있다.
+    저장에 실패한 행은 재연결 후 다음 주기에 다시 시도하며, 최대 max_pending개까지 보관한다
+    (넘치면 오래된 행부터 버림).
+    """
+    
+    def __init__(self, db_handler: DatabaseHandler, batch_size: int = 200,
+                 flush_interval: float = 1.0, max_pending: int = 100_000):
+        self.db_handler = db_handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: List[tuple] = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+    
+    def insert_log(self, device_id: str, data_type: str, metric_name: str, value: str) -> bool:
+        """저장 예약 (수신 시각 기록)"""
+        with self.lock:
+            self.pending.append((datetime.now(), device_id, data_type, metric_name, value))
+            if len(self.pending) > self.max_pending:
+                del self.pending[0]
+                self.dropped += 1
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.wake.set()
+        return True
+    
+    def flush(self) -> int:
+        """밀린 행을 batch_size개씩 저장 - 저장한 행 수 반환"""
+        total = 0
+        while True:
+            with self.lock:
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+            if not batch:
+                return total
+            
+            if not self.db_handler.insert_logs(batch):
+                # 실패한 행은 앞에 되돌려 두고 다음 주기에 재시도
+                with self.lock:
+                    self.pending[:0] = batch
+                    overflow = len(self.pending) - self.max_pending
+                    if overflow > 0:
+                        del self.pending[:overflow]
+                        self.dropped += overflow
+                self.failed_flushes += 1
+                return total
+            
+            total += len(batch)
+            self.written += len(batch)
+    
+    def run(self):
+        """주기적 저장"""
+        self.running = True
+        while self.running:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+        self.flush()
+    
+    def stop(self):
+        """중지 (남은 행 저장)"""
+        self.running = False
+        self.wake.set()
+    
+    def stats(self) -> dict:
+        with self.lock:
+            pending = len(self.pending)
+        return {
+            'written': self.written,
+            'pending': pending,
+            'dropped': self.dropped,
+            'failed_flushes': self.failed_flushes,
+        }
@@ -0,0 +1,199 @@
+# discovery.py
+"""시리얼 포트 핫플러그 감지 및 장치 식별
+
+PortWatcher가 설정의 허용 목록(patterns, 보통 /dev/serial/by-id/usb-Arduino* 같은 by-id 패턴)에
+맞는 포트만 주기적으로 훑어
+- 사라진 포트의 모니터는 분리하고 (app.detach_monitor)
+- 새 포트는 DeviceIdentifier로 식별해 연결한다 (app.attach_monitor)
+USB 리셋으로 ttyACM 번호가 바뀌어도 같은 장치로 다시 붙는다.
+포트를 여는 것만으로 장치가 리셋되므로 허용 목록 밖의 포트(모뎀, 다른 프로그램의 장치 등)는
+열지 않고, 이미 다른 프로세스가 연 포트는 exclusive로 열기에 실패하면 건너뛴다.
+
+식별 순서:
+1. 핸드셰이크 - "CMO,ID,?" 전송, "ACK,ID,<device_id>" 응답이면 그 device_id 사용
+2. 응답이 없으면 수신 메트릭으로 종류(ele/dht/cur/ent)를 판별하고
+   port_config에서 아직 연결되지 않은 같은 종류의 device_id를 배정
+"""
+
+import glob
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+import serial
+
+ID_QUERY = "CMO,ID,?"
+ID_REPLY_PREFIX = "ACK,ID,"
+
+
+# (data_type, metric_name) -> 장치 종류 (펌웨어가 보내는 메시지 기준)
+FINGERPRINTS = {
+    ('SEN', 'FLOOR'): 'ele',
+    ('SEN', 'ELE_DIR'): 'ele',
+    ('SEN', 'TEM'): 'dht',
+    ('SEN', 'HUM'): 'dht',
+    ('SEN', 'LIGHT'): 'cur',
+    ('SEN', 'CUR_STEP'): 'cur',
+    ('SEN', 'MOTOR_DIR'): 'cur',
+    ('SEN', 'RFID_ACCESS'): 'ent',
+    ('SEN', 'RFID_DENY'): 'ent',
+    ('CMD', 'FLOOR'): 'ent',  # 출입문이 엘리베이터를 호출
+}
+
+
+def classify_line(line: str) -> Optional[str]:
+    """수신 한 줄 → 장치 종류 (판별 불가면 None)"""
+    parts = line.strip().split(',')
+    if len(parts) < 3:
+        return None
+    return FINGERPRINTS.get((parts[0], parts[1]))
+
+
+def scan_ports(patterns) -> Dict[str, str]:
+    """허용 목록 패턴에 맞는 포트: 실제 장치 경로 -> 표시 경로 (앞쪽 패턴 우선)"""
+    ports = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            ports.setdefault(os.path.realpath(path), path)
+    return ports
+
+
+class DeviceIdentifier:
+    """포트를 열어 장치를 식별 - 성공하면 열린 Serial을 그대로 넘겨 재오픈(리셋)을 피함"""
+
+    def __init__(self, baudrate: int = 9600, boot_delay: float = 2.0,
+                 handshake_timeout: float = 2.0, listen_timeout: float = 10.0,
+                 serial_factory: Callable = serial.Serial):
+        self.baudrate = baudrate
+        self.boot_delay = boot_delay  # 포트를 열면 아두이노가 리셋되므로 부팅 대기
+        self.handshake_timeout = handshake_timeout
+        self.listen_timeout = listen_timeout
+        self.serial_factory = serial_factory
+
+    def identify(self, port: str) -> Tuple[Optional[str], Optional[object]]:
+        """(device_id 또는 장치 종류, 열린 Serial) - 실패하면 (None, None)"""
+        try:
+            ser = self.serial_factory(port, self.baudrate, timeout=0.2, exclusive=True)
+        except (serial.SerialException, OSError) as e:
+            print(f"[DISCOVERY] {port} 열기 실패: {e}")
+            return None, None
+
+        try:
+            identity = self._query(ser)
+        except (serial.SerialException, OSError) as e:
+            print(f"[DISCOVERY] {port} 식별 중 오류: {e}")
+            identity = None
+
+        if identity is None:
+            ser.close()
+            return None, None
+        ser.timeout = 1
+        return identity, ser
+
+    def _query(self, ser) -> Optional[str]:
+        time.sleep(self.boot_delay)
+        ser.reset_input_buffer()
+        ser.write(f"{ID_QUERY}\n".encode('utf-8'))
+
+        started = time.monotonic()
+        votes = Counter()
+        while time.monotonic() - started < self.listen_timeout:
+            line = ser.readline().decode('utf-8', errors='ignore').strip()
+            if line.startswith(ID_REPLY_PREFIX):
+                return line[len(ID_REPLY_PREFIX):] or None
+            kind = classify_line(line)
+            if kind:
+                votes[kind] += 1
+            # 핸드셰이크 응답 시간이 지났고 메트릭으로 판별됐으면 종료
+            if votes and time.monotonic() - started >= self.handshake_timeout:
+                return votes.most_common(1)[0][0]
+        return None
+
+
+class PortWatcher:
+    """포트 추가/제거 감시 및 모니터 연결/분리"""
+
+    def __init__(self, app, identifier: DeviceIdentifier = None, interval: float = 2.0,
+                 retry_interval: float = 60.0, patterns=()):
+        # SerialMonitorApp (monitors, monitors_lock, port_config, attach_monitor, detach_monitor)
+        self.app = app
+        self.identifier = identifier or DeviceIdentifier()
+        self.interval = interval
+        self.retry_interval = retry_interval  # 식별 실패한 포트 재시도 간격
+        self.patterns = tuple(patterns)  # 식별을 시도할 포트 허용 목록 (glob, 비어 있으면 검색 안 함)
+        self.failed: Dict[str, float] = {}  # 실제 경로 -> 마지막 식별 실패 시각
+        self.running = False
+        self.stop_event = threading.Event()
+
+    def resolve_device_id(self, identity: str) -> Optional[str]:
+        """식별 결과 → device_id (종류만 알면 port_config에서 비어 있는 것 배정, 없으면 새 번호)"""
+        if '_' in identity:
+            return identity
+        prefix = f"{identity}_"
+        for device_id in self.app.port_config:
+            if device_id.startswith(prefix) and device_id not in self.app.monitors:
+                return device_id
+        number = 1
+        while f"{prefix}{number:03d}" in self.app.monitors:
+            number += 1
+        return f"{prefix}{number:03d}"
+
+    def poll_once(self):
+        """한 번 훑어서 분리/연결"""
+        ports = scan_ports(self.patterns)
+
+        # 1. 사라진 포트 분리 (재열거된 장치를 같은 device_id로 다시 붙이기 위해 먼저)
+        #    허용 목록 밖의 고정 포트 모니터는 장치 파일이 남아 있는 한 그대로 둠
+        with self.app.monitors_lock:
+            for device_id, monitor in list(self.app.monitors.items()):
+                real_path = os.path.realpath(monitor.port)
+                if real_path not in ports and not os.path.exists(real_path):
+                    print(f"[DISCOVERY] {device_id} 포트 사라짐: {monitor.port}")
+                    self.app.detach_monitor(device_id)
+            held = {os.path.realpath(m.port) for m in self.app.monitors.values()}
+
+        # 2. 새 포트 식별 및 연결 (식별/속도 협상은 몇 초 걸리므로 락 밖에서, device_id 배정만 락 안에서
+        #    - 그 사이 같은 device_id가 붙으면 attach_monitor가 거부)
+        now = time.monotonic()
+        for real_path, path in ports.items():
+            if real_path in held or now - self.failed.get(real_path, -self.retry_interval) < self.retry_interval:
+                continue
+            if self.stop_event.is_set():
+                return
+
+            identity, ser = self.identifier.identify(path)
+            with self.app.monitors_lock:
+                device_id = self.resolve_device_id(identity) if identity else None
+                attached = device_id is not None and device_id in self.app.monitors
+            if device_id is not None and not attached:
+                print(f"[DISCOVERY] {path} → {device_id}")
+                if self.app.attach_monitor(device_id, path, ser):
+                    self.failed.pop(real_path, None)
+                    continue
+            elif device_id:
+                print(f"[DISCOVERY] {path}: {device_id}는 이미 연결되어 있음")
+            if ser:
+                ser.close()
+            self.failed[real_path] = time.monotonic()
+
+        # 사라진 포트의 실패 기록 정리
+        for real_path in [p for p in self.failed if p not in ports]:
+            del self.failed[real_path]
+
+    def run(self):
+        if not self.patterns:
+            print("[DISCOVERY] 허용된 포트 패턴이 없음 - 핫플러그 감지 안 함")
+            return
+        self.running = True
+        while self.running:
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"[ERROR] 포트 감시 오류: {e}")
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
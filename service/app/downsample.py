@@ -0,0 +1,79 @@
+# downsample.py
+"""시계열 다운샘플링 (화면 해상도만큼의 점으로 모양 유지)"""
+
+from typing import Tuple
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets - 첫/끝 점을 포함해 points개 선택
+
+    각 구간에서 이전 선택점과 다음 구간 평균점으로 만든 삼각형 넓이가
+    가장 큰 점을 고르므로 급격한 변화(피크)가 유지된다.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 구간 평균 (마지막 구간은 끝 점)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[prev] - avg_x) * (by - y[prev]) - (x[prev] - bx) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return x[selected], y[selected]
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """구간별 최솟값/최댓값 - points // 2개 구간에서 두 점씩 (시간 순서 유지)"""
+    n = len(x)
+    buckets = points // 2
+    if points >= n or buckets < 1:
+        return x, y
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    # 구간 길이가 모두 1 이상이므로 reduceat 결과가 구간별 값
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+
+    # 구간 안에서 처음 나오는 최솟값/최댓값 위치
+    min_idx = np.flatnonzero(y == mins[bucket_of])
+    max_idx = np.flatnonzero(y == maxs[bucket_of])
+    first_min = np.full(buckets, n, dtype=np.int64)
+    first_max = np.full(buckets, n, dtype=np.int64)
+    np.minimum.at(first_min, bucket_of[min_idx], min_idx)
+    np.minimum.at(first_max, bucket_of[max_idx], max_idx)
+
+    selected = np.unique(np.concatenate([first_min, first_max]))
+    return x[selected], y[selected]
+
+
+def downsample(x, y, points: int, method: str = 'lttb') -> Tuple[np.ndarray, np.ndarray]:
+    """x(시간순), y를 최대 points개로 줄임 - NaN은 제외"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+
+    if method == 'lttb':
+        return lttb(x, y, points)
+    if method == 'minmax':
+        return minmax(x, y, points)
+    raise ValueError(f"알 수 없는 다운샘플링 방식: {method}")
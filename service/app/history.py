@@ -0,0 +1,158 @@
+# history.py
+"""최근 센서 이력 메모리 저장소 (메트릭별 링 버퍼)"""
+
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class MetricRingBuffer:
+    """(timestamp, value) 쌍을 고정 크기 array('d')에 저장하는 링 버퍼
+
+    샘플 하나당 timestamp 8바이트 + value 8바이트 = 16바이트.
+    용량은 생성 시 미리 할당되므로 100만 샘플 버퍼는 약 16MB로 고정된다.
+    """
+
+    BYTES_PER_SAMPLE = 16
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity는 1 이상이어야 합니다")
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0   # 다음 쓰기 위치
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """버퍼가 점유하는 데이터 바이트 수"""
+        return (self.timestamps.buffer_info()[1] * self.timestamps.itemsize +
+                self.values.buffer_info()[1] * self.values.itemsize)
+
+    def append(self, timestamp: float, value: float):
+        """샘플 추가 - O(1), 가득 차면 가장 오래된 샘플을 덮어씀"""
+        with self.lock:
+            self.timestamps[self.head] = timestamp
+            self.values[self.head] = value
+            self.head = (self.head + 1) % self.capacity
+            if self.size < self.capacity:
+                self.size += 1
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """가장 최근 샘플"""
+        with self.lock:
+            if self.size == 0:
+                return None
+            idx = (self.head - 1) % self.capacity
+            return self.timestamps[idx], self.values[idx]
+
+    def oldest(self) -> Optional[Tuple[float, float]]:
+        """가장 오래된 샘플"""
+        with self.lock:
+            if self.size == 0:
+                return None
+            idx = self._start()
+            return self.timestamps[idx], self.values[idx]
+
+    def _start(self) -> int:
+        """가장 오래된 샘플의 물리 위치"""
+        return (self.head - self.size) % self.capacity
+
+    def _bisect(self, timestamp: float, right: bool) -> int:
+        """논리 인덱스 기준 이진 탐색 (timestamp는 단조 증가 가정)"""
+        start = self._start()
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self.timestamps[(start + mid) % self.capacity]
+            if ts < timestamp or (right and ts == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _slice(self, buf: array, lo: int, hi: int) -> array:
+        """논리 구간 [lo, hi)를 최대 두 번의 연속 슬라이스로 복사"""
+        begin = (self._start() + lo) % self.capacity
+        end = begin + (hi - lo)
+        if end <= self.capacity:
+            return buf[begin:end]
+        return buf[begin:] + buf[:end - self.capacity]
+
+    def range(self, start: Optional[float] = None,
+              end: Optional[float] = None) -> Tuple[array, array]:
+        """start <= timestamp <= end 구간 샘플을 (timestamps, values) 배열로 반환"""
+        with self.lock:
+            lo = self._bisect(start, right=False) if start is not None else 0
+            hi = self._bisect(end, right=True) if end is not None else self.size
+            if hi <= lo:
+                return array('d'), array('d')
+            return self._slice(self.timestamps, lo, hi), self._slice(self.values, lo, hi)
+
+    def __len__(self):
+        return self.size
+
+
+class HistoryStore:
+    """(device_id, metric_name)별 링 버퍼 모음"""
+
+    def __init__(self, retention_sec: float = 24 * 3600, sample_interval_sec: float = 1.0,
+                 max_capacity: int = 1_000_000):
+        self.retention_sec = retention_sec  # start 없는 조회의 기본 구간
+        self.capacity = self.capacity_for(retention_sec, sample_interval_sec, max_capacity)
+        self.buffers: Dict[Tuple[str, str], MetricRingBuffer] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def capacity_for(retention_sec: float, sample_interval_sec: float,
+                     max_capacity: int = 1_000_000) -> int:
+        """보관 기간과 최소 샘플 주기로 버퍼 크기 계산"""
+        return max(1, min(max_capacity, int(retention_sec / sample_interval_sec)))
+
+    def _buffer(self, device_id: str, metric_name: str) -> MetricRingBuffer:
+        key = (device_id, metric_name)
+        buf = self.buffers.get(key)
+        if buf is None:
+            with self.lock:
+                buf = self.buffers.get(key)
+                if buf is None:
+                    buf = MetricRingBuffer(self.capacity)
+                    self.buffers[key] = buf
+        return buf
+
+    def append(self, device_id: str, metric_name: str, value: str,
+               timestamp: Optional[float] = None) -> bool:
+        """숫자형 값만 저장 (숫자가 아니면 False)"""
+        try:
+            numeric = float(value)
+        except (TypeError, ValueError):
+            return False
+        self._buffer(device_id, metric_name).append(
+            timestamp if timestamp is not None else time.time(), numeric)
+        return True
+
+    def query(self, device_id: str, metric_name: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> Tuple[array, array]:
+        """구간 조회 - 버퍼가 없으면 빈 배열"""
+        buf = self.buffers.get((device_id, metric_name))
+        if buf is None:
+            return array('d'), array('d')
+        return buf.range(start, end)
+
+    def latest(self, device_id: str, metric_name: str) -> Optional[Tuple[float, float]]:
+        buf = self.buffers.get((device_id, metric_name))
+        return buf.latest() if buf else None
+
+    def oldest(self, device_id: str, metric_name: str) -> Optional[Tuple[float, float]]:
+        buf = self.buffers.get((device_id, metric_name))
+        return buf.oldest() if buf else None
+
+    def keys(self) -> List[Tuple[str, str]]:
+        return list(self.buffers.keys())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in list(self.buffers.values()))
@@ -0,0 +1,104 @@
+# hub.py
+"""프로세스 내 이벤트 허브 - 한 번 직렬화한 SSE 프레임을 모든 구독자에게 전달"""
+
+import itertools
+import json
+import threading
+import time
+from queue import Queue, Full, Empty
+from typing import Iterator, Optional
+
+
+def sse_frame(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    """SSE(text/event-stream) 프레임"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return f"{head}event: {event}\ndata: {body}\n\n".encode('utf-8')
+
+
+class Subscriber:
+    """구독자별 제한 크기 큐 - 가득 차면 허브가 구독을 끊음"""
+
+    def __init__(self, max_queue: int):
+        self.queue: Queue = Queue(maxsize=max_queue)
+        self.closed = False
+        self.created_at = time.time()
+
+    def get(self, timeout: float) -> Optional[bytes]:
+        """다음 프레임 (timeout 동안 없으면 None)"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+
+class EventHub:
+    """publish는 이벤트를 한 번만 직렬화하고 각 구독자 큐에 같은 bytes를 넣는다
+
+    구독자 하나당 추가 비용은 put_nowait 한 번이다. 큐가 가득 찬(따라오지 못하는)
+    구독자는 제거되며, 스트림이 끊긴 클라이언트는 다시 연결해 최신 상태부터 받는다.
+    """
+
+    def __init__(self, max_queue: int = 256, heartbeat_sec: float = 15.0):
+        self.max_queue = max_queue
+        self.heartbeat_sec = heartbeat_sec
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.sequence = itertools.count(1)
+        self.published = 0
+        self.evicted = 0
+        self.mirrors = []  # 같은 이벤트를 다시 발행할 허브 (클러스터 허브)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscriber.closed = True
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: dict):
+        """이벤트 발행 - 직렬화 1회, 느린 구독자는 제거"""
+        frame = sse_frame(event, data, next(self.sequence))
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.published += 1
+
+        slow = []
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(frame)
+            except Full:
+                slow.append(subscriber)
+
+        for subscriber in slow:
+            self.unsubscribe(subscriber)
+            print(f"[HUB] 느린 구독자 제거 (큐 {self.max_queue}개 초과)")
+        if slow:
+            with self.lock:
+                self.evicted += len(slow)
+
+        for mirror in self.mirrors:
+            mirror.publish(event, data)
+
+    def stream(self, subscriber: Subscriber, initial: Optional[bytes] = None) -> Iterator[bytes]:
+        """SSE 응답 본문 - heartbeat_sec마다 주석 프레임으로 연결 유지"""
+        try:
+            if initial:
+                yield initial
+            while not subscriber.closed:
+                frame = subscriber.get(self.heartbeat_sec)
+                yield frame if frame is not None else b": ping\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'subscribers': len(self.subscribers),
+                'published': self.published,
+                'evicted': self.evicted,
+            }
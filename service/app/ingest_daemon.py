@@ -0,0 +1,112 @@
+# ingest_daemon.py
+"""레거시 형식 장치 수집 데몬 - 여러 포트를 한 프로세스, 한 DB 연결로 처리
+
+curtain_log_uploader.py / entrance_log_uploader.py / DHT_log_uploader.py를 대체한다.
+모든 행은 log_entries(통합 스키마)에 일괄 저장된다.
+수집 전용이라 명령 큐가 없다 - 장치가 보낸 CMD 줄은 로그만 남기고 전달하지 않는다
+(명령 라우팅이 필요한 장치는 main.py 서비스에 연결).
+
+사용법:
+    python ingest_daemon.py --port curtain=/dev/ttyACM0 --port entrance=/dev/ttyACM1 \\
+                            --port dht=/dev/ttyUSB0 [--batch-size 200] [--flush-interval 1.0]
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from database import BatchedLogWriter, DatabaseHandler
+from ingest_plugins import PLUGINS, make_line_parser
+from monitor import SerialMonitor
+
+
+def parse_port(spec: str) -> Tuple[str, str]:
+    """'종류=경로' → (종류, 경로)"""
+    kind, sep, path = spec.partition('=')
+    if not sep or not path:
+        raise argparse.ArgumentTypeError(f"'종류=경로' 형식이어야 합니다: {spec}")
+    if kind != 'cmo' and kind not in PLUGINS:
+        raise argparse.ArgumentTypeError(f"알 수 없는 장치 종류: {kind}")
+    return kind, path
+
+
+class IngestDaemon:
+    """포트별 SerialMonitor + 공유 BatchedLogWriter"""
+
+    def __init__(self, db_config: dict, ports: List[Tuple[str, str]], baudrate: int = 9600,
+                 batch_size: int = 200, flush_interval: float = 1.0):
+        self.db_handler = DatabaseHandler(**db_config)
+        self.writer = BatchedLogWriter(self.db_handler, batch_size, flush_interval)
+        self.monitors = [
+            SerialMonitor(f"{kind}:{path}", path, None, self.writer, baudrate,  # 명령 큐 없음
+                          line_parser=make_line_parser(kind))
+            for kind, path in ports
+        ]
+        self.threads = []
+
+    def _run_monitor(self, monitor: SerialMonitor):
+        """수신 (연결 전이거나 끊기면 monitor.run 안에서 backoff 후 재연결)"""
+        monitor.running = True
+        monitor.connect()
+        monitor.run()
+
+    def start(self):
+        # DB가 아직 없어도 시작 - 연결 전까지 writer가 행을 보관하고 재시도
+        self.db_handler.connect()
+        threads = [threading.Thread(target=self.writer.run, daemon=True)]
+        threads += [threading.Thread(target=self._run_monitor, args=(m,), daemon=True)
+                    for m in self.monitors]
+        for thread in threads:
+            thread.start()
+        self.threads = threads
+        print(f"[✓] 수집 데몬 시작: 포트 {len(self.monitors)}개, DB 연결 1개")
+
+    def stop(self):
+        for monitor in self.monitors:
+            monitor.close()
+        self.writer.stop()
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.db_handler.close()
+        print(f"[○] 수집 데몬 종료: {self.writer.stats()}")
+
+
+def _db_config() -> dict:
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        'host': os.getenv('DB_HOST'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME')
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="레거시 형식 장치 수집 데몬")
+    parser.add_argument('--port', type=parse_port, action='append', required=True,
+                        metavar='TYPE=PATH',
+                        help=f"장치 종류({', '.join(['cmo', *PLUGINS])})와 시리얼 포트")
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--flush-interval', type=float, default=1.0)
+    parser.add_argument('--stats-interval', type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    daemon = IngestDaemon(_db_config(), args.port, args.baud, args.batch_size, args.flush_interval)
+    daemon.start()
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            print(f"[INGEST] {daemon.writer.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+# ingest_plugins.py
+"""레거시 형식 장치 파서 플러그인
+
+각 플러그인은 line_parser(line, device_id) -> [SerialData, ...] 형태로
+SerialMonitor(line_parser=...)에 연결된다. 행 → 메트릭 변환은 migrate.py의
+백필 매퍼를 그대로 사용하므로 실시간 수집과 백필 결과가 같은 형태가 된다.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from migrate import LogRow, map_curtain, map_dht, map_entrance
+from models import SerialData
+
+
+def to_serial_data(rows: List[LogRow]) -> List[SerialData]:
+    return [SerialData(device_id, data_type, metric_name, str(value))
+            for _ts, device_id, data_type, metric_name, value in rows if value is not None]
+
+
+def _fields(line: str, count: int) -> Optional[List[str]]:
+    parts = [p.strip() for p in line.split(',')]
+    return parts if len(parts) == count else None
+
+
+class CurtainParser:
+    """device_id,light_value,motor_direction,current_step,max_steps"""
+
+    def __call__(self, line: str, device_id: str) -> List[SerialData]:
+        parts = _fields(line, 5)
+        if not parts:
+            return []
+        try:
+            row = {
+                'created_at': datetime.now(),
+                'device_id': parts[0],
+                'light_value': int(parts[1]),
+                'motor_direction': int(parts[2]),
+                'current_step': int(parts[3]),
+                'max_steps': int(parts[4]),
+            }
+        except ValueError:
+            return []
+        return to_serial_data(map_curtain(row))
+
+
+class EntranceParser:
+    """event_type,device_id,uid (event_type: OPENED / VALID / FAILED)"""
+
+    def __call__(self, line: str, device_id: str) -> List[SerialData]:
+        if line.startswith('[DEBUG]'):
+            return []
+        parts = _fields(line, 3)
+        if not parts:
+            return []
+        row = {
+            'created_at': datetime.now(),
+            'event_type': parts[0].upper(),
+            'device_id': parts[1],
+            'card_uid': parts[2],
+        }
+        return to_serial_data(map_entrance(row))
+
+
+class DhtAssembler:
+    """여러 줄에 나뉘어 오는 DHT 측정값 조립
+
+    "DHT-01" / "온도:25.3°C" / "습도:17%" 세 줄이 모두 모이면 TEM, HUM을 내보낸다.
+    포트마다 상태를 가지므로 모니터마다 인스턴스를 따로 만든다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.device_id: Optional[str] = None
+        self.temperature: Optional[float] = None
+        self.humidity: Optional[int] = None
+
+    def __call__(self, line: str, device_id: str) -> List[SerialData]:
+        try:
+            if '온도' in line:
+                self.temperature = float(line.split(':')[1].replace('°C', '').strip())
+            elif '습도' in line:
+                self.humidity = int(line.split(':')[1].replace('%', '').strip())
+            elif 'DHT' in line:
+                self.device_id = line.strip()
+            else:
+                return []
+        except (IndexError, ValueError):
+            return []
+
+        if self.device_id and self.temperature is not None and self.humidity is not None:
+            row = {
+                'created_at': datetime.now(),
+                'device_id': self.device_id,
+                'temperature': self.temperature,
+                'humidity': self.humidity,
+            }
+            self.reset()
+            return to_serial_data(map_dht(row))
+        return []
+
+
+# 장치 종류 -> 파서 생성자 (DhtAssembler처럼 상태가 있으므로 포트마다 새로 생성)
+PLUGINS: Dict[str, Callable[[], Callable[[str, str], List[SerialData]]]] = {
+    'curtain': CurtainParser,
+    'entrance': EntranceParser,
+    'dht': DhtAssembler,
+}
+
+
+def make_line_parser(kind: str):
+    """장치 종류의 line_parser 생성 ('cmo'는 기본 SerialParser → None)"""
+    if kind == 'cmo':
+        return None
+    try:
+        return PLUGINS[kind]()
+    except KeyError:
+        raise ValueError(f"알 수 없는 장치 종류: {kind} (가능: cmo, {', '.join(PLUGINS)})")
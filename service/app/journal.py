@@ -0,0 +1,236 @@
+# journal.py
+"""명령 저널 - 받은 CMO와 상태 변화를 JSONL 파일에 추가 기록
+
+cmd_queue와 pending_requests는 메모리에만 있으므로 재시작하면 처리 중이던 명령이 사라진다.
+저널은 요청마다 한 줄(accept)과 상태가 바뀔 때마다 한 줄(status)을 덧붙인다.
+
+    {"op": "accept", "request_id": "...", "device_id": "ele_001", "metric_name": "FLOOR",
+     "value": "3", "command": "CMO,FLOOR,3", "timestamp": 1760000000.0, "timeout": 30,
+     "key": "client-retry-key", "status": "queued"}
+    {"op": "status", "request_id": "...", "status": "acked", "at": 1760000001.2}
+
+- 멱등 키: 클라이언트가 Idempotency-Key를 보내면 키 → request_id dict로 중복 요청을 찾는다 (O(1)).
+  키는 key_ttl 동안 유지되고 재시작해도 저널에서 복원된다.
+- 복구: 시작 시 저널을 읽어 끝나지 않은(queued/sent) 요청 중 timeout이 남은 것은 다시 보내고,
+  지난 것은 expired로 기록한다. 읽은 뒤 남길 요청만 새 파일로 다시 써서 저널 크기를 제한한다.
+- 기록(group commit): record()는 메모리 색인을 갱신하고 줄을 버퍼에 넣기만 한다 (QueueProcessor.lock
+  안에서 호출되므로 순서는 그대로). 파일 쓰기/fsync/압축은 기록 스레드가 모인 줄을 한 번에 처리한다.
+  flush()는 그때까지 넣은 줄이 디스크에 기록될 때까지 기다린다.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from models import CMORequest
+
+# 더 이상 바뀌지 않는 상태 (lanes.py / queue_processor.py)
+TERMINAL_STATUSES = {'acked', 'timeout', 'failed', 'superseded', 'rejected', 'dropped',
+                     'expired', 'forwarded'}
+
+_CMO_FIELDS = ('request_id', 'device_id', 'metric_name', 'value', 'command', 'timestamp', 'timeout')
+
+
+class CommandJournal:
+    """추가 기록 전용 명령 저널 + 멱등 키 색인"""
+
+    def __init__(self, path: str, key_ttl: float = 24 * 3600, fsync: bool = True,
+                 compact_after: int = 10000):
+        self.path = path
+        self.key_ttl = key_ttl
+        self.fsync = fsync  # 기록 스레드가 쓸 때마다 디스크까지 기록 (정전 시에도 유지)
+        self.compact_after = compact_after  # 이만큼 기록하면 남길 요청만 다시 씀
+        self.entries: Dict[str, dict] = {}  # request_id -> 요청 필드 + key, status, updated_at
+        self.keys: Dict[str, str] = {}  # 멱등 키 -> request_id
+        self.claimed: Dict[str, str] = {}  # 아직 기록 전인 request_id -> 멱등 키
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)  # 버퍼에 줄 추가 / 기록 완료 알림
+        self.buffer: List[str] = []  # 기록 스레드가 아직 쓰지 않은 줄
+        self.appended = 0  # 지금까지 버퍼에 넣은 줄 수
+        self.durable = 0  # 그중 디스크에 기록된 줄 수
+        self.writer = None  # 기록 스레드 (첫 record에서 시작)
+        self.closing = False
+        self.file = None
+        self.written = 0  # 마지막 압축 이후 기록한 줄 수
+        self.duplicates = 0
+        self.recovered = {'resent': 0, 'expired': 0}
+
+    def claim(self, key: str, request_id: str) -> Optional[str]:
+        """멱등 키 예약 - 이미 쓰인 키면 기존 request_id, 처음이면 None (request_id로 예약)"""
+        with self.lock:
+            existing = self.keys.get(key)
+            if existing is not None:
+                self.duplicates += 1
+                return existing
+            self.keys[key] = request_id
+            self.claimed[request_id] = key
+            return None
+
+    def release(self, key: str):
+        """받지 못한 요청(429 등)의 키 해제 - 클라이언트가 같은 키로 다시 시도할 수 있음"""
+        with self.lock:
+            request_id = self.keys.pop(key, None)
+            self.claimed.pop(request_id, None)
+
+    def get(self, request_id: str) -> Optional[dict]:
+        """기록된 요청 (재시작 전 요청 포함)"""
+        with self.lock:
+            entry = self.entries.get(request_id)
+            return dict(entry) if entry else None
+
+    def record(self, cmo: CMORequest, status: str):
+        """상태 기록 - 처음 보는 요청이면 accept, 아니면 status 줄 (파일 기록은 기록 스레드가)"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(cmo.request_id)
+            if entry is None:
+                entry = {field: getattr(cmo, field) for field in _CMO_FIELDS}
+                entry['key'] = self.claimed.pop(cmo.request_id, None)
+                entry.update(status=status, updated_at=now)
+                self.entries[cmo.request_id] = entry
+                self._append({'op': 'accept', **entry})
+            elif entry['status'] != status:
+                entry.update(status=status, updated_at=now)
+                self._append({'op': 'status', 'request_id': cmo.request_id, 'status': status, 'at': now})
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """지금까지 record한 줄이 디스크에 기록될 때까지 대기"""
+        with self.changed:
+            target = self.appended
+            return self.changed.wait_for(lambda: self.durable >= target or self.writer is None, timeout)
+
+    def recover(self) -> Tuple[List[CMORequest], List[CMORequest]]:
+        """저널 읽기 → (다시 보낼 요청, 만료된 요청), 남길 요청만 다시 씀"""
+        now = time.time()
+        with self.lock:
+            self._load()
+            resend, expired = [], []
+            for entry in self.entries.values():
+                if entry['status'] in TERMINAL_STATUSES:
+                    continue
+                cmo = CMORequest(**{field: entry[field] for field in _CMO_FIELDS})
+                (expired if cmo.is_expired() else resend).append(cmo)
+            self._rewrite(self._prune(now))
+        self.recovered = {'resent': len(resend), 'expired': len(expired)}
+        if resend or expired:
+            print(f"[JOURNAL] 미완료 명령 복구: 재전송 {len(resend)}개, 만료 {len(expired)}개")
+        return resend, expired
+
+    def _load(self):
+        """lock 안에서 호출 - 저널 파일 → entries/keys (마지막 줄이 잘렸으면 무시)"""
+        self.entries, self.keys = {}, {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"[JOURNAL] 손상된 줄 무시: {line[:80]!r}")
+                    continue
+                if record.get('op') == 'accept':
+                    entry = {name: value for name, value in record.items() if name != 'op'}
+                    self.entries[entry['request_id']] = entry
+                    if entry.get('key'):
+                        self.keys[entry['key']] = entry['request_id']
+                elif record.get('op') == 'status' and record['request_id'] in self.entries:
+                    self.entries[record['request_id']].update(status=record['status'],
+                                                              updated_at=record['at'])
+
+    def _prune(self, now: float) -> List[dict]:
+        """lock 안에서 호출 - 끝나지 않은 요청과 key_ttl 안의 키가 있는 요청만 남기고 그 목록 반환"""
+        keep = {request_id: entry for request_id, entry in self.entries.items()
+                if entry['status'] not in TERMINAL_STATUSES
+                or (entry.get('key') and now - entry['updated_at'] < self.key_ttl)}
+        self.entries = keep
+        self.keys = {entry['key']: request_id for request_id, entry in keep.items() if entry.get('key')}
+        self.keys.update({key: request_id for request_id, key in self.claimed.items()})
+        return [dict(entry) for entry in keep.values()]
+
+    def _rewrite(self, keep: List[dict]):
+        """남길 요청만 새 파일로 쓰고 교체 (recover 또는 기록 스레드에서 호출)"""
+        if self.file:
+            self.file.close()
+            self.file = None
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in keep:
+                f.write(json.dumps({'op': 'accept', **entry}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.written = 0
+
+    def _append(self, record: dict):
+        """lock 안에서 호출 - 줄을 버퍼에 넣고 기록 스레드를 깨움"""
+        self.buffer.append(json.dumps(record, ensure_ascii=False) + '\n')
+        self.appended += 1
+        if self.writer is None and not self.closing:
+            self.writer = threading.Thread(target=self._write_loop, daemon=True, name="CommandJournal")
+            self.writer.start()
+        self.changed.notify_all()
+
+    def _write_loop(self):
+        """기록 스레드 - 모인 줄을 한 번에 쓰고 fsync (compact_after를 넘으면 대신 압축)"""
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: self.buffer or self.closing)
+                if not self.buffer:
+                    self.writer = None
+                    self.changed.notify_all()
+                    return
+                lines, self.buffer = self.buffer, []
+                target = self.appended
+                compact = self.written + len(lines) >= self.compact_after
+                if compact:
+                    keep = self._prune(time.time())  # 버퍼의 줄은 모두 entries에 반영되어 있음
+            try:
+                if compact:
+                    self._rewrite(keep)
+                else:
+                    self._write(lines)
+            except OSError as e:
+                print(f"[ERROR] 명령 저널 기록 실패: {e}")
+            with self.changed:
+                self.durable = target
+                self.changed.notify_all()
+
+    def _write(self, lines: List[str]):
+        """기록 스레드에서 호출"""
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.writelines(lines)
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.written += len(lines)
+
+    def close(self):
+        """버퍼에 남은 줄을 기록하고 파일 닫기"""
+        with self.changed:
+            self.closing = True
+            self.changed.notify_all()
+            writer = self.writer
+        if writer:
+            writer.join(5)
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def stats(self) -> dict:
+        with self.lock:
+            open_requests = sum(1 for entry in self.entries.values()
+                                if entry['status'] not in TERMINAL_STATUSES)
+            return {
+                'path': self.path,
+                'entries': len(self.entries),
+                'open': open_requests,
+                'keys': len(self.keys),
+                'duplicates': self.duplicates,
+                'recovered': dict(self.recovered),
+            }
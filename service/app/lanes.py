@@ -0,0 +1,172 @@
+# lanes.py
+"""장치별 제한 크기 명령 큐 (admission control / backpressure)
+
+cmd_queue를 대체한다 (queue.Queue와 같은 put/get/qsize).
+- 장치마다 lane(deque)이 있고 lane 크기와 전체 크기가 제한된다
+- lane이 가득 찼을 때 정책:
+    reject      - 새 요청 거절 (LaneFull → /api/command 429)
+    drop_oldest - 가장 오래된 요청을 버리고 추가
+    coalesce    - 같은 device/metric의 대기 중 요청을 새 요청으로 교체 (가득 차지 않아도)
+- get은 장치들을 돌아가며 꺼내므로 한 장치로 몰리는 요청이 다른 장치를 막지 않는다
+- 꺼낼 때 timeout이 지난 요청은 전송하지 않고 버린다 (expired)
+버려진 요청은 on_drop(cmo, status)으로 알린다 (QueueProcessor.discard).
+"""
+
+import math
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from queue import Empty, Full
+from typing import Callable, Dict, Optional
+
+from models import CMORequest
+from queue_processor import QueueProcessor
+
+POLICIES = ('reject', 'drop_oldest', 'coalesce')
+
+
+class LaneFull(Full):
+    """lane(또는 전체 큐)이 가득 차 요청을 받을 수 없음"""
+
+    def __init__(self, device_id: str, depth: int, retry_after: int):
+        super().__init__(f"{device_id} 명령 큐 가득 참 ({depth}개 대기)")
+        self.device_id = device_id
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+def coalesce_key(cmo: CMORequest) -> str:
+    """같은 요청으로 볼 기준 (층 호출처럼 값마다 따로 처리되는 메트릭은 값까지)"""
+    if cmo.metric_name in QueueProcessor.VALUE_KEYED_METRICS:
+        return f"{cmo.device_id}:{cmo.metric_name}:{cmo.value}"
+    return f"{cmo.device_id}:{cmo.metric_name}"
+
+
+class CommandLanes:
+    """장치별 제한 크기 명령 큐"""
+
+    def __init__(self, max_per_device: int = 32, max_total: int = 1000, policy: str = 'reject',
+                 policies: Optional[Dict[str, str]] = None):
+        for name in [policy, *(policies or {}).values()]:
+            if name not in POLICIES:
+                raise ValueError(f"알 수 없는 정책: {name} (가능: {', '.join(POLICIES)})")
+        self.max_per_device = max_per_device
+        self.max_total = max_total
+        self.policy = policy
+        self.policies = dict(policies or {})  # device_id -> 정책 (없으면 policy)
+        self.lanes: Dict[str, deque] = OrderedDict()
+        self.size = 0
+        self.cond = threading.Condition()
+        self.on_drop: Optional[Callable[[CMORequest, str], None]] = None  # app.py에서 할당됨
+        self.counters = Counter()
+        self.service_time = 0.05  # 요청 하나 처리 시간 (EWMA, 초) - retry_after 계산용
+        self._served_at = None
+
+    def policy_for(self, device_id: str) -> str:
+        return self.policies.get(device_id, self.policy)
+
+    def retry_after(self, device_id: str) -> int:
+        """lane이 비워질 때까지 예상 시간 (초, 최소 1)"""
+        depth = len(self.lanes.get(device_id, ()))
+        return max(1, math.ceil(depth * self.service_time))
+
+    def put(self, cmo: CMORequest, block: bool = True, timeout: float = None):
+        """요청 추가 - 받을 수 없으면 LaneFull (block/timeout은 Queue 호환용, 기다리지 않음)"""
+        dropped = []
+        try:
+            with self.cond:
+                self._admit(cmo, dropped)
+                self.cond.notify()
+        finally:
+            for old, status in dropped:
+                self._drop(old, status)
+
+    def _admit(self, cmo: CMORequest, dropped: list):
+        """lock 안에서 호출 - 정책에 따라 추가/교체/거절"""
+        lane = self.lanes.setdefault(cmo.device_id, deque())
+        policy = self.policy_for(cmo.device_id)
+
+        if policy == 'coalesce':
+            key = coalesce_key(cmo)
+            for index, queued in enumerate(lane):
+                if coalesce_key(queued) == key:
+                    lane[index] = cmo
+                    dropped.append((queued, 'superseded'))
+                    self.counters['coalesced'] += 1
+                    self.counters['admitted'] += 1
+                    return
+
+        if len(lane) >= self.max_per_device and policy == 'drop_oldest':
+            dropped.append((lane.popleft(), 'dropped'))
+            self.size -= 1
+            self.counters['dropped'] += 1
+
+        if len(lane) >= self.max_per_device or self.size >= self.max_total:
+            self.counters['rejected'] += 1
+            raise LaneFull(cmo.device_id, len(lane), self.retry_after(cmo.device_id))
+
+        lane.append(cmo)
+        self.size += 1
+        self.counters['admitted'] += 1
+
+    def get(self, block: bool = True, timeout: float = None) -> CMORequest:
+        """장치를 돌아가며 다음 요청 (만료된 요청은 버림) - 없으면 Empty"""
+        now = time.monotonic()
+        if self._served_at is not None:
+            # 이전 요청을 꺼낸 뒤 다시 get하기까지 = 처리 시간 (대기 시간 제외)
+            self.service_time = 0.8 * self.service_time + 0.2 * (now - self._served_at)
+            self._served_at = None
+        deadline = None if timeout is None else now + timeout
+
+        while True:
+            expired = []
+            with self.cond:
+                if self.size == 0 and block:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Empty
+                    self.cond.wait(remaining)
+                cmo = self._pop_next(expired)
+
+            for old in expired:
+                self._drop(old, 'expired')
+            if cmo is not None:
+                self._served_at = time.monotonic()
+                return cmo
+            if not block or (deadline is not None and time.monotonic() >= deadline):
+                raise Empty
+
+    def _pop_next(self, expired: list) -> Optional[CMORequest]:
+        """lock 안에서 호출 - 장치 순서를 돌려가며 만료되지 않은 첫 요청"""
+        for _ in range(len(self.lanes)):
+            device_id, lane = next(iter(self.lanes.items()))
+            self.lanes.move_to_end(device_id)
+            while lane:
+                cmo = lane.popleft()
+                self.size -= 1
+                if cmo.is_expired():
+                    expired.append(cmo)
+                    self.counters['expired'] += 1
+                    continue
+                return cmo
+        return None
+
+    def _drop(self, cmo: CMORequest, status: str):
+        print(f"[QUEUE] {cmo.device_id} 요청 {status}: {cmo.command} (대기 {cmo.elapsed_time():.1f}초)")
+        if self.on_drop:
+            self.on_drop(cmo, status)
+
+    def qsize(self) -> int:
+        return self.size
+
+    def empty(self) -> bool:
+        return self.size == 0
+
+    def stats(self) -> dict:
+        with self.cond:
+            return {
+                **{name: self.counters[name]
+                   for name in ('admitted', 'rejected', 'dropped', 'coalesced', 'expired')},
+                'depth': {device_id: len(lane) for device_id, lane in self.lanes.items() if lane},
+                'service_time': round(self.service_time, 4),
+            }
@@ -2,32 +2,110 @@
 """메인 실행 파일"""
 
 import os
+import socket
 from dotenv import load_dotenv
 
 from app import SerialMonitorApp
+from config import load_config
 
 
 def main():
     load_dotenv()
     
-    # DB 설정
-    db_config = {
-        'host': os.getenv('DB_HOST'),
-        'user': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD'),
-        'database': os.getenv('DB_NAME')
+    # 장치 포트 / DB 설정 (config.json - 실행 중 SIGHUP 또는 POST /api/admin/reload로 다시 읽음)
+    # ports 값은 경로 또는 링크 설정 dict (models.LinkConfig: baudrate, timeout, write_timeout,
+    # write_buffer, negotiate_baudrate - 펌웨어가 CMO,BAUD를 지원하면 연결 후 속도를 올림)
+    # 시작 시 경로 - 핫플러그 감지가 켜져 있으면 바뀐 경로에서 다시 찾음
+    config_path = os.getenv('SERVICE_CONFIG',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json'))
+    config = load_config(config_path)
+    db_config = config['db']
+    port_config = config['ports']
+    
+    # 최근 이력 버퍼 설정 (보관 기간 / 최소 샘플 주기)
+    history_config = {
+        'retention_sec': 24 * 3600,
+        'sample_interval_sec': 1.0,
+    }
+    
+    # 로그 파티션 / 보관 기간 설정 (None이면 비활성)
+    retention_config = {
+        'granularity': 'day',      # 'day' 또는 'month'
+        'retention_days': 90,
+        'precreate': 7,            # 미리 만들어 둘 파티션 수
+        'check_interval': 3600,
+        'archive_dir': os.getenv('LOG_ARCHIVE_DIR'),  # 지정 시 삭제 전 아카이브
     }
     
-    # 포트 설정
-    port_config = {
-        'ent_001': '/dev/ttyACM1',
-        'ele_001': '/dev/ttyACM0',
-        'dht_001': '/dev/ttyACM9',
-        'cur_001': '/dev/ttyACM#',
+    # 포트 핫플러그 감지 (기본 비활성 - port_config만 사용)
+    # DISCOVERY_PORTS에 식별을 시도할 포트 패턴(쉼표 구분, 예: /dev/serial/by-id/usb-Arduino*)을
+    # 지정한 경우에만 켜짐. 포트를 열면 장치가 리셋되므로 허용 목록 밖의 포트는 열지 않음
+    discovery_config = None
+    if os.getenv('DISCOVERY_PORTS'):
+        discovery_config = {
+            'patterns': [p.strip() for p in os.getenv('DISCOVERY_PORTS').split(',') if p.strip()],
+            'interval': 2.0,           # 포트 목록 확인 주기 (초)
+            'retry_interval': 60.0,    # 식별 실패한 포트 재시도 간격 (초)
+        }
+    
+    # 명령 큐 (장치별 lane 크기 / 전체 크기 / 가득 찼을 때 정책)
+    queue_config = {
+        'max_per_device': 32,
+        'max_total': 1000,
+        'policy': 'reject',                 # reject | drop_oldest | coalesce
+        'policies': {'cur_001': 'coalesce'},  # 커튼은 마지막 명령만 의미 있음
     }
     
+    # CMD 라우팅 / 자동화 규칙
+    rules_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+    
+    # 실내 환경 제어 (센서 device_id별 설정값, None이면 비활성)
+    climate_config = {
+        'rooms': {
+            'dht_001': {
+                'AIR': {'on_above': 28, 'off_below': 26},
+                'HEAT': {'on_below': 20, 'off_above': 22},
+                'HUMI': {'on_below': 40, 'off_above': 50},
+            },
+        },
+        'min_on_sec': 120,
+        'min_off_sec': 120,
+    }
+    
+    # 명령 저널 (재시작 시 미완료 명령 복구 / 멱등 키 중복 제거, None이면 비활성)
+    journal_config = {
+        'path': os.getenv('COMMAND_JOURNAL',
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), 'command_journal.jsonl')),
+        'key_ttl': 24 * 3600,   # 멱등 키 유지 시간 (초)
+        'fsync': True,          # 모인 줄을 쓸 때마다 디스크까지 기록 (group commit)
+    }
+    
+    # 다중 게이트웨이 클러스터 (CLUSTER_COORDINATOR가 없으면 단독 실행)
+    # 다른 게이트웨이 장치로 가는 명령은 소유 노드로 전달, 이벤트는 모든 노드 것을 합쳐 제공
+    cluster_config = None
+    if os.getenv('CLUSTER_COORDINATOR'):
+        cluster_config = {
+            'node_id': os.getenv('CLUSTER_NODE_ID', 'gw_001'),
+            'coordinator': os.getenv('CLUSTER_COORDINATOR'),       # 예: http://192.168.0.10:5100
+            # 다른 노드가 접속할 이 노드 주소
+            'advertise_url': os.getenv('CLUSTER_ADVERTISE_URL', f"http://{socket.gethostname()}:5000"),
+            'heartbeat_sec': 5.0,
+        }
+    
+    # 포트 읽기/파싱 작업 프로세스 수 (0이면 한 프로세스에서 포트별 스레드)
+    worker_processes = int(os.getenv('INGEST_WORKERS', '0'))
+    
     # 애플리케이션 실행
-    app = SerialMonitorApp(db_config, port_config)
+    app = SerialMonitorApp(db_config, port_config, history_config,
+                           retention_config=retention_config,
+                           worker_processes=worker_processes,
+                           discovery_config=discovery_config,
+                           queue_config=queue_config,
+                           rules_path=rules_path,
+                           climate_config=climate_config,
+                           cluster_config=cluster_config,
+                           journal_config=journal_config,
+                           config_path=config_path)
     app.run()
 
 
@@ -0,0 +1,274 @@
+# migrate.py
+"""통합 로그 스키마 마이그레이션 및 구 로그 테이블 백필 도구
+
+사용법:
+    python migrate.py status                  # 적용된/대기 중인 마이그레이션
+    python migrate.py upgrade                 # 대기 중인 마이그레이션 적용
+    python migrate.py backfill [--batch-size N] [--source TABLE ...]
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import pymysql
+
+from database import DatabaseHandler, split_value
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# (timestamp, device_id, data_type, metric_name, value)
+LogRow = Tuple[object, str, str, str, object]
+
+
+def split_statements(sql: str) -> List[str]:
+    """SQL 파일을 문장 단위로 분리 (-- 주석 제거, 줄 끝 ';' 기준)"""
+    statements, current = [], []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('--'):
+            continue
+        current.append(line)
+        if stripped.endswith(';'):
+            statements.append('\n'.join(current).rstrip().rstrip(';'))
+            current = []
+    if current:
+        statements.append('\n'.join(current))
+    return statements
+
+
+def list_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[str, str]]:
+    """[(version, path), ...] - 파일명 앞 번호 순"""
+    files = sorted(f for f in os.listdir(directory) if f.endswith('.sql'))
+    return [(f.split('_', 1)[0], os.path.join(directory, f)) for f in files]
+
+
+class MigrationRunner:
+    """schema_migrations 테이블로 적용 이력을 관리하는 마이그레이션 실행기"""
+
+    def __init__(self, conn, directory: str = MIGRATIONS_DIR):
+        self.conn = conn
+        self.directory = directory
+
+    def _ensure_table(self, cursor):
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(32) NOT NULL PRIMARY KEY, "
+            "applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+
+    def applied(self) -> set:
+        with self.conn.cursor() as cursor:
+            self._ensure_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations")
+            return {row[0] for row in cursor.fetchall()}
+
+    def pending(self) -> List[Tuple[str, str]]:
+        done = self.applied()
+        return [(v, p) for v, p in list_migrations(self.directory) if v not in done]
+
+    def upgrade(self) -> List[str]:
+        """대기 중인 마이그레이션을 순서대로 적용"""
+        applied = []
+        for version, path in self.pending():
+            with open(path, 'r', encoding='utf-8') as f:
+                statements = split_statements(f.read())
+            with self.conn.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            self.conn.commit()
+            print(f"[✓] 마이그레이션 적용: {os.path.basename(path)}")
+            applied.append(version)
+        return applied
+
+
+# ============================================================
+# 구 테이블 → log_entries 매핑
+# ============================================================
+
+def map_generic(row: dict) -> List[LogRow]:
+    """logs / log: (timestamp, device_id, data_type, metric_name, value)"""
+    return [(row['timestamp'], row['device_id'], row['data_type'],
+             row['metric_name'], row['value'])]
+
+
+def map_curtain(row: dict) -> List[LogRow]:
+    """curtain_log: light_value, motor_direction, current_step, max_steps"""
+    ts, device_id = row['created_at'], row['device_id']
+    return [
+        (ts, device_id, 'SEN', 'LIGHT', row['light_value']),
+        (ts, device_id, 'SEN', 'MOTOR_DIR', row['motor_direction']),
+        (ts, device_id, 'SEN', 'CUR_STEP', row['current_step']),
+        (ts, device_id, 'SEN', 'MAX_STEP', row['max_steps']),
+    ]
+
+
+ENTRANCE_EVENTS = {
+    'OPENED': ('MOTOR', lambda uid: '1'),
+    'VALID': ('RFID_ACCESS', lambda uid: uid),
+    'FAILED': ('RFID_DENY', lambda uid: uid),
+}
+
+
+def map_entrance(row: dict) -> List[LogRow]:
+    """entrance_log: event_type(OPENED/VALID/FAILED), card_uid"""
+    event = ENTRANCE_EVENTS.get(str(row['event_type']).upper())
+    if not event:
+        return []
+    metric_name, to_value = event
+    return [(row['created_at'], row['device_id'], 'SEN', metric_name, to_value(row['card_uid']))]
+
+
+def map_dht(row: dict) -> List[LogRow]:
+    """DHT11_log: temperature, humidity"""
+    ts, device_id = row['created_at'], row['device_id']
+    return [
+        (ts, device_id, 'SEN', 'TEM', row['temperature']),
+        (ts, device_id, 'SEN', 'HUM', row['humidity']),
+    ]
+
+
+@dataclass
+class LegacySource:
+    """백필 대상 구 테이블"""
+    table: str
+    id_column: str
+    mapper: Callable[[dict], List[LogRow]]
+
+
+LEGACY_SOURCES = [
+    LegacySource('logs', 'log_id', map_generic),
+    LegacySource('log', 'log_id', map_generic),
+    LegacySource('curtain_log', 'id', map_curtain),
+    LegacySource('entrance_log', 'id', map_entrance),
+    LegacySource('DHT11_log', 'id', map_dht),
+]
+
+
+class Backfiller:
+    """구 테이블을 id 키셋 순서로 배치 복사 (backfill_progress로 재개 가능)"""
+
+    INSERT_SQL = (
+        "INSERT INTO log_entries (timestamp, device_id, metric_id, value_num, value_text) "
+        "VALUES (%s, %s, %s, %s, %s)"
+    )
+
+    def __init__(self, db_handler: DatabaseHandler, batch_size: int = 5000):
+        self.db_handler = db_handler
+        self.batch_size = batch_size
+
+    def _last_id(self, cursor, table: str) -> int:
+        cursor.execute("SELECT last_id FROM backfill_progress WHERE source_table = %s", (table,))
+        row = cursor.fetchone()
+        if not row:
+            return 0
+        return row['last_id'] if isinstance(row, dict) else row[0]
+
+    def _to_params(self, cursor, rows: Iterable[LogRow]) -> list:
+        params = []
+        for ts, device_id, data_type, metric_name, value in rows:
+            if value is None:
+                continue
+            metric_id = self.db_handler.metric_id(cursor, data_type, metric_name)
+            value_num, value_text = split_value(value)
+            params.append((ts, device_id, metric_id, value_num, value_text))
+        return params
+
+    def run_batch(self, source: LegacySource) -> int:
+        """한 배치 복사 - 읽은 원본 행 수 반환 (0이면 완료)"""
+        conn = self.db_handler.conn
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            last_id = self._last_id(cursor, source.table)
+            cursor.execute(
+                f"SELECT * FROM `{source.table}` WHERE `{source.id_column}` > %s "
+                f"ORDER BY `{source.id_column}` LIMIT %s",
+                (last_id, self.batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+
+            mapped = [log for row in rows for log in source.mapper(row)]
+            params = self._to_params(cursor, mapped)
+            if params:
+                cursor.executemany(self.INSERT_SQL, params)
+            cursor.execute(
+                "INSERT INTO backfill_progress (source_table, last_id, rows_copied) "
+                "VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE "
+                "last_id = VALUES(last_id), rows_copied = rows_copied + VALUES(rows_copied)",
+                (source.table, rows[-1][source.id_column], len(params))
+            )
+        conn.commit()
+        self.db_handler.commit_metric_ids()
+        return len(rows)
+
+    def run(self, source: LegacySource) -> int:
+        """원본 테이블 끝까지 복사 - 복사한 원본 행 수 반환"""
+        total = 0
+        while True:
+            try:
+                count = self.run_batch(source)
+            except pymysql.err.ProgrammingError as e:
+                # 테이블이 없는 환경 (예: 해당 업로더를 쓰지 않은 DB)
+                print(f"[WARNING] {source.table} 백필 건너뜀: {e}")
+                self.db_handler.conn.rollback()
+                self.db_handler.discard_metric_ids()
+                return total
+            if count == 0:
+                break
+            total += count
+            print(f"[BACKFILL] {source.table}: {total}행 복사")
+        print(f"[✓] {source.table} 백필 완료 ({total}행)")
+        return total
+
+
+def _db_config() -> dict:
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        'host': os.getenv('DB_HOST'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME')
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="통합 로그 스키마 마이그레이션")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status')
+    sub.add_parser('upgrade')
+    backfill = sub.add_parser('backfill')
+    backfill.add_argument('--batch-size', type=int, default=5000)
+    backfill.add_argument('--source', action='append',
+                          choices=[s.table for s in LEGACY_SOURCES])
+    args = parser.parse_args(argv)
+
+    db_handler = DatabaseHandler(**_db_config())
+    if not db_handler.connect():
+        return 1
+
+    try:
+        runner = MigrationRunner(db_handler.conn)
+        if args.command == 'status':
+            applied = runner.applied()
+            for version, path in list_migrations():
+                mark = '✓' if version in applied else ' '
+                print(f"[{mark}] {os.path.basename(path)}")
+        elif args.command == 'upgrade':
+            runner.upgrade()
+        elif args.command == 'backfill':
+            backfiller = Backfiller(db_handler, args.batch_size)
+            for source in LEGACY_SOURCES:
+                if args.source and source.table not in args.source:
+                    continue
+                backfiller.run(source)
+    finally:
+        db_handler.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+-- 001_unified_log.sql
+-- 통합 로그 스키마: 메트릭 차원 테이블 + 타입이 있는 값 컬럼 + (device_id, metric_id, timestamp) 복합 인덱스
+
+CREATE TABLE IF NOT EXISTS metrics (
+    metric_id SMALLINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    data_type VARCHAR(8) NOT NULL,
+    metric_name VARCHAR(50) NOT NULL,
+    unit VARCHAR(16) NULL,
+    PRIMARY KEY (metric_id),
+    UNIQUE KEY uq_metrics_type_name (data_type, metric_name)
+);
+
+CREATE TABLE IF NOT EXISTS log_entries (
+    log_id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    timestamp DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    device_id VARCHAR(50) NOT NULL,
+    metric_id SMALLINT UNSIGNED NOT NULL,
+    value_num DOUBLE NULL,
+    value_text VARCHAR(255) NULL,
+    PRIMARY KEY (log_id),
+    KEY ix_log_device_metric_ts (device_id, metric_id, timestamp)
+);
+
+-- 구 테이블 백필 진행 상황 (중단 후 재개용)
+CREATE TABLE IF NOT EXISTS backfill_progress (
+    source_table VARCHAR(64) NOT NULL,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    rows_copied BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (source_table)
+);
+
+-- 기존 logs 테이블과 같은 모양으로 조회하기 위한 뷰
+CREATE OR REPLACE VIEW log_view AS
+SELECT e.log_id, e.timestamp, e.device_id, m.data_type, m.metric_name,
+       COALESCE(e.value_text, CAST(e.value_num AS CHAR)) AS value,
+       e.value_num, e.value_text
+FROM log_entries e
+JOIN metrics m ON m.metric_id = e.metric_id;
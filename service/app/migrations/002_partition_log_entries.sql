@@ -0,0 +1,43 @@
+-- 002_partition_log_entries.sql
+-- log_entries를 timestamp 범위로 파티셔닝 (보관 기간 정리를 DROP PARTITION으로 처리)
+-- 파티션 키는 모든 유일 키에 포함되어야 하므로 PK를 (log_id, timestamp)로 변경한다.
+-- 기존 행(가장 오래된 행의 달 ~ 이번 달)은 월 파티션으로 나누어 pmax를 비워 둔다.
+-- pmax가 비어 있어야 retention.PartitionManager의 REORGANIZE PARTITION pmax가
+-- 테이블 복사 없이 메타데이터 작업으로 끝난다. 이후 파티션은 PartitionManager가 미리 생성한다.
+
+ALTER TABLE log_entries
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id, timestamp);
+
+SET SESSION group_concat_max_len = 1000000;
+
+SET @first_month = (
+    SELECT CAST(DATE_FORMAT(GREATEST(COALESCE(MIN(timestamp), NOW()), '2000-01-01'), '%Y-%m-01') AS DATE)
+    FROM log_entries
+);
+
+SET @next_month = CAST(DATE_FORMAT(NOW() + INTERVAL 1 MONTH, '%Y-%m-01') AS DATE);
+
+SET @month_partitions = (
+    WITH RECURSIVE months (start) AS (
+        SELECT @first_month
+        UNION ALL
+        SELECT start + INTERVAL 1 MONTH FROM months WHERE start + INTERVAL 1 MONTH < @next_month
+    )
+    SELECT GROUP_CONCAT(
+        CONCAT('PARTITION p', DATE_FORMAT(start, '%Y%m'),
+               ' VALUES LESS THAN (''', start + INTERVAL 1 MONTH, ''')')
+        ORDER BY start SEPARATOR ', ')
+    FROM months
+);
+
+SET @partition_sql = CONCAT(
+    'ALTER TABLE log_entries PARTITION BY RANGE COLUMNS (timestamp) (',
+    'PARTITION p00000000 VALUES LESS THAN (''2000-01-01''), ',
+    @month_partitions, ', ',
+    'PARTITION pmax VALUES LESS THAN (MAXVALUE))'
+);
+
+PREPARE partition_stmt FROM @partition_sql;
+EXECUTE partition_stmt;
+DEALLOCATE PREPARE partition_stmt;
@@ -2,7 +2,9 @@
 """데이터 모델 정의"""
 
 import time
+import uuid
 from dataclasses import dataclass, field
+from typing import Optional, Union
 
 
 @dataclass
@@ -14,6 +16,7 @@ class CMORequest:
     command: str
     timestamp: float = field(default_factory=time.time)
     timeout: float = 10.0
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
     
     def is_expired(self) -> bool:
         return (time.time() - self.timestamp) > self.timeout
@@ -22,6 +25,27 @@ class CMORequest:
         return time.time() - self.timestamp
 
 
+@dataclass
+class LinkConfig:
+    """장치별 시리얼 링크 설정 (port_config 값: 경로 문자열 또는 dict)"""
+    port: str
+    baudrate: int = 9600
+    timeout: float = 1.0  # readline 대기 (초)
+    write_timeout: Optional[float] = None  # None이면 무제한
+    write_buffer: Optional[int] = None  # 드라이버가 지원할 때만 적용 (set_buffer_size)
+    negotiate_baudrate: Optional[int] = None  # 연결 후 CMO,BAUD로 올릴 속도 (펌웨어 지원 시)
+    negotiate_timeout: float = 1.0  # 협상 시도마다 ACK 대기 (초)
+    negotiate_attempts: int = 3  # 포트를 열면 아두이노가 리셋되므로 부팅 중 놓친 요청을 재전송
+    
+    @classmethod
+    def from_config(cls, value: Union[str, dict, 'LinkConfig']) -> 'LinkConfig':
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls(port=value)
+        return cls(**value)
+
+
 @dataclass
 class SerialData:
     """파싱된 시리얼 데이터"""
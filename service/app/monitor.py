@@ -1,76 +1,244 @@
 # monitor.py
 """단일 포트 시리얼 모니터"""
 
+import random
 import serial
-from queue import Queue
+import threading
+import time
+from queue import Full, Queue
 from datetime import datetime
 
-from models import CMORequest
+from models import CMORequest, LinkConfig
 from parser import SerialParser
 from database import DatabaseHandler
+from rules import RoutingTable
 
 
 class SerialMonitor:
-    """단일 포트 모니터"""
+    """단일 포트 모니터
+    
+    연결 상태: connected → (오류) backoff → reconnecting → connected / backoff ...
+    재연결 대기는 backoff_initial부터 두 배씩 backoff_max까지, ±backoff_jitter 비율로 흔든다.
+    포트마다 자기 스레드에서 대기하므로 다른 포트와 명령 큐는 막히지 않는다.
+    """
     
     def __init__(self, device_id: str, port: str, cmd_queue: Queue,
-                 db_handler: DatabaseHandler, baudrate: int = 9600):
+                 db_handler: DatabaseHandler, baudrate: int = 9600, line_parser=None,
+                 link: LinkConfig = None):
         self.device_id = device_id
-        self.port = port
-        self.baudrate = baudrate
+        self.link = link or LinkConfig(port=port, baudrate=baudrate)  # 장치별 링크 설정
+        self.port = self.link.port
+        self.baudrate = self.link.baudrate  # 현재 속도 (협상 후 바뀜)
         self.ser = None
         self.running = False
+        self.closed = False  # close() 이후에는 connect/재연결이 다시 running을 켜지 않음
+        self._state_lock = threading.Lock()  # closed / running 전환
         self.cmd_queue = cmd_queue
         self.db_handler = db_handler
         self.available_devices = []  # app.py에서 할당됨
         self.queue_processor = None  # app.py에서 할당됨 (ACK 처리)
+        self.history_store = None  # app.py에서 할당됨 (최근 이력)
+        self.recording_filter = None  # app.py에서 할당됨 (DB 기록 정책)
+        self.event_hub = None  # app.py에서 할당됨 (대시보드 푸시)
+        self.rules = None  # app.py에서 할당됨 (CMD 라우팅 / 자동화 규칙, rules.RuleEngine)
+        self.climate = None  # app.py에서 할당됨 (실내 환경 제어, climate.ClimateController)
+        self.line_parser = line_parser  # 레거시 형식 장치용 (ingest_plugins), None이면 SerialParser
+        
+        # 연결 상태 / 재연결 (backoff)
+        self.state = 'disconnected'
+        self.backoff_initial = 0.5
+        self.backoff_max = 30.0
+        self.backoff_jitter = 0.2
+        self.reconnect_count = 0
+        self.downtime_total = 0.0
+        self.disconnected_at = None
+        self.last_error = None
+        self._wake = threading.Event()  # close() 시 backoff 대기 즉시 종료
     
     @staticmethod
     def find_target_device(metric_name: str, available_devices: list):
-        """metric_name으로 대상 device_id 찾기"""
-        if metric_name == "FLOOR":
-            prefix = "ele" + "_"
-            
-            for device_id in available_devices:
-                if device_id.startswith(prefix):
-                    return device_id
-        
-        return None
+        """metric_name으로 대상 device_id 찾기 (기본 라우팅, 없는 metric은 이름을 장치 종류로)"""
+        return RoutingTable(devices=available_devices).route(metric_name)
+    
+    def connect(self, quiet: bool = False) -> bool:
+        """포트 연결 (close()된 모니터는 다시 연결하지 않음)"""
+        if self.closed:
+            return False
+        link = self.link
+        try:
+            # exclusive - 다른 프로세스(핫플러그 감지, 다른 인스턴스)가 같은 포트를 열지 못하게
+            ser = serial.Serial(self.port, link.baudrate, timeout=link.timeout,
+                                write_timeout=link.write_timeout, exclusive=True)
+        except (serial.SerialException, OSError) as e:
+            self.last_error = str(e)
+            if not quiet:
+                print(f"[✗] {self.port} 연결 실패: {e}")
+            return False
+        print(f"[✓] {self.port} 연결 성공 ({link.baudrate} bps)")
+        return self.adopt(ser, quiet)
     
-    def connect(self) -> bool:
-        """포트 연결"""
+    def adopt(self, ser, quiet: bool = False) -> bool:
+        """열린 포트 사용 (connect 또는 핫플러그 식별에서 넘겨받은 포트)
+        
+        식별에 쓴 포트는 식별기의 속도/timeout으로 열려 있으므로 이 장치의 링크 설정
+        (baudrate, timeout, write_timeout, write_buffer)을 적용한 뒤 속도를 협상한다.
+        """
+        link = self.link
+        self.ser = ser
         try:
-            self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-            self.running = True
-            print(f"[✓] {self.port} 연결 성공")
+            if self.closed:
+                raise serial.SerialException("monitor closed")
+            ser.baudrate = link.baudrate
+            ser.timeout = link.timeout
+            ser.write_timeout = link.write_timeout
+            self.baudrate = link.baudrate
+            if link.write_buffer and hasattr(ser, 'set_buffer_size'):
+                ser.set_buffer_size(tx_size=link.write_buffer)
+            if link.negotiate_baudrate:
+                self.negotiate()
+            with self._state_lock:
+                if self.closed:
+                    # 연결하는 동안 close()됨 - 방금 연 포트를 닫고 되살리지 않음
+                    ser.close()
+                    self.ser = None
+                    return False
+                self.running = True
+                self.state = 'connected'
             return True
-        except serial.SerialException as e:
-            print(f"[✗] {self.port} 연결 실패: {e}")
+        except (serial.SerialException, OSError) as e:
+            self.last_error = str(e)
+            try:
+                ser.close()
+            except Exception:
+                pass
+            self.ser = None
+            if not quiet and not self.closed:
+                print(f"[✗] {self.port} 연결 실패: {e}")
             return False
     
+    def negotiate(self) -> bool:
+        """CMO,BAUD,<속도> 전송 → ACK,BAUD,<속도>를 받으면 양쪽 모두 새 속도로 전환
+        
+        ACK는 기존 속도로 오고 장치는 ACK를 보낸 직후 전환한다.
+        응답이 없으면(지원하지 않는 펌웨어) 기존 속도를 유지한다.
+        """
+        rate = self.link.negotiate_baudrate
+        if not rate or rate == self.baudrate:
+            return False
+        
+        expected = f"ACK,BAUD,{rate}"
+        for _ in range(self.link.negotiate_attempts):
+            self.ser.write(f"CMO,BAUD,{rate}\n".encode('utf-8'))
+            deadline = time.monotonic() + self.link.negotiate_timeout
+            while time.monotonic() < deadline:
+                line = self.ser.readline().decode('utf-8', errors='ignore').strip()
+                if line == expected:
+                    self.ser.baudrate = rate
+                    self.baudrate = rate
+                    print(f"[✓] {self.port} 속도 협상: {self.link.baudrate} → {rate} bps")
+                    return True
+                if line:
+                    self._process_data(line)  # 협상 중 들어온 데이터도 처리
+        
+        print(f"[○] {self.port} 속도 협상 응답 없음 - {self.baudrate} bps 유지")
+        return False
+    
     def run(self):
-        """데이터 수신 및 처리"""
+        """데이터 수신 및 처리 (연결되어 있지 않으면 backoff 후 재연결)"""
         while self.running:
+            if not self.ser or not self.ser.is_open:
+                self._reconnect()
+                continue
+            
             try:
-                if self.ser and self.ser.in_waiting > 0:
-                    line = self.ser.readline().decode('utf-8').strip()
-                    if not line:
-                        continue
-                    
-                    self._log_received(line)
-                    self._process_data(line)
+                # timeout(1초)까지 대기하는 readline - 수신이 없을 때 바쁜 대기 없음
+                line = self.ser.readline().decode('utf-8').strip()
+                if not line:
+                    continue
+                
+                self._log_received(line)
+                self._process_data(line)
             
             except UnicodeDecodeError:
                 continue
             except Exception as e:
-                print(f"[ERROR] {self.port} 오류: {e}")
+                if not self.running:
+                    break  # close()로 읽는 중인 포트가 닫힘
+                if isinstance(e, (serial.SerialException, OSError)):
+                    self._mark_disconnected(e)
+                else:
+                    print(f"[ERROR] {self.port} 오류: {e}")
+    
+    def _mark_disconnected(self, error):
+        """오류 난 핸들을 닫고 backoff 상태로"""
+        print(f"[ERROR] {self.port} 연결 끊김: {error}")
+        self.last_error = str(error)
+        if self.disconnected_at is None:
+            self.disconnected_at = time.time()
+        self.state = 'backoff'
+        try:
+            if self.ser:
+                self.ser.close()
+        except Exception:
+            pass
+        self.ser = None
+    
+    def backoff_delay(self, attempt: int) -> float:
+        """attempt번째 재시도 전 대기 시간 (지수 증가, 상한, jitter)"""
+        delay = min(self.backoff_max, self.backoff_initial * (2 ** attempt))
+        return delay * random.uniform(1 - self.backoff_jitter, 1 + self.backoff_jitter)
+    
+    def _reconnect(self):
+        """성공하거나 close()될 때까지 backoff 간격으로 재연결"""
+        if self.disconnected_at is None:
+            self.disconnected_at = time.time()
+        attempt = 0
+        while self.running:
+            self.state = 'backoff'
+            delay = self.backoff_delay(attempt)
+            if self._wake.wait(delay) or not self.running:
+                break
+            
+            self.state = 'reconnecting'
+            if self.connect(quiet=True):
+                downtime = time.time() - self.disconnected_at
+                self.downtime_total += downtime
+                self.reconnect_count += 1
+                self.disconnected_at = None
+                print(f"[✓] {self.port} 재연결 ({attempt + 1}회 시도, {downtime:.1f}초 끊김)")
+                return
+            
+            attempt += 1
+            print(f"[RECONNECT] {self.port} 재연결 실패 {attempt}회: {self.last_error} "
+                  f"(다음 시도 약 {min(self.backoff_max, self.backoff_initial * 2 ** attempt):.1f}초 후)")
+    
+    def health(self) -> dict:
+        """연결 상태 / 재연결 횟수 / 끊긴 시간"""
+        downtime = self.downtime_total
+        if self.disconnected_at is not None:
+            downtime += time.time() - self.disconnected_at
+        return {
+            'port': self.port,
+            'state': self.state,
+            'baudrate': self.baudrate,
+            'reconnects': self.reconnect_count,
+            'downtime_sec': round(downtime, 1),
+            'last_error': self.last_error,
+        }
     
     def _process_data(self, line: str):
         """수신 데이터 처리"""
-        parsed = SerialParser.parse(line, self.device_id)
-        if not parsed:
-            return
+        if self.line_parser:
+            records = self.line_parser(line, self.device_id)
+        else:
+            parsed = SerialParser.parse(line, self.device_id)
+            records = [parsed] if parsed else []
         
+        for parsed in records:
+            self._dispatch(parsed)
+    
+    def _dispatch(self, parsed):
+        """파싱된 데이터 처리 (상태 갱신, 푸시, 종류별 처리)"""
         if hasattr(self, 'system_state') and self.system_state:
             self.system_state.update(
                 parsed.device_id,
@@ -79,6 +247,15 @@ class SerialMonitor:
                 parsed.value
         )
         
+        if self.event_hub:
+            self.event_hub.publish('state', {
+                'device_id': parsed.device_id,
+                'data_type': parsed.data_type,
+                'metric_name': parsed.metric_name,
+                'value': parsed.value,
+                'ts': time.time()
+            })
+        
         if parsed.data_type == 'CMD':
             self._handle_cmd(parsed)
         
@@ -87,11 +264,24 @@ class SerialMonitor:
         
         elif parsed.data_type == 'ACK':
             self._handle_ack(parsed)
+        
+        # 자동화 규칙 (일치하는 규칙이 없으면 dict 조회 한 번)
+        if self.rules:
+            for cmo in self.rules.evaluate(parsed):
+                self._enqueue(cmo, f"규칙 {parsed.metric_name}={parsed.value}")
+        
+        # 실내 환경 제어 (상태가 바뀔 때만 명령)
+        if self.climate:
+            for cmo in self.climate.evaluate(parsed):
+                self._enqueue(cmo, f"환경 제어 {parsed.metric_name}={parsed.value}")
     
     def _handle_cmd(self, parsed):
         """CMD 처리 - metric_name으로 target device 찾음"""
-        # 1. metric_name에 해당하는 device_id 찾기
-        target_device_id = self.find_target_device(parsed.metric_name, self.available_devices)
+        # 1. metric_name에 해당하는 device_id 찾기 (색인된 라우팅 테이블)
+        if self.rules:
+            target_device_id = self.rules.route(parsed.metric_name)
+        else:
+            target_device_id = self.find_target_device(parsed.metric_name, self.available_devices)
         
         if not target_device_id:
             print(f"[ERROR] metric_name '{parsed.metric_name}'에 해당하는 device를 찾을 수 없음")
@@ -107,11 +297,29 @@ class SerialMonitor:
             value=parsed.value,
             command=cmo_command
         )
-        self.cmd_queue.put(cmo)
-        print(f"[QUEUE] CMO 큐에 추가: {target_device_id} (요청자: {self.device_id})")
+        self._enqueue(cmo, f"요청자: {self.device_id}")
+    
+    def _enqueue(self, cmo: CMORequest, source: str):
+        """CMO 요청을 명령 큐에 추가 (큐가 가득 차면 버림, 명령 큐가 없는 수집 전용 모니터는 무시)"""
+        if self.cmd_queue is None:
+            print(f"[QUEUE] 명령 큐 없음 - CMO 무시: {cmo.command} ({source})")
+            return
+        try:
+            self.cmd_queue.put(cmo)
+        except Full as e:
+            print(f"[QUEUE] CMO 거절: {e} ({source})")
+            return
+        print(f"[QUEUE] CMO 큐에 추가: {cmo.device_id} ({source})")
     
     def _handle_sen(self, parsed):
         """센서 데이터 처리"""
+        if self.history_store:
+            self.history_store.append(parsed.device_id, parsed.metric_name, parsed.value)
+        
+        if self.recording_filter and not self.recording_filter.should_record(
+                parsed.device_id, parsed.metric_name, parsed.value):
+            return
+        
         self.db_handler.insert_log(parsed.device_id, parsed.data_type,
                                   parsed.metric_name, parsed.value)
     
@@ -121,7 +329,7 @@ class SerialMonitor:
         
         # queue_processor에 ACK 처리 요청
         if self.queue_processor:
-            self.queue_processor.handle_ack(parsed.device_id, parsed.metric_name)
+            self.queue_processor.handle_ack(parsed.device_id, parsed.metric_name, parsed.value)
     
     def _log_received(self, data: str):
         """수신 로그"""
@@ -143,7 +351,11 @@ class SerialMonitor:
     
     def close(self):
         """연결 종료"""
-        self.running = False
+        with self._state_lock:
+            self.closed = True
+            self.running = False
+            self.state = 'closed'
+        self._wake.set()
         if self.ser and self.ser.is_open:
             self.ser.close()
             print(f"[○] {self.port} 연결 종료")
\ No newline at end of file
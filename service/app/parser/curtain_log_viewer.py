@@ -2,7 +2,16 @@ import os
 import sys
 from datetime import datetime, timedelta
 
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt5.QtCore import (
+    Qt,
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QThread,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
 from PyQt5.QtWidgets import (
     QApplication,
     QHBoxLayout,
@@ -31,13 +40,80 @@ COLUMNS = [
 ]
 
 
+PAGE_SIZE = 500
+
+
+def _metric_id(metric_name):
+    return f"(SELECT metric_id FROM metrics WHERE data_type = 'SEN' AND metric_name = '{metric_name}')"
+
+
+def _following(metric_name, column):
+    """같은 장치에서 LIGHT 행 이후 1초 안의 첫 metric_name 값 (레거시 커튼은 한 줄이 4개 메트릭으로 저장됨)"""
+    return (
+        f"(SELECT CAST(x.value_num AS SIGNED) FROM log_entries x "
+        f"WHERE x.device_id = e.device_id AND x.metric_id = {_metric_id(metric_name)} "
+        f"AND x.timestamp >= e.timestamp AND x.timestamp < e.timestamp + INTERVAL 1 SECOND "
+        f"ORDER BY x.timestamp LIMIT 1) AS {column}"
+    )
+
+
+# log_entries(migration 001)에서 LIGHT 행 하나를 curtain_log 한 행으로 조회 (id = LIGHT 행의 log_id)
+CURTAIN_QUERY = (
+    "SELECT e.log_id AS id, e.device_id, e.timestamp AS created_at, "
+    "CAST(e.value_num AS SIGNED) AS light_value, "
+    + _following("MOTOR_DIR", "motor_direction") + ", "
+    + _following("CUR_STEP", "current_step") + ", "
+    + _following("MAX_STEP", "max_steps") + " "
+    "FROM log_entries e WHERE e.metric_id = " + _metric_id("LIGHT")
+)
+
+
+def format_cell(value):
+    """표시 문자열 (행을 받을 때 한 번만 변환)"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value) if value is not None else ""
+
+
 class CurtainLogTableModel(QAbstractTableModel):
+    """id 내림차순 로그 모델
+
+    행은 컬럼별 표시 문자열 리스트로 저장하여 data()에서 변환하지 않는다.
+    아래로 스크롤하면 fetchMore가 fetch_older(before_id, count)로 다음 페이지를 요청하고,
+    결과는 비동기로 appendRows에 전달된다 (요청 중에는 canFetchMore가 False).
+    """
+
     def __init__(self, rows=None, parent=None):
         super().__init__(parent)
-        self._rows = rows or []
+        self.fetch_older = None  # (before_id, count) -> rows, 뷰어에서 할당
+        self.limit = None        # 최대 보관 행 수
+        self._clear()
+        if rows:
+            self._insert(0, rows)
+
+    def _clear(self):
+        self._ids = []
+        self._created = []
+        self._columns = [[] for _ in COLUMNS]
+        self._exhausted = False
+        self._fetching = False
+
+    def _insert(self, position, rows):
+        self._ids[position:position] = [row["id"] for row in rows]
+        self._created[position:position] = [row.get("created_at") for row in rows]
+        for col, col_name in enumerate(COLUMNS):
+            self._columns[col][position:position] = [format_cell(row.get(col_name)) for row in rows]
+
+    def _remove_from(self, position):
+        del self._ids[position:]
+        del self._created[position:]
+        for column in self._columns:
+            del column[position:]
 
     def rowCount(self, parent=QModelIndex()):  # type: ignore[override]
-        return len(self._rows)
+        if parent.isValid():
+            return 0
+        return len(self._ids)
 
     def columnCount(self, parent=QModelIndex()):  # type: ignore[override]
         return len(COLUMNS)
@@ -45,12 +121,7 @@ class CurtainLogTableModel(QAbstractTableModel):
     def data(self, index, role=Qt.DisplayRole):  # type: ignore[override]
         if not index.isValid() or role != Qt.DisplayRole:
             return None
-        row = self._rows[index.row()]
-        col_name = COLUMNS[index.column()]
-        value = row.get(col_name)
-        if isinstance(value, datetime):
-            return value.strftime("%Y-%m-%d %H:%M:%S")
-        return str(value) if value is not None else ""
+        return self._columns[index.column()][index.row()]
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):  # type: ignore[override]
         if role != Qt.DisplayRole:
@@ -59,19 +130,173 @@ class CurtainLogTableModel(QAbstractTableModel):
             return COLUMNS[section]
         return str(section + 1)
 
-    def setRows(self, rows):
+    def canFetchMore(self, parent=QModelIndex()):  # type: ignore[override]
+        if parent.isValid() or self._exhausted or self._fetching:
+            return False
+        if self.fetch_older is None or not self._ids:
+            return False
+        return self.limit is None or len(self._ids) < self.limit
+
+    def fetchMore(self, parent=QModelIndex()):  # type: ignore[override]
+        """마지막(가장 오래된) 행 이전 페이지 요청"""
+        count = PAGE_SIZE
+        if self.limit is not None:
+            count = min(count, self.limit - len(self._ids))
+        self._fetching = True
+        self.fetch_older(self._ids[-1], count)
+
+    def cancelFetch(self):
+        """페이지 요청 실패 시 다시 요청할 수 있도록 해제"""
+        self._fetching = False
+
+    def setRows(self, rows, exhausted=False):
         self.beginResetModel()
-        self._rows = rows
+        self._clear()
+        self._insert(0, rows)
+        self._exhausted = exhausted
         self.endResetModel()
 
+    def appendRows(self, rows, exhausted=False):
+        """더 오래된 페이지를 맨 아래에 추가"""
+        self._fetching = False
+        if rows:
+            position = len(self._ids)
+            self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+            self._insert(position, rows)
+            self.endInsertRows()
+        if exhausted:
+            self._exhausted = True
+
+    def maxId(self):
+        """가장 최근 행의 id (행은 id 내림차순)"""
+        return self._ids[0] if self._ids else None
+
+    def prependRows(self, rows):
+        """새 행(id 내림차순)을 맨 위에 삽입 - 기존 행은 다시 그리지 않음"""
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self._insert(0, rows)
+        self.endInsertRows()
+
+    def trim(self, since_time, limit):
+        """시간 창을 벗어났거나 limit을 넘는 오래된 행을 아래쪽부터 제거"""
+        keep = min(len(self._ids), limit)
+        while keep > 0:
+            created_at = self._created[keep - 1]
+            if created_at is None or created_at >= since_time:
+                break
+            keep -= 1
+        if keep < len(self._ids):
+            if keep < limit:
+                # 시간 창 밖으로 밀려난 행 이전은 더 조회할 필요 없음
+                self._exhausted = True
+            self.beginRemoveRows(QModelIndex(), keep, len(self._ids) - 1)
+            self._remove_from(keep)
+            self.endRemoveRows()
+
+
+def load_connection_params():
+    # 1) tools/.env 파일이 있으면 먼저 읽어서 os.environ에 채운다.
+    env_path = os.path.join(os.path.dirname(__file__), ".env")
+    if os.path.exists(env_path):
+        try:
+            with open(env_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    if "=" not in line:
+                        continue
+                    key, value = line.split("=", 1)
+                    key = key.strip()
+                    value = value.strip().strip("'\"")
+                    if key and key not in os.environ:
+                        os.environ[key] = value
+        except Exception:
+            # env 파일 읽기 실패 시에는 조용히 무시하고, 기존 환경변수만 사용
+            pass
+
+    host = os.getenv("CURTAIN_DB_HOST")
+    port = int(os.getenv("CURTAIN_DB_PORT", "3306"))
+    user = os.getenv("CURTAIN_DB_USER")
+    password = os.getenv("CURTAIN_DB_PASSWORD")
+    db_name = os.getenv("CURTAIN_DB_NAME", "ioclean")
+
+    missing = [
+        name
+        for name, value in [
+            ("CURTAIN_DB_HOST", host),
+            ("CURTAIN_DB_USER", user),
+            ("CURTAIN_DB_PASSWORD", password),
+        ]
+        if not value
+    ]
+    if missing:
+        raise RuntimeError(
+            "환경변수 설정 필요: " + ", ".join(missing)
+        )
+
+    return dict(
+        host=host,
+        port=port,
+        user=user,
+        password=password,
+        database=db_name,
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+    )
+
+
+class LogQueryWorker(QObject):
+    """전용 DB 스레드에서 자기 연결로 쿼리를 실행하고 결과를 시그널로 전달"""
+
+    finished = pyqtSignal(int, object)  # request_id, rows
+    failed = pyqtSignal(int, str)       # request_id, error
+
+    def __init__(self, connection_params):
+        super().__init__()
+        self.connection_params = connection_params
+        self.connection = None
+
+    @pyqtSlot(int, str, object)
+    def run_query(self, request_id, sql, params):
+        try:
+            if self.connection is None:
+                self.connection = pymysql.connect(**self.connection_params)
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = list(cursor.fetchall())
+        except Exception as e:
+            # 다음 요청에서 새로 연결
+            self.close()
+            self.failed.emit(request_id, str(e))
+            return
+        self.finished.emit(request_id, rows)
+
+    @pyqtSlot()
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
 
 class CurtainLogViewer(QMainWindow):
+    query_requested = pyqtSignal(int, str, object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Curtain Log Viewer")
         self.resize(1000, 600)
 
-        self.connection = None
+        self._filter_key = None  # 마지막 전체 조회 시 필터 (바뀌면 전체 재조회)
+        self._generation = 0     # 전체 재조회마다 증가 (이전 필터의 늦은 결과 무시)
+        self._next_request_id = 0
+        self._pending = {}       # request_id -> (kind, generation, context)
+        self.skipped_refreshes = 0
 
         # Top filter area
         filter_widget = QWidget()
@@ -85,7 +310,7 @@ class CurtainLogViewer(QMainWindow):
         self.minutes_spin.setValue(60)
 
         self.limit_spin = QSpinBox()
-        self.limit_spin.setRange(1, 10000)
+        self.limit_spin.setRange(1, 1000000)
         self.limit_spin.setValue(200)
 
         refresh_button = QPushButton("최근 데이터 갱신")
@@ -102,6 +327,7 @@ class CurtainLogViewer(QMainWindow):
         # Table
         self.table = QTableView()
         self.model = CurtainLogTableModel([])
+        self.model.fetch_older = self.fetch_older
         self.table.setModel(self.model)
         self.table.setSortingEnabled(True)
         self.table.setAlternatingRowColors(True)
@@ -112,13 +338,22 @@ class CurtainLogViewer(QMainWindow):
         main_layout.addWidget(self.table)
         self.setCentralWidget(central)
 
-        # Open DB and initial load
+        # DB 설정 확인 후 전용 DB 스레드 시작
         try:
-            self.connection = self.create_connection()
+            connection_params = load_connection_params()
         except Exception as e:  # pragma: no cover - UI dialog
             QMessageBox.critical(self, "DB 연결 오류", str(e))
             sys.exit(1)
 
+        self.db_thread = QThread(self)
+        self.worker = LogQueryWorker(connection_params)
+        self.worker.moveToThread(self.db_thread)
+        self.query_requested.connect(self.worker.run_query)
+        self.worker.finished.connect(self._on_query_finished)
+        self.worker.failed.connect(self._on_query_failed)
+        self.db_thread.finished.connect(self.worker.close)
+        self.db_thread.start()
+
         # 초기 1회 조회 후, 5초마다 자동 새로고침
         self.refresh_data()
 
@@ -127,89 +362,95 @@ class CurtainLogViewer(QMainWindow):
         self.timer.timeout.connect(self.refresh_data)
         self.timer.start()
 
-    def create_connection(self):
-        # 1) tools/.env 파일이 있으면 먼저 읽어서 os.environ에 채운다.
-        env_path = os.path.join(os.path.dirname(__file__), ".env")
-        if os.path.exists(env_path):
-            try:
-                with open(env_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or line.startswith("#"):
-                            continue
-                        if "=" not in line:
-                            continue
-                        key, value = line.split("=", 1)
-                        key = key.strip()
-                        value = value.strip().strip("'\"")
-                        if key and key not in os.environ:
-                            os.environ[key] = value
-            except Exception:
-                # env 파일 읽기 실패 시에는 조용히 무시하고, 기존 환경변수만 사용
-                pass
+    def closeEvent(self, event):  # type: ignore[override]
+        self.timer.stop()
+        self.db_thread.quit()
+        self.db_thread.wait()
+        super().closeEvent(event)
 
-        host = os.getenv("CURTAIN_DB_HOST")
-        port = int(os.getenv("CURTAIN_DB_PORT", "3306"))
-        user = os.getenv("CURTAIN_DB_USER")
-        password = os.getenv("CURTAIN_DB_PASSWORD")
-        db_name = os.getenv("CURTAIN_DB_NAME", "ioclean")
-
-        missing = [
-            name
-            for name, value in [
-                ("CURTAIN_DB_HOST", host),
-                ("CURTAIN_DB_USER", user),
-                ("CURTAIN_DB_PASSWORD", password),
-            ]
-            if not value
-        ]
-        if missing:
-            raise RuntimeError(
-                "환경변수 설정 필요: " + ", ".join(missing)
-            )
-
-        return pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=db_name,
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor,
-        )
+    def _submit(self, kind, condition, params, count, context=None):
+        """현재 device_id 필터를 더해 id 내림차순 count행 조회를 DB 스레드에 요청"""
+        device_id = self.device_edit.text().strip()
+        sql = CURTAIN_QUERY + " AND " + condition
+        params = list(params)
+
+        if device_id:
+            sql += " AND e.device_id = %s"
+            params.append(device_id)
+
+        sql += " ORDER BY e.log_id DESC LIMIT %s"
+        params.append(count)
+
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        self._pending[request_id] = (kind, self._generation, context)
+        self.query_requested.emit(request_id, sql, params)
+
+    def _since_time(self):
+        # log_entries.timestamp는 서비스의 수신 시각 (로컬 시간)
+        return datetime.now() - timedelta(minutes=self.minutes_spin.value())
+
+    def fetch_older(self, before_id, count):
+        """스크롤 시 다음 페이지: 시간 창 안에서 before_id보다 오래된 행 (키셋)"""
+        self._submit("page", "e.log_id < %s AND e.timestamp >= %s",
+                     [before_id, self._since_time()], count, count)
 
     def refresh_data(self):
-        print("refresh_data called", datetime.now())
+        """필터가 그대로면 마지막 id 이후 행만 가져오고, 바뀌었으면 첫 페이지부터 재조회
 
-        if self.connection is None:
+        이전 갱신 쿼리가 아직 끝나지 않았으면 이번 갱신은 건너뛴다.
+        """
+        if any(kind != "page" for kind, _, _ in self._pending.values()):
+            self.skipped_refreshes += 1
             return
 
         device_id = self.device_edit.text().strip()
         minutes = self.minutes_spin.value()
         limit = self.limit_spin.value()
 
-        since_time = datetime.utcnow() - timedelta(minutes=minutes)
-
-        sql = "SELECT id, device_id, created_at, light_value, motor_direction, current_step, max_steps " \
-              "FROM curtain_log WHERE created_at >= %s"
-        params = [since_time]
-
-        if device_id:
-            sql += " AND device_id = %s"
-            params.append(device_id)
-
-        sql += " ORDER BY created_at DESC LIMIT %s"
-        params.append(limit)
-
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                rows = cursor.fetchall()
-        except Exception as e:  # pragma: no cover - UI dialog
-            QMessageBox.critical(self, "조회 오류", str(e))
+        since_time = self._since_time()
+        filter_key = (device_id, minutes, limit)
+        last_id = self.model.maxId()
+        self.model.limit = limit
+
+        if filter_key == self._filter_key and last_id is not None:
+            # 키셋 조회: PK 범위 탐색이므로 비용이 새 행 수에 비례
+            self._submit("refresh", "e.log_id > %s", [last_id], limit, (since_time, limit))
+        else:
+            # 첫 페이지만 조회, 나머지는 스크롤 시 fetchMore
+            self._generation += 1
+            self._filter_key = filter_key
+            count = min(PAGE_SIZE, limit)
+            self._submit("reload", "e.timestamp >= %s", [since_time], count, count)
+
+    def _on_query_finished(self, request_id, rows):
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
             return
-
-        self.model.setRows(rows)
+        kind, generation, context = pending
+        if generation != self._generation:
+            return  # 필터가 바뀌기 전 요청
+
+        if kind == "reload":
+            self.model.setRows(rows, exhausted=len(rows) < context)
+        elif kind == "refresh":
+            since_time, limit = context
+            self.model.prependRows(rows)
+            self.model.trim(since_time, limit)
+        elif kind == "page":
+            self.model.appendRows(rows, exhausted=len(rows) < context)
+        self.statusBar().clearMessage()
+
+    def _on_query_failed(self, request_id, error):
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return
+        kind, generation, _ = pending
+        if kind == "page" and generation == self._generation:
+            self.model.cancelFetch()
+        elif kind == "reload" and generation == self._generation:
+            self._filter_key = None  # 다음 갱신에서 다시 전체 조회
+        self.statusBar().showMessage(f"조회 오류: {error}")
 
 
 def main():
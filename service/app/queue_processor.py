@@ -1,20 +1,40 @@
 # queue_processor.py
 """CMD 큐 처리 및 CMO 전송"""
 
-from typing import Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
 from queue import Queue, Empty
 
 from models import CMORequest
 
 
 class QueueProcessor:
-    """CMO 큐 처리 및 전송, ACK 대기"""
+    """CMO 큐 처리 및 전송, ACK 대기
     
-    def __init__(self, cmd_queue: Queue, monitors: Dict[str, object]):
+    요청마다 request_id 기준으로 처리 결과를 남긴다 (최근 max_results개).
+    상태: queued → sent → acked / timeout, 또는 failed / superseded
+          다른 게이트웨이 장치면 forwarded (결과는 그 노드의 remote_request_id로 조회)
+          전송 전에 큐에서 빠지면 rejected / dropped / expired / superseded (lanes.py)
+    """
+    
+    # ACK 값으로 요청을 구분하는 메트릭 (엘리베이터는 층마다 따로 ACK,FLOOR,n)
+    VALUE_KEYED_METRICS = {'FLOOR', 'CANCEL'}
+    
+    def __init__(self, cmd_queue: Queue, monitors: Dict[str, object], max_results: int = 1000):
         self.cmd_queue = cmd_queue
         self.monitors = monitors  # device_id -> SerialMonitor
         self.running = False
         self.pending_requests = {}  # device_id:metric_name -> CMORequest (전송 대기 중)
+        self.results = OrderedDict()  # request_id -> 처리 결과
+        self.max_results = max_results
+        self.lock = threading.Lock()
+        self.event_hub = None  # app.py에서 할당됨 (처리 결과 푸시)
+        self.forwarder = None  # app.py에서 할당됨 (클러스터: 다른 게이트웨이 장치로 CMO 전달)
+        self.forward_owner = None  # app.py에서 할당됨 (device_id -> 소유 노드 id, 로컬/모르는 장치는 None)
+        self.forward_lanes: Dict[str, Queue] = {}  # 소유 노드별 전달 대기열 (노드마다 전달 스레드 하나)
+        self.journal = None  # app.py에서 할당됨 (상태 변화를 파일에 기록 - 재시작 복구용)
     
     def run(self):
         """큐 처리"""
@@ -26,11 +46,57 @@ class QueueProcessor:
                 self._process_cmo(cmo)
             
             except Empty:
-                # 타임아웃 확인
-                self._check_pending_timeouts()
-                continue
+                pass
             except Exception as e:
                 print(f"[ERROR] 큐 처리 오류: {e}")
+            
+            # 타임아웃 확인 (큐가 계속 차 있어도 확인되도록 매번)
+            self._check_pending_timeouts()
+    
+    def _pending_key(self, device_id: str, metric_name: str, value: Optional[str] = None) -> str:
+        if value is not None and metric_name in self.VALUE_KEYED_METRICS:
+            return f"{device_id}:{metric_name}:{value}"
+        return f"{device_id}:{metric_name}"
+    
+    def _set_status(self, cmo: CMORequest, status: str, **fields):
+        """요청 처리 결과 갱신 (lock 안에서 호출)"""
+        result = self.results.get(cmo.request_id)
+        if result is None:
+            result = {
+                'request_id': cmo.request_id,
+                'device_id': cmo.device_id,
+                'metric_name': cmo.metric_name,
+                'value': cmo.value,
+                'queued_at': cmo.timestamp,
+                'sent_at': None,
+                'acked_at': None,
+                'rtt': None,
+            }
+            self.results[cmo.request_id] = result
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+        result['status'] = status
+        result.update(fields)
+        if self.journal:
+            self.journal.record(cmo, status)  # 메모리 버퍼에만 추가 (파일 기록/fsync는 저널 기록 스레드)
+        if self.event_hub:
+            self.event_hub.publish('command', dict(result))
+    
+    def track(self, cmo: CMORequest):
+        """큐에 넣은 요청 등록 (상태: queued)"""
+        with self.lock:
+            self._set_status(cmo, 'queued')
+    
+    def discard(self, cmo: CMORequest, status: str):
+        """전송하지 않고 큐에서 빠진 요청 기록"""
+        with self.lock:
+            self._set_status(cmo, status)
+    
+    def get_result(self, request_id: str) -> Optional[dict]:
+        """request_id의 처리 결과 (없으면 None)"""
+        with self.lock:
+            result = self.results.get(request_id)
+            return dict(result) if result else None
     
     def _process_cmo(self, cmo: CMORequest):
         """
@@ -38,51 +104,119 @@ class QueueProcessor:
         """
         target_device_id = cmo.device_id
         
+        if target_device_id not in self.monitors and self.forwarder and self._forward(cmo):
+            return
+        
         if target_device_id not in self.monitors:
             print(f"[ERROR] device_id '{target_device_id}'에 대한 모니터가 없음")
+            with self.lock:
+                self._set_status(cmo, 'failed', error='device not found')
             return
         
         # 명령 전송
         monitor = self.monitors[target_device_id]
         if monitor.send_command(cmo.command):
             # 전송 성공 -> pending 목록에 추가 (ACK 대기)
-            key = f"{target_device_id}:{cmo.metric_name}"
-            self.pending_requests[key] = cmo
+            key = self._pending_key(target_device_id, cmo.metric_name, cmo.value)
+            with self.lock:
+                previous = self.pending_requests.get(key)
+                if previous is not None:
+                    self._set_status(previous, 'superseded')
+                self.pending_requests[key] = cmo
+                self._set_status(cmo, 'sent', sent_at=time.time())
             print(f"[SEND] CMO 전송: {cmo.command}")
         else:
+            with self.lock:
+                self._set_status(cmo, 'failed', error='send failed')
             print(f"[ERROR] CMO 전송 실패: {cmo.command}")
     
+    def _forward(self, cmo: CMORequest) -> bool:
+        """다른 게이트웨이 장치의 CMO를 소유 노드 전달 스레드에 넘김 (소유 노드가 없으면 False)
+        
+        전달은 HTTP 요청(최대 cluster timeout초)이라 큐 처리 스레드에서 하지 않는다 -
+        응답 없는 노드가 로컬 장치 명령이나 다른 노드로의 전달을 막지 않도록 노드별로 나눔.
+        """
+        node_id = self.forward_owner(cmo.device_id) if self.forward_owner else ''
+        if node_id is None:
+            return False
+        
+        with self.lock:
+            lane = self.forward_lanes.get(node_id)
+            if lane is None:
+                lane = self.forward_lanes[node_id] = Queue()
+                threading.Thread(
+                    target=self._forward_loop,
+                    args=(lane,),
+                    daemon=True,
+                    name=f"Forward-{node_id or 'cluster'}"
+                ).start()
+        lane.put(cmo)
+        return True
+    
+    def _forward_loop(self, lane: Queue):
+        """노드별 전달 스레드 - None을 받으면 종료"""
+        while True:
+            cmo = lane.get()
+            if cmo is None:
+                return
+            try:
+                forwarded = self.forwarder(cmo)
+            except Exception as e:
+                print(f"[ERROR] CMO 전달 오류: {e}")
+                forwarded = None
+            
+            with self.lock:
+                if forwarded is not None:
+                    self._set_status(cmo, 'forwarded', node=forwarded.get('node'),
+                                     remote_request_id=forwarded.get('request_id'))
+                else:
+                    self._set_status(cmo, 'failed', error='forward failed')
+            if forwarded is not None:
+                print(f"[SEND] CMO 전달: {cmo.command} → {forwarded.get('node')}")
+            else:
+                print(f"[ERROR] CMO 전달 실패: {cmo.command}")
+    
     def _check_pending_timeouts(self):
         """
         5. 타임아웃 확인 - ACK가 없으면 삭제 및 에러 로그
         """
-        expired_keys = []
-        
-        for key, cmo in self.pending_requests.items():
-            if cmo.is_expired():
-                expired_keys.append(key)
-                device_id = cmo.device_id
-                metric_name = cmo.metric_name
-                print(f"[TIMEOUT] ACK 응답 없음: {device_id},{metric_name} (경과: {cmo.elapsed_time():.1f}초)")
-        
-        # 만료된 요청 제거
-        for key in expired_keys:
-            del self.pending_requests[key]
+        with self.lock:
+            expired_keys = []
+            
+            for key, cmo in self.pending_requests.items():
+                if cmo.is_expired():
+                    expired_keys.append(key)
+                    device_id = cmo.device_id
+                    metric_name = cmo.metric_name
+                    print(f"[TIMEOUT] ACK 응답 없음: {device_id},{metric_name} (경과: {cmo.elapsed_time():.1f}초)")
+            
+            # 만료된 요청 제거
+            for key in expired_keys:
+                self._set_status(self.pending_requests.pop(key), 'timeout')
     
-    def handle_ack(self, device_id: str, metric_name: str):
+    def handle_ack(self, device_id: str, metric_name: str, value: Optional[str] = None):
         """
         ACK 수신 시 호출 - pending 목록에서 제거
         """
-        key = f"{device_id}:{metric_name}"
-        
-        if key in self.pending_requests:
-            cmo = self.pending_requests[key]
-            elapsed = cmo.elapsed_time()
-            del self.pending_requests[key]
-            print(f"[ACK] 응답 수신: {device_id},{metric_name} (응답시간: {elapsed:.1f}초)")
-        else:
-            print(f"[WARNING] 예상하지 못한 ACK: {device_id},{metric_name}")
+        with self.lock:
+            key = self._pending_key(device_id, metric_name, value)
+            if key not in self.pending_requests:
+                key = self._pending_key(device_id, metric_name)
+            
+            if key in self.pending_requests:
+                cmo = self.pending_requests.pop(key)
+                elapsed = cmo.elapsed_time()
+                now = time.time()
+                sent_at = self.results.get(cmo.request_id, {}).get('sent_at') or cmo.timestamp
+                self._set_status(cmo, 'acked', acked_at=now, rtt=now - sent_at, ack_value=value)
+                print(f"[ACK] 응답 수신: {device_id},{metric_name} (응답시간: {elapsed:.1f}초)")
+            else:
+                print(f"[WARNING] 예상하지 못한 ACK: {device_id},{metric_name}")
     
     def stop(self):
         """처리 중지"""
-        self.running = False
\ No newline at end of file
+        self.running = False
+        with self.lock:
+            lanes = list(self.forward_lanes.values())
+        for lane in lanes:
+            lane.put(None)
\ No newline at end of file
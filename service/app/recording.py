@@ -0,0 +1,121 @@
+# recording.py
+"""센서 데이터 DB 기록 정책 (데드밴드 / 변경 시 기록 / 최소 주기 / 하트비트)"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class RecordingPolicy:
+    """메트릭별 기록 정책
+
+    mode:
+        'all'      - 모든 샘플 기록
+        'change'   - 값이 바뀔 때만 기록
+        'abs'      - 마지막 기록값과의 차이가 threshold 이상일 때 기록
+        'pct'      - 마지막 기록값 대비 변화율(%)이 threshold 이상일 때 기록
+        'interval' - 마지막 기록 후 min_interval 초가 지났을 때만 기록
+    min_interval: 모든 모드에서 기록 사이 최소 간격 (초)
+    heartbeat: 값이 그대로여도 이 주기(초)마다 한 번은 기록 (0이면 비활성)
+    """
+    mode: str = 'all'
+    threshold: float = 0.0
+    min_interval: float = 0.0
+    heartbeat: float = 0.0
+
+
+# 장치 타입(device_id 접두사) + 메트릭별 기본 정책
+DEFAULT_POLICIES = {
+    'dht:TEM': RecordingPolicy(mode='abs', threshold=0.5, heartbeat=60.0),
+    'dht:HUM': RecordingPolicy(mode='abs', threshold=2.0, heartbeat=60.0),
+    'cur:LIGHT': RecordingPolicy(mode='pct', threshold=5.0, heartbeat=60.0),
+    'cur:CUR_STEP': RecordingPolicy(mode='change', heartbeat=60.0),
+    'cur:MOTOR_DIR': RecordingPolicy(mode='change', heartbeat=60.0),
+}
+
+
+class RecordingFilter:
+    """insert_log 앞에서 샘플 기록 여부 판단"""
+
+    def __init__(self, policies: Optional[Dict[str, RecordingPolicy]] = None,
+                 default_policy: Optional[RecordingPolicy] = None):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.default_policy = default_policy or RecordingPolicy()
+        self.last: Dict[Tuple[str, str], Tuple[float, str]] = {}  # key -> (기록 시각, 기록 값)
+        self.recorded: Dict[Tuple[str, str], int] = {}
+        self.suppressed: Dict[Tuple[str, str], int] = {}
+        self.lock = threading.Lock()
+
+    def policy_for(self, device_id: str, metric_name: str) -> RecordingPolicy:
+        """'장치타입:메트릭' → '메트릭' → 기본 정책 순으로 조회"""
+        device_type = device_id.split('_', 1)[0]
+        return (self.policies.get(f"{device_type}:{metric_name}")
+                or self.policies.get(metric_name)
+                or self.default_policy)
+
+    @staticmethod
+    def _changed(policy: RecordingPolicy, last_value: str, value: str) -> bool:
+        if policy.mode in ('all', 'interval'):
+            return True
+        if policy.mode == 'change':
+            return value != last_value
+        try:
+            prev, cur = float(last_value), float(value)
+        except ValueError:
+            return value != last_value
+        if policy.mode == 'abs':
+            return abs(cur - prev) >= policy.threshold
+        if policy.mode == 'pct':
+            if prev == 0:
+                return cur != 0
+            return abs(cur - prev) / abs(prev) * 100.0 >= policy.threshold
+        raise ValueError(f"알 수 없는 기록 정책: {policy.mode}")
+
+    def should_record(self, device_id: str, metric_name: str, value: str,
+                      now: Optional[float] = None) -> bool:
+        """기록해야 하면 True, 억제하면 False (카운터 갱신)"""
+        now = time.time() if now is None else now
+        key = (device_id, metric_name)
+        policy = self.policy_for(device_id, metric_name)
+
+        with self.lock:
+            last = self.last.get(key)
+            if last is None:
+                record = True
+            else:
+                last_time, last_value = last
+                elapsed = now - last_time
+                if policy.heartbeat and elapsed >= policy.heartbeat:
+                    record = True
+                elif elapsed < policy.min_interval:
+                    record = False
+                else:
+                    record = self._changed(policy, last_value, value)
+
+            if record:
+                self.last[key] = (now, value)
+                self.recorded[key] = self.recorded.get(key, 0) + 1
+            else:
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return record
+
+    def stats(self) -> dict:
+        """메트릭별 기록/억제 카운터"""
+        with self.lock:
+            keys = set(self.recorded) | set(self.suppressed)
+            return {
+                f"{device_id}:{metric_name}": {
+                    'recorded': self.recorded.get((device_id, metric_name), 0),
+                    'suppressed': self.suppressed.get((device_id, metric_name), 0),
+                }
+                for device_id, metric_name in sorted(keys)
+            }
+
+    def totals(self) -> dict:
+        with self.lock:
+            return {
+                'recorded': sum(self.recorded.values()),
+                'suppressed': sum(self.suppressed.values()),
+            }
@@ -0,0 +1,199 @@
+# retention.py
+"""log_entries 시간 범위 파티션 관리 및 보관 기간 정리"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import pymysql
+
+from database import DatabaseHandler
+
+MAXVALUE_PARTITION = 'pmax'
+
+
+@dataclass
+class Partition:
+    """RANGE COLUMNS 파티션 - upper_bound가 None이면 MAXVALUE"""
+    name: str
+    upper_bound: Optional[datetime]
+
+
+def period_start(ts: datetime, granularity: str) -> datetime:
+    """ts가 속한 일/월의 시작 시각"""
+    if granularity == 'day':
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'month':
+        return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"알 수 없는 파티션 단위: {granularity}")
+
+
+def next_period(start: datetime, granularity: str) -> datetime:
+    """다음 일/월의 시작 시각"""
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime, granularity: str) -> str:
+    """파티션 이름 - 해당 구간 시작일 기준 (p20261019 / p202610)"""
+    return start.strftime('p%Y%m%d' if granularity == 'day' else 'p%Y%m')
+
+
+def parse_bound(description: Optional[str]) -> Optional[datetime]:
+    """information_schema PARTITION_DESCRIPTION → datetime (MAXVALUE면 None)"""
+    if description is None:
+        return None
+    value = description.strip().strip("'")
+    if value.upper() == 'MAXVALUE':
+        return None
+    return datetime.fromisoformat(value)
+
+
+class PartitionManager:
+    """일/월 파티션을 미리 만들고 보관 기간이 지난 파티션을 DROP
+
+    archiver가 주어지면 삭제 전에 archiver.export_range(start, end)를 호출하고,
+    False를 반환하면 해당 파티션은 삭제하지 않는다.
+
+    파티션 DDL은 db_handler.config로 연 전용 연결에서 실행한다 - ALTER TABLE이
+    메타데이터 락을 기다리는 동안 db_handler.lock을 잡아 로그 저장을 막지 않도록.
+    """
+
+    def __init__(self, db_handler: DatabaseHandler, table: str = 'log_entries',
+                 granularity: str = 'day', retention_days: int = 90, precreate: int = 7,
+                 check_interval: float = 3600.0, archiver=None):
+        self.db_handler = db_handler
+        self.table = table
+        self.granularity = granularity
+        self.retention = timedelta(days=retention_days)
+        self.precreate = precreate
+        self.check_interval = check_interval
+        self.archiver = archiver
+        self.conn = None
+        self.conn_config = None
+        self.running = False
+        self.stop_event = threading.Event()
+
+    # ------------------------------------------------------------
+    # 계획 (DB 접근 없음)
+    # ------------------------------------------------------------
+    def plan_new(self, partitions: List[Partition], now: datetime) -> List[Partition]:
+        """now 기준 precreate개 구간 뒤까지 없는 파티션 목록"""
+        bounds = [p.upper_bound for p in partitions if p.upper_bound is not None]
+        last_bound = max(bounds) if bounds else None
+
+        new = []
+        start = period_start(now, self.granularity)
+        for _ in range(self.precreate + 1):
+            end = next_period(start, self.granularity)
+            if last_bound is None or end > last_bound:
+                new.append(Partition(partition_name(start, self.granularity), end))
+            start = end
+        return new
+
+    def plan_expired(self, partitions: List[Partition],
+                     now: datetime) -> List[Tuple[Partition, Optional[datetime]]]:
+        """모든 행이 보관 기간을 넘긴 파티션 [(partition, 하한), ...]"""
+        cutoff = now - self.retention
+        expired, lower = [], None
+        for p in partitions:
+            if p.upper_bound is None:
+                break
+            if p.upper_bound <= cutoff:
+                expired.append((p, lower))
+            lower = p.upper_bound
+        return expired
+
+    # ------------------------------------------------------------
+    # DB 작업
+    # ------------------------------------------------------------
+    def _connection(self):
+        """전용 연결 (없거나 db_handler 설정이 바뀌었으면 새로 연결)"""
+        config = self.db_handler.config
+        if self.conn is not None and config != self.conn_config:
+            self.close()
+        if self.conn is None:
+            self.conn = pymysql.connect(**config, autocommit=True)
+            self.conn_config = config
+        return self.conn
+
+    def _execute(self, sql: str, params=None) -> list:
+        try:
+            with self._connection().cursor() as cursor:
+                cursor.execute(sql, params)
+                return list(cursor.fetchall())
+        except pymysql.OperationalError:
+            self.close()  # 끊긴 연결은 다음 실행에서 다시 연결
+            raise
+
+    def close(self):
+        """전용 연결 종료"""
+        conn, self.conn = self.conn, None
+        if conn:
+            try:
+                conn.close()
+            except pymysql.Error:
+                pass
+
+    def list_partitions(self) -> List[Partition]:
+        rows = self._execute(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "ORDER BY PARTITION_ORDINAL_POSITION",
+            (self.table,)
+        )
+        return [Partition(name, parse_bound(desc)) for name, desc in rows if name]
+
+    def ensure_future_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """pmax를 분할해 앞으로 쓸 파티션을 미리 생성 (메타데이터 작업)"""
+        new = self.plan_new(self.list_partitions(), now or datetime.now())
+        if not new:
+            return []
+
+        defs = ', '.join(
+            f"PARTITION {p.name} VALUES LESS THAN ('{p.upper_bound:%Y-%m-%d %H:%M:%S}')"
+            for p in new
+        )
+        self._execute(
+            f"ALTER TABLE `{self.table}` REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO "
+            f"({defs}, PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        )
+        names = [p.name for p in new]
+        print(f"[RETENTION] 파티션 생성: {', '.join(names)}")
+        return names
+
+    def drop_expired(self, now: Optional[datetime] = None) -> List[str]:
+        """보관 기간이 지난 파티션을 (아카이브 후) DROP PARTITION"""
+        dropped = []
+        for partition, lower in self.plan_expired(self.list_partitions(), now or datetime.now()):
+            if self.archiver and not self.archiver.export_range(lower, partition.upper_bound):
+                print(f"[RETENTION] 아카이브 실패 - {partition.name} 삭제 보류")
+                continue
+            self._execute(f"ALTER TABLE `{self.table}` DROP PARTITION {partition.name}")
+            dropped.append(partition.name)
+            print(f"[RETENTION] 파티션 삭제: {partition.name} (< {partition.upper_bound})")
+        return dropped
+
+    def run_once(self, now: Optional[datetime] = None):
+        try:
+            self.ensure_future_partitions(now)
+            self.drop_expired(now)
+        except pymysql.Error as e:
+            print(f"[ERROR] 파티션 관리 실패: {e}")
+
+    def run(self):
+        """주기적 파티션 관리"""
+        self.running = True
+        while self.running:
+            self.run_once()
+            self.stop_event.wait(self.check_interval)
+        self.close()
+
+    def stop(self):
+        """관리 중지"""
+        self.running = False
+        self.stop_event.set()
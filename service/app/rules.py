@@ -0,0 +1,201 @@
+# rules.py
+"""CMD 라우팅 테이블과 서버 측 자동화 규칙
+
+rules.json:
+{
+  "routes": {"FLOOR": "ele"},          # CMD metric_name -> 대상 장치 종류
+  "rules": [
+    {
+      "name": "entrance_precall",
+      "when": {"device": "ent", "type": "SEN", "metric": "RFID_ACCESS"},
+      "then": {"device": "ele", "metric": "FLOOR", "value": "1"},
+      "cooldown": 10
+    },
+    {
+      "name": "bright_close_curtain",
+      "when": {"device": "cur", "type": "SEN", "metric": "LIGHT", "op": ">", "value": 800},
+      "then": {"device": "cur", "metric": "MOTOR", "value": "CLOSE"},
+      "cooldown": 300
+    }
+  ]
+}
+
+- when.device는 장치 종류(ent) 또는 device_id(ent_001), op/value는 선택 (없으면 항상 일치)
+- then.device도 종류 또는 device_id, then.value가 "$value"이면 수신 값을 그대로 전달
+- 규칙은 (장치 종류, data_type, metric_name) 키의 dict로 색인되므로
+  일치하는 규칙이 없는 수신 데이터는 dict 조회 한 번으로 끝난다
+"""
+
+import json
+import operator
+import threading
+import time
+from typing import Dict, List, Optional
+
+from models import CMORequest
+
+# CMD metric_name -> 대상 장치 종류 (없는 metric은 metric_name 자체를 종류로 사용)
+DEFAULT_ROUTES = {'FLOOR': 'ele', 'CANCEL': 'ele'}
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def device_type(device_id: str) -> str:
+    """'ele_001' → 'ele'"""
+    return device_id.split('_', 1)[0]
+
+
+class RoutingTable:
+    """장치 종류 -> device_id 색인 (장치가 추가/제거될 때만 다시 만듦)"""
+
+    def __init__(self, routes: Optional[Dict[str, str]] = None, devices: Optional[List[str]] = None):
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.by_type: Dict[str, str] = {}
+        self.devices = set()
+        self.update(devices or [])
+
+    def update(self, devices: List[str]):
+        """사용 가능한 장치 목록 반영 (종류마다 첫 번째 device_id)"""
+        by_type = {}
+        for device_id in devices:
+            by_type.setdefault(device_type(device_id), device_id)
+        self.by_type = by_type
+        self.devices = set(devices)
+
+    def resolve(self, target: str) -> Optional[str]:
+        """장치 종류 또는 device_id → device_id"""
+        if target in self.devices:
+            return target
+        return self.by_type.get(target)
+
+    def route(self, metric_name: str) -> Optional[str]:
+        """CMD metric_name → 대상 device_id"""
+        return self.by_type.get(self.routes.get(metric_name, metric_name.lower()))
+
+
+class Rule:
+    """컴파일된 규칙 하나 (조건 함수, 대상, 쿨다운, 카운터)"""
+
+    def __init__(self, config: dict):
+        when, then = config['when'], config['then']
+        self.name = config.get('name') or f"{when['metric']}->{then['metric']}"
+        self.key = (device_type(when['device']), when.get('type', 'SEN'), when['metric'])
+        self.device_id = when['device'] if '_' in when['device'] else None
+        self.compare = OPERATORS[when['op']] if 'op' in when else None
+        threshold = when.get('value')
+        self.numeric = isinstance(threshold, (int, float)) and not isinstance(threshold, bool)
+        self.threshold = float(threshold) if self.numeric else threshold
+        if self.compare is None and threshold is not None:
+            self.compare = operator.eq
+        self.target = then['device']
+        self.metric_name = then['metric']
+        self.value = str(then['value'])
+        self.cooldown = float(config.get('cooldown', 0))
+        self.enabled = config.get('enabled', True)
+
+        self.last_fired = None  # monotonic (쿨다운 계산용)
+        self.last_fired_at = None  # epoch 초 (조회용)
+        self.matched = 0
+        self.fired = 0
+        self.suppressed = 0  # 쿨다운 중
+        self.unroutable = 0  # 대상 장치 없음
+        self.errors = 0  # 값 변환 실패
+
+    def condition(self, parsed) -> bool:
+        if self.device_id is not None and parsed.device_id != self.device_id:
+            return False
+        if self.compare is None:
+            return True
+        if self.numeric:
+            try:
+                return self.compare(float(parsed.value), self.threshold)
+            except ValueError:
+                self.errors += 1
+                return False
+        return self.compare(str(parsed.value), str(self.threshold))
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'when': list(self.key),
+            'enabled': self.enabled,
+            'matched': self.matched,
+            'fired': self.fired,
+            'suppressed': self.suppressed,
+            'unroutable': self.unroutable,
+            'errors': self.errors,
+            'last_fired_at': self.last_fired_at,
+        }
+
+
+class RuleEngine:
+    """규칙 색인 + 라우팅 테이블 - 모니터가 수신 데이터마다 evaluate 호출"""
+
+    def __init__(self, config: Optional[dict] = None):
+        config = config or {}
+        self.routing = RoutingTable(config.get('routes'))
+        self.rules = [Rule(rule) for rule in config.get('rules', [])]
+        self.index: Dict[tuple, List[Rule]] = {}
+        for rule in self.rules:
+            if rule.enabled:
+                self.index.setdefault(rule.key, []).append(rule)
+        self.lock = threading.Lock()  # 쿨다운 확인/갱신
+
+    @classmethod
+    def load(cls, path: str) -> 'RuleEngine':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def update_devices(self, devices: List[str]):
+        self.routing.update(devices)
+
+    def route(self, metric_name: str) -> Optional[str]:
+        return self.routing.route(metric_name)
+
+    def evaluate(self, parsed) -> List[CMORequest]:
+        """수신 데이터에 일치하는 규칙의 CMO 요청 목록"""
+        rules = self.index.get((device_type(parsed.device_id), parsed.data_type, parsed.metric_name))
+        if not rules:
+            return []
+
+        requests = []
+        for rule in rules:
+            if not rule.condition(parsed):
+                continue
+            rule.matched += 1
+
+            now = time.monotonic()
+            with self.lock:
+                if rule.last_fired is not None and now - rule.last_fired < rule.cooldown:
+                    rule.suppressed += 1
+                    continue
+                target = self.routing.resolve(rule.target)
+                if target is None:
+                    rule.unroutable += 1
+                    continue
+                rule.last_fired = now
+                rule.last_fired_at = time.time()
+                rule.fired += 1
+
+            value = parsed.value if rule.value == '$value' else rule.value
+            requests.append(CMORequest(
+                device_id=target,
+                metric_name=rule.metric_name,
+                value=value,
+                command=f"CMO,{rule.metric_name},{value}"
+            ))
+        return requests
+
+    def stats(self) -> dict:
+        return {
+            'routes': dict(self.routing.routes),
+            'devices': dict(self.routing.by_type),
+            'rules': [rule.stats() for rule in self.rules],
+        }
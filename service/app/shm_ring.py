@@ -0,0 +1,121 @@
+# shm_ring.py
+"""공유 메모리 링 버퍼 - 프로세스 간 단일 생산자/단일 소비자(SPSC) 레코드 전달
+
+레이아웃 (multiprocessing.shared_memory):
+    [0:8]    head - 지금까지 쓴 총 바이트 (생산자만 갱신)
+    [64:72]  tail - 지금까지 읽은 총 바이트 (소비자만 갱신)
+    [128:]   데이터 영역 (capacity 바이트), 레코드 = 4바이트 길이 + 내용
+
+head/tail은 각자 한 쪽에서만 쓰는 8바이트 정렬 단조 증가 카운터이므로 잠금이 없다.
+생산자는 레코드를 다 쓴 뒤 head를 올리고, 소비자는 다 읽은 뒤 tail을 올린다.
+"""
+
+import struct
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+_COUNTER = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_HEAD_OFFSET = 0
+_TAIL_OFFSET = 64
+_DATA_OFFSET = 128
+
+
+class ShmRing:
+    """SPSC 링 버퍼 - put은 생산자 프로세스, get은 소비자 프로세스에서만 호출"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self.buf = shm.buf
+        self.dropped = 0  # 가득 차서 버린 레코드 (생산자 쪽 카운터)
+
+    @classmethod
+    def create(cls, capacity: int = 1 << 20) -> 'ShmRing':
+        """새 링 생성 (소유자가 unlink 책임)"""
+        shm = shared_memory.SharedMemory(create=True, size=_DATA_OFFSET + capacity)
+        shm.buf[:_DATA_OFFSET] = bytes(_DATA_OFFSET)
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> 'ShmRing':
+        """다른 프로세스에서 만든 링에 연결"""
+        # 자식 프로세스는 부모의 resource_tracker를 공유하므로 정리는 소유자의 unlink가 담당
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _load(self, offset: int) -> int:
+        return _COUNTER.unpack_from(self.buf, offset)[0]
+
+    def _store(self, offset: int, value: int):
+        _COUNTER.pack_into(self.buf, offset, value)
+
+    def _write(self, position: int, data: bytes):
+        start = _DATA_OFFSET + position % self.capacity
+        first = min(len(data), _DATA_OFFSET + self.capacity - start)
+        self.buf[start:start + first] = data[:first]
+        if first < len(data):
+            self.buf[_DATA_OFFSET:_DATA_OFFSET + len(data) - first] = data[first:]
+
+    def _read(self, position: int, size: int) -> bytes:
+        start = _DATA_OFFSET + position % self.capacity
+        first = min(size, _DATA_OFFSET + self.capacity - start)
+        data = bytes(self.buf[start:start + first])
+        if first < size:
+            data += bytes(self.buf[_DATA_OFFSET:_DATA_OFFSET + size - first])
+        return data
+
+    def used(self) -> int:
+        return self._load(_HEAD_OFFSET) - self._load(_TAIL_OFFSET)
+
+    def fits(self, payload: bytes) -> bool:
+        """payload를 넣을 공간이 있는지 (dropped는 세지 않음 - 재시도 대기용)"""
+        size = _LENGTH.size + len(payload)
+        return self.capacity - self.used() >= size
+
+    def put(self, payload: bytes) -> bool:
+        """레코드 추가 (공간이 없으면 False)"""
+        size = _LENGTH.size + len(payload)
+        if size > self.capacity:
+            raise ValueError(f"레코드가 링보다 큼: {len(payload)} bytes")
+        head = self._load(_HEAD_OFFSET)
+        if self.capacity - (head - self._load(_TAIL_OFFSET)) < size:
+            self.dropped += 1
+            return False
+        self._write(head, _LENGTH.pack(len(payload)) + payload)
+        self._store(_HEAD_OFFSET, head + size)
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """다음 레코드 (비어 있으면 None)"""
+        tail = self._load(_TAIL_OFFSET)
+        if tail == self._load(_HEAD_OFFSET):
+            return None
+        length = _LENGTH.unpack(self._read(tail, _LENGTH.size))[0]
+        payload = self._read(tail + _LENGTH.size, length)
+        self._store(_TAIL_OFFSET, tail + _LENGTH.size + length)
+        return payload
+
+    def get_many(self, limit: int = 256) -> List[bytes]:
+        """최대 limit개 레코드를 한 번에 꺼냄"""
+        records = []
+        while len(records) < limit:
+            payload = self.get()
+            if payload is None:
+                break
+            records.append(payload)
+        return records
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
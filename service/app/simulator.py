@@ -0,0 +1,151 @@
+# simulator.py
+"""pty 가상 시리얼 장치 - 링크 속도 제한과 CMO,BAUD 협상을 흉내냄
+
+pty는 실제 전송 속도 제한이 없으므로 한 줄 보낼 때마다 (바이트 수 × 10비트 / baud)초
+쉬어 8N1 링크의 최대 처리량을 재현한다.
+
+사용법:
+    python simulator.py [--seconds 5] [--rate 115200]
+    → 9600 bps 고정 / 협상 후 --rate bps 처리량 비교
+"""
+
+import argparse
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from typing import List
+
+from models import LinkConfig
+from monitor import SerialMonitor
+
+# 커튼 텔레메트리 (stepper_ldr_curtain이 보내는 형식)
+CURTAIN_TELEMETRY = [
+    "SEN,LIGHT,512",
+    "SEN,CUR_STEP,1234",
+    "SEN,MOTOR_DIR,1",
+    "SEN,MOTOR,OPEN",
+]
+
+
+class VirtualDevice:
+    """pty 한 쌍 - path(슬레이브)를 SerialMonitor가 열고, 이쪽은 마스터로 송수신"""
+
+    def __init__(self, telemetry: List[str], baudrate: int = 9600, negotiate: bool = True):
+        self.telemetry = telemetry
+        self.baudrate = baudrate
+        self.negotiate = negotiate  # False면 CMO,BAUD를 무시하는 (기존) 펌웨어
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)  # 에코/줄바꿈 변환 없음
+        self.path = os.ttyname(self.slave)
+        self.commands = []  # 수신한 CMO
+        self.sent_lines = 0
+        self.running = False
+        self.write_lock = threading.Lock()
+        self.threads = []
+
+    def _send(self, line: str):
+        data = f"{line}\n".encode('utf-8')
+        with self.write_lock:
+            os.write(self.master, data)
+            time.sleep(len(data) * 10 / self.baudrate)  # 8N1: 바이트당 10비트
+
+    def _telemetry_loop(self):
+        index = 0
+        while self.running:
+            self._send(self.telemetry[index % len(self.telemetry)])
+            self.sent_lines += 1
+            index += 1
+
+    def _command_loop(self):
+        buffer = b""
+        while self.running:
+            ready, _, _ = select.select([self.master], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(self.master, 1024)
+            except OSError:
+                return
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                self._handle_command(line.decode('utf-8', errors='ignore').strip())
+
+    def _handle_command(self, line: str):
+        self.commands.append(line)
+        parts = line.split(',')
+        if self.negotiate and len(parts) == 3 and parts[:2] == ['CMO', 'BAUD']:
+            rate = int(parts[2])
+            self._send(f"ACK,BAUD,{rate}")  # 기존 속도로 ACK 후 전환
+            self.baudrate = rate
+
+    def start(self):
+        self.running = True
+        for target in (self._telemetry_loop, self._command_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=1)
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def benchmark(seconds: float = 5.0, negotiate_baudrate: int = None, device_negotiates: bool = True,
+              telemetry: List[str] = CURTAIN_TELEMETRY) -> dict:
+    """가상 커튼 장치에서 seconds초 동안 수신한 줄 수/바이트 수"""
+    device = VirtualDevice(telemetry, negotiate=device_negotiates)
+    device.start()
+    link = LinkConfig(port=device.path, baudrate=9600, negotiate_baudrate=negotiate_baudrate,
+                      negotiate_timeout=0.5, negotiate_attempts=1)
+    monitor = SerialMonitor('cur_001', device.path, None, None, link=link)
+
+    received = {'lines': 0, 'bytes': 0}
+
+    def count(parsed):
+        received['lines'] += 1
+        received['bytes'] += len(parsed.data_type) + len(parsed.metric_name) + len(parsed.value) + 3
+
+    monitor._dispatch = count
+    try:
+        if not monitor.connect():
+            raise RuntimeError(f"{device.path} 연결 실패")
+        received.update(lines=0, bytes=0)  # 협상 중 수신분 제외
+        thread = threading.Thread(target=monitor.run, daemon=True)
+        started = time.monotonic()
+        thread.start()
+        time.sleep(seconds)
+        elapsed = time.monotonic() - started
+        monitor.close()
+        thread.join(timeout=2)
+    finally:
+        device.stop()
+
+    return {
+        'baudrate': monitor.baudrate,
+        'lines_per_sec': round(received['lines'] / elapsed, 1),
+        'bytes_per_sec': round(received['bytes'] / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가상 장치 링크 처리량 비교")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--rate', type=int, default=115200)
+    args = parser.parse_args()
+
+    base = benchmark(args.seconds)
+    fast = benchmark(args.seconds, negotiate_baudrate=args.rate)
+    print(f"{'링크':>16} {'줄/초':>10} {'바이트/초':>12}")
+    for name, result in (("9600 고정", base), (f"협상 {fast['baudrate']}", fast)):
+        print(f"{name:>16} {result['lines_per_sec']:>10} {result['bytes_per_sec']:>12}")
+    print(f"처리량 {fast['bytes_per_sec'] / base['bytes_per_sec']:.1f}배")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,8 @@ import threading
 from queue import Queue
 from unittest.mock import Mock, MagicMock, patch
 
+import serial
+
 from models import CMORequest, SerialData
 from parser import SerialParser
 from monitor import SerialMonitor
@@ -204,6 +206,61 @@ def test_queue_processor_timeout():
     print("✓ 타임아웃 후 pending_requests에서 자동 제거됨")
 
 
+def test_queue_processor_request_status():
+    """QueueProcessor request_id별 처리 결과 테스트"""
+    print("\n[TEST 6-1] QueueProcessor 요청 상태 추적 테스트")
+    print("=" * 60)
+    
+    mock_monitor = Mock()
+    mock_monitor.send_command.return_value = True
+    processor = QueueProcessor(Queue(), {"ele_001": mock_monitor})
+    
+    # 층마다 따로 ACK가 오므로 서로 대체되지 않아야 함
+    floor_2 = CMORequest("ele_001", "FLOOR", "2", "CMO,FLOOR,2")
+    floor_3 = CMORequest("ele_001", "FLOOR", "3", "CMO,FLOOR,3", timeout=0.2)
+    processor.track(floor_2)
+    assert processor.get_result(floor_2.request_id)['status'] == 'queued'
+    processor._process_cmo(floor_2)
+    processor._process_cmo(floor_3)
+    assert processor.get_result(floor_2.request_id)['status'] == 'sent'
+    print("✓ queued → sent")
+    
+    processor.handle_ack("ele_001", "FLOOR", "2")
+    result = processor.get_result(floor_2.request_id)
+    assert result['status'] == 'acked'
+    assert result['rtt'] is not None and result['rtt'] >= 0
+    assert processor.get_result(floor_3.request_id)['status'] == 'sent'
+    print(f"✓ ACK,FLOOR,2 → 2층 요청만 acked (rtt {result['rtt'] * 1000:.1f}ms)")
+    
+    time.sleep(0.3)
+    processor._check_pending_timeouts()
+    assert processor.get_result(floor_3.request_id)['status'] == 'timeout'
+    print("✓ 3층 요청 timeout")
+    
+    # 같은 메트릭의 새 명령은 이전 요청을 대체
+    air_on = CMORequest("ele_001", "AIR", "1", "CMO,AIR,1")
+    air_off = CMORequest("ele_001", "AIR", "0", "CMO,AIR,0")
+    processor._process_cmo(air_on)
+    processor._process_cmo(air_off)
+    assert processor.get_result(air_on.request_id)['status'] == 'superseded'
+    print("✓ 이전 요청 superseded")
+    
+    missing = CMORequest("cur_001", "MOTOR", "OPEN", "CMO,MOTOR,OPEN")
+    processor._process_cmo(missing)
+    assert processor.get_result(missing.request_id)['status'] == 'failed'
+    assert processor.get_result("unknown") is None
+    print("✓ 모니터 없음 → failed")
+    
+    # 결과는 최근 max_results개만 보관
+    small = QueueProcessor(Queue(), {}, max_results=2)
+    requests = [CMORequest("ele_001", "FLOOR", str(i), f"CMO,FLOOR,{i}") for i in range(3)]
+    for cmo in requests:
+        small.track(cmo)
+    assert small.get_result(requests[0].request_id) is None
+    assert len(small.results) == 2
+    print("✓ 결과 보관 개수 제한")
+
+
 def test_serial_monitor_cmd_handling():
     """SerialMonitor CMD 처리 테스트"""
     print("\n[TEST 7] SerialMonitor CMD 처리 테스트")
@@ -295,6 +352,76 @@ def test_end_to_end_flow():
     print("✓ 엔드-투-엔드 흐름 완료!")
 
 
+def test_serial_monitor_reconnect_backoff():
+    """SerialMonitor 연결 끊김 → backoff 재연결 테스트"""
+    print("\n[TEST 10] SerialMonitor 재연결 테스트")
+    print("=" * 60)
+    
+    monitor = SerialMonitor("dht_001", "/dev/ttyUSB9", Queue(), Mock(spec=DatabaseHandler))
+    monitor.backoff_initial = 0.02
+    monitor.backoff_max = 0.05
+    
+    broken = MockSerialPort()
+    broken.readline = Mock(side_effect=serial.SerialException("device disconnected"))
+    monitor.ser = broken
+    monitor.running = True
+    
+    # 두 번 실패 후 연결 성공
+    attempts = []
+    def fake_serial(*args, **kwargs):
+        attempts.append(args)
+        if len(attempts) < 3:
+            raise serial.SerialException("no such device")
+        return MockSerialPort()
+    
+    # 지연 계산: 지수 증가, 상한, jitter 범위
+    assert 0.016 <= monitor.backoff_delay(0) <= 0.024
+    assert monitor.backoff_delay(10) <= 0.05 * 1.2
+    
+    with patch('monitor.serial.Serial', side_effect=fake_serial):
+        thread = threading.Thread(target=monitor.run, daemon=True)
+        thread.start()
+        deadline = time.time() + 2
+        while monitor.reconnect_count == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        health = monitor.health()
+        monitor.close()
+        thread.join(timeout=1)
+    
+    assert broken.readline.call_count == 1  # 끊긴 핸들을 다시 읽지 않음
+    assert len(attempts) == 3
+    assert health['state'] == 'connected'
+    assert health['reconnects'] == 1
+    assert health['downtime_sec'] >= 0
+    assert not thread.is_alive()
+    print(f"✓ 재연결 완료: {health}")
+
+
+def test_serial_monitor_close_during_connect():
+    """연결 중 close() → 방금 연 포트를 닫고 running을 다시 켜지 않음"""
+    monitor = SerialMonitor("dht_001", "/dev/ttyUSB9", Queue(), Mock(spec=DatabaseHandler))
+    port = MockSerialPort()
+    port.close = Mock()
+    
+    def open_then_closed(*args, **kwargs):
+        assert kwargs['exclusive'] is True
+        monitor.close()  # 재연결 스레드가 포트를 여는 동안 분리/종료
+        return port
+    
+    with patch('monitor.serial.Serial', side_effect=open_then_closed):
+        assert not monitor.connect(quiet=True)
+    assert not monitor.running and monitor.state == 'closed' and monitor.ser is None
+    port.close.assert_called()
+    
+    with patch('monitor.serial.Serial', return_value=MockSerialPort()) as opened:
+        assert not monitor.connect()  # close() 이후에는 열지도 않음
+        monitor._reconnect()
+    opened.assert_not_called()
+    assert not monitor.running
+    print("✓ 닫힌 모니터는 재연결되지 않음")
+
+
 def run_all_tests():
     """모든 테스트 실행"""
     print("\n" + "=" * 60)
@@ -308,14 +435,17 @@ def run_all_tests():
         test_queue_processor_pending()
         test_queue_processor_ack_handling()
         test_queue_processor_timeout()
+        test_queue_processor_request_status()
         test_serial_monitor_cmd_handling()
         test_serial_monitor_sen_handling()
         test_end_to_end_flow()
+        test_serial_monitor_reconnect_backoff()
+        test_serial_monitor_close_during_connect()
         
         print("\n" + "=" * 60)
         print("✅ 모든 테스트 통과!")
         print("=" * 60)
-        
+    
     except AssertionError as e:
         print(f"\n❌ 테스트 실패: {e}")
         import traceback
@@ -0,0 +1,89 @@
+# test_archive.py
+"""로그 아카이브 내보내기/읽기 테스트"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import archive
+from archive import ArchiveWriter, read_archive
+
+
+def make_rows(days=2, per_day=30):
+    start = datetime(2026, 10, 1)
+    rows = []
+    for i in range(days * per_day):
+        ts = start + timedelta(seconds=i * 86400 // per_day)
+        rows.append((ts, 'dht_001', 'SEN', 'TEM', 20.0 + i % 5, None))
+        rows.append((ts, 'ent_001', 'SEN', 'RFID_ACCESS', None, f"UID{i}"))
+    return rows
+
+
+@pytest.mark.parametrize('fmt', ['npz', 'parquet'])
+def test_export_and_read_roundtrip(tmp_path, fmt):
+    """일/장치별 파티션 저장 후 다시 읽기"""
+    if fmt == 'parquet' and archive.pq is None:
+        pytest.skip("pyarrow 미설치")
+    
+    writer = ArchiveWriter(str(tmp_path), chunk_rows=20, fmt=fmt)
+    assert writer.write_rows(make_rows()) == 120
+    assert writer.buffered_rows == 0
+    
+    # 2일 × 2장치, 장치별 하루 30행 → chunk 20 기준 2개 파일
+    assert len(writer.files_written) == 8
+    assert os.path.isdir(tmp_path / 'date=2026-10-02' / 'device_id=ent_001')
+    
+    data = read_archive(str(tmp_path), device_id='dht_001', metric_name='TEM')
+    assert len(data['timestamp']) == 60
+    assert set(data['device_id']) == {'dht_001'}
+    assert np.all(np.diff(data['timestamp'].astype(np.int64)) > 0)
+    
+    data = read_archive(str(tmp_path), start=datetime(2026, 10, 2), device_id='ent_001')
+    assert len(data['timestamp']) == 30
+    assert data['value_text'][0] == 'UID30'
+    assert np.isnan(data['value_num']).all()
+    print(f"✓ {fmt} 아카이브 왕복 성공")
+
+
+def test_writer_memory_is_bounded(tmp_path):
+    """버퍼 행 수가 max_buffered_rows를 넘지 않음"""
+    writer = ArchiveWriter(str(tmp_path), chunk_rows=1000, fmt='npz', max_buffered_rows=50)
+    peak = 0
+    for row in make_rows(days=1, per_day=200):
+        writer.add(row)
+        peak = max(peak, writer.buffered_rows)
+    writer.flush_all()
+    
+    assert peak < 50
+    assert writer.rows_written == 400
+    print(f"✓ 최대 버퍼 {peak}행")
+
+
+def test_read_empty_archive(tmp_path):
+    data = read_archive(str(tmp_path))
+    assert len(data['timestamp']) == 0
+
+
+def test_reexport_same_range_is_idempotent(tmp_path):
+    """같은 구간을 다시 내보내면 덮어쓰기 - 읽을 때 중복 없음, 구간 밖 파일은 유지"""
+    start, end = datetime(2026, 10, 1), datetime(2026, 10, 2)
+    for _ in range(2):
+        writer = ArchiveWriter(str(tmp_path), chunk_rows=20, fmt='npz', start=start, end=end)
+        assert writer.write_rows(make_rows(days=1)) == 60
+    
+    data = read_archive(str(tmp_path))
+    assert len(data['timestamp']) == 60
+    name = os.path.basename(writer.files_written[0])
+    assert name == 'part-20261001T000000-20261002T000000-00000.npz'
+    
+    # 다음 날 구간은 그대로, 재시도에서 사라진 장치의 파일은 지워짐
+    ArchiveWriter(str(tmp_path), fmt='npz', start=end, end=end + timedelta(days=1)).write_rows(
+        [(end, 'dht_001', 'SEN', 'TEM', 1.0, None)])
+    retry = ArchiveWriter(str(tmp_path), chunk_rows=20, fmt='npz', start=start, end=end)
+    retry.write_rows([row for row in make_rows(days=1) if row[1] == 'dht_001'])
+    data = read_archive(str(tmp_path))
+    assert len(data['timestamp']) == 31
+    assert set(data['device_id']) == {'dht_001'}
+    print("✓ 같은 구간 재내보내기 멱등")
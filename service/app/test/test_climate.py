@@ -0,0 +1,85 @@
+# test_climate.py
+"""실내 환경 제어 (히스테리시스) 테스트"""
+
+import pytest
+
+from climate import ClimateController
+from models import SerialData
+
+ROOMS = {
+    'dht_001': {
+        'AIR': {'on_above': 28, 'off_below': 26},
+        'HEAT': {'on_below': 20, 'off_above': 22},
+        'HUMI': {'on_below': 40, 'off_above': 50},
+    }
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(**kwargs):
+    clock = Clock()
+    return ClimateController(ROOMS, clock=clock, **kwargs), clock
+
+
+def _sen(metric_name, value):
+    return SerialData('dht_001', 'SEN', metric_name, str(value))
+
+
+def test_hysteresis_emits_only_on_transitions():
+    """밴드 안에서는 명령 없음, 경계를 넘을 때만 전환"""
+    controller, clock = _controller(min_on_sec=0, min_off_sec=0)
+    commands = []
+    temperatures = [24, 25, 27, 28.5, 29, 27, 26.5, 27.9, 25.5, 25, 19, 21, 22]
+    for temperature in temperatures * 50:
+        clock.now += 3
+        commands += [c.command for c in controller.evaluate(_sen('TEM', temperature))]
+
+    # 처음 24도: 에어컨/히터 OFF 확정, 이후 주기마다 AIR ON/OFF, HEAT ON/OFF (27, 26.5 등 밴드 안은 유지)
+    cycle = ['CMO,AIR,1', 'CMO,AIR,0', 'CMO,HEAT,1', 'CMO,HEAT,0']
+    assert commands == ['CMO,AIR,0', 'CMO,HEAT,0'] + cycle * 50
+    stats = controller.stats()
+    assert stats['commands'] == len(commands)
+    assert stats['command_ratio'] < 0.2
+    print(f"✓ 센서 {stats['samples']}회 → 명령 {len(commands)}회")
+
+
+def test_min_on_off_time():
+    """최소 유지 시간 전에는 전환 보류"""
+    controller, clock = _controller(min_on_sec=120, min_off_sec=60)
+    assert [c.value for c in controller.evaluate(_sen('HUM', 35))] == ['1']
+    clock.now = 30
+    assert controller.evaluate(_sen('HUM', 55)) == []
+    clock.now = 121
+    assert [c.value for c in controller.evaluate(_sen('HUM', 55))] == ['0']
+    assert controller.stats()['loops']['dht_001/HUMI']['held'] == 1
+    print("✓ 최소 유지 시간")
+
+
+def test_manual_override_and_resume():
+    """대시보드 수동 제어 ACK → 자동 중지, -1 → 재개"""
+    controller, clock = _controller(min_on_sec=0, min_off_sec=0)
+    assert controller.evaluate(_sen('TEM', 30))[0].command == 'CMO,AIR,1'
+    controller.evaluate(SerialData('dht_001', 'ACK', 'AIR', '1'))   # 자동 명령의 ACK
+    assert not controller.loops[('dht_001', 'AIR')].manual
+
+    controller.evaluate(SerialData('dht_001', 'ACK', 'AIR', '0'))   # 사용자가 끔
+    assert controller.evaluate(_sen('TEM', 31)) == []
+
+    controller.evaluate(SerialData('dht_001', 'ACK', 'AIR', '-1'))  # Auto
+    assert controller.evaluate(_sen('TEM', 31))[0].command == 'CMO,AIR,1'
+    print("✓ 수동 제어 / 자동 복귀")
+
+
+def test_invalid_thresholds():
+    with pytest.raises(ValueError):
+        ClimateController({'dht_001': {'AIR': {'on_above': 25, 'off_below': 26}}})
+    with pytest.raises(ValueError):
+        ClimateController({'dht_001': {'FAN': {'on_above': 28, 'off_below': 26}}})
+    print("✓ 잘못된 설정 거부")
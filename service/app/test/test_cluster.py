@@ -0,0 +1,206 @@
+# test_cluster.py
+"""다중 게이트웨이 클러스터 테스트 (코디네이터 + 게이트웨이 2개를 로컬 HTTP로 실행)"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+from werkzeug.serving import make_server
+
+from app import SerialMonitorApp
+from cluster import Coordinator, KeepAliveRequestHandler
+from models import CMORequest
+from queue_processor import QueueProcessor
+
+DB_CONFIG = {'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'}
+
+
+def _serve(flask_app):
+    server = make_server('127.0.0.1', 0, flask_app, threaded=True,
+                         request_handler=KeepAliveRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _gateway(node_id, coordinator_url, devices):
+    """device 모니터를 Mock으로 가진 게이트웨이 + HTTP 서버"""
+    app = SerialMonitorApp(DB_CONFIG, {}, cluster_config={
+        'node_id': node_id, 'coordinator': coordinator_url, 'advertise_url': 'http://unset'})
+    for device_id in devices:
+        app.monitors[device_id] = Mock()
+        app.monitors[device_id].health.return_value = {}
+    app.queue_processor = QueueProcessor(app.cmd_queue, app.monitors)
+    app.queue_processor.forwarder = app.cluster.forward_cmo
+    app.queue_processor.forward_owner = lambda device_id: (app.cluster.owner(device_id) or (None,))[0]
+    server, url = _serve(app.flask_app)
+    app.cluster.advertise_url = url
+    return app, server
+
+
+def _cluster(tmp_ttl=15.0):
+    coordinator = Coordinator(ttl=tmp_ttl)
+    coordinator_server, coordinator_url = _serve(coordinator.create_app())
+    gw_a, server_a = _gateway('gw_a', coordinator_url, ['ele_001'])
+    gw_b, server_b = _gateway('gw_b', coordinator_url, ['dht_001'])
+    for gateway in (gw_a, gw_b, gw_a):  # 두 번째 A 하트비트로 B까지 포함된 디렉터리 수신
+        assert gateway.cluster.heartbeat(list(gateway.monitors))
+    return gw_a, gw_b, [coordinator_server, server_a, server_b]
+
+
+def test_coordinator_directory():
+    """먼저 합류한 노드가 소유, 하트비트가 끊긴 노드는 ttl 후 제외"""
+    now = [0.0]
+    coordinator = Coordinator(ttl=10, clock=lambda: now[0])
+    coordinator.register('gw_a', 'http://a:5000', ['ele_001'])
+    directory = coordinator.register('gw_b', 'http://b:5000', ['ele_001', 'dht_001'])
+    assert directory['owners'] == {'ele_001': 'gw_a', 'dht_001': 'gw_b'}
+    assert directory['conflicts'] == {'ele_001': ['gw_a', 'gw_b']}
+
+    now[0] = 11
+    directory = coordinator.register('gw_b', 'http://b:5000', ['ele_001', 'dht_001'])
+    assert list(directory['nodes']) == ['gw_b']
+    assert directory['owners'] == {'ele_001': 'gw_b', 'dht_001': 'gw_b'}
+    assert coordinator.leave('gw_b') and coordinator.directory()['owners'] == {}
+    print("✓ 소유 디렉터리 / 만료")
+
+
+def test_command_forwarded_to_owner():
+    """B에 보낸 ele_001 명령이 A 큐로 들어가고, 상태 조회도 A로 전달"""
+    gw_a, gw_b, servers = _cluster()
+    try:
+        client = gw_b.flask_app.test_client()
+        response = client.post('/api/command', json={'device_id': 'ele_001', 'metric_name': 'FLOOR',
+                                                     'value': '3'})
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['node'] == 'gw_a' and body['command'] == 'CMO,FLOOR,3'
+        assert gw_a.cmd_queue.qsize() == 1 and gw_b.cmd_queue.qsize() == 0
+
+        status = client.get(f"/api/command/{body['request_id']}").get_json()
+        assert status['status'] == 'queued' and status['node'] == 'gw_a'
+
+        # 어느 노드에도 없는 장치는 그대로 404
+        response = client.post('/api/command', json={'device_id': 'cur_009', 'metric_name': 'MOTOR',
+                                                     'value': 'OPEN'})
+        assert response.status_code == 404
+
+        # 전달된 요청은 다시 전달하지 않음
+        response = gw_a.flask_app.test_client().post(
+            '/api/command', json={'device_id': 'dht_001', 'metric_name': 'AIR', 'value': '1'},
+            headers={'X-Cluster-Forwarded': 'gw_b'})
+        assert response.status_code == 404
+        assert gw_a.cluster.stats()['forwarded'] == 0 and gw_b.cluster.stats()['forwarded'] == 1
+    finally:
+        for server in servers:
+            server.shutdown()
+    print("✓ 소유 노드로 명령 전달")
+
+
+def test_cmd_routing_across_nodes():
+    """B 장치의 CMD가 원격 장치로 라우팅되고 큐 처리에서 소유 노드로 전달"""
+    gw_a, gw_b, servers = _cluster()
+    try:
+        assert gw_b.remote_devices == ['ele_001']
+        assert gw_b.rules.route('FLOOR') == 'ele_001'
+
+        cmo = CMORequest(device_id='ele_001', metric_name='FLOOR', value='1', command='CMO,FLOOR,1')
+        gw_b.queue_processor.track(cmo)
+        gw_b.queue_processor._process_cmo(cmo)
+        deadline = time.monotonic() + 5
+        while gw_b.queue_processor.get_result(cmo.request_id)['status'] == 'queued':
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        result = gw_b.queue_processor.get_result(cmo.request_id)
+        assert result['status'] == 'forwarded' and result['node'] == 'gw_a'
+        gw_b.queue_processor.stop()
+        assert gw_a.queue_processor.get_result(result['remote_request_id'])['status'] == 'queued'
+    finally:
+        for server in servers:
+            server.shutdown()
+    print("✓ 노드 간 CMD 라우팅")
+
+
+def test_forwarding_does_not_block_queue():
+    """응답 없는 소유 노드로의 전달이 로컬 명령/다른 노드 전달을 막지 않음"""
+    release = threading.Event()
+    forwarded = []
+
+    def forwarder(cmo):
+        if cmo.device_id == 'ele_009':  # gw_dead는 응답하지 않음
+            release.wait(5)
+            return None
+        forwarded.append(cmo.device_id)
+        return {'node': 'gw_a', 'request_id': 'remote-1'}
+
+    monitor = Mock()
+    monitor.send_command.return_value = True
+    processor = QueueProcessor(Mock(), {'dht_001': monitor})
+    processor.forwarder = forwarder
+    processor.forward_owner = {'ele_009': 'gw_dead', 'ele_001': 'gw_a'}.get
+    try:
+        cmos = [CMORequest(device_id=d, metric_name='X', value='1', command=f'CMO,{d}')
+                for d in ('ele_009', 'dht_001', 'ele_001', 'cur_404')]
+        started = time.monotonic()
+        for cmo in cmos:
+            processor.track(cmo)
+            processor._process_cmo(cmo)
+        assert time.monotonic() - started < 1
+        assert monitor.send_command.called  # 로컬 장치는 바로 전송
+        assert processor.get_result(cmos[3].request_id)['error'] == 'device not found'
+
+        deadline = time.monotonic() + 5
+        while processor.get_result(cmos[2].request_id)['status'] != 'forwarded':
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert processor.get_result(cmos[0].request_id)['status'] == 'queued'  # 아직 전달 중
+        release.set()
+        while processor.get_result(cmos[0].request_id)['status'] == 'queued':
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert processor.get_result(cmos[0].request_id)['error'] == 'forward failed'
+        assert sorted(processor.forward_lanes) == ['gw_a', 'gw_dead']
+    finally:
+        release.set()
+        processor.stop()
+    print("✓ 노드별 전달 스레드")
+
+
+def test_peer_events_aggregated():
+    """A의 로컬 이벤트가 B의 클러스터 스트림과 /api/state에 반영"""
+    gw_a, gw_b, servers = _cluster()
+    try:
+        subscriber = gw_b.cluster_hub.subscribe()
+        gw_b.cluster.running = True
+        gw_b.cluster._follow_peers()
+        deadline = time.monotonic() + 5
+        while gw_a.event_hub.stats()['subscribers'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        gw_a.event_hub.publish('state', {'device_id': 'ele_001', 'data_type': 'SEN',
+                                         'metric_name': 'FLOOR', 'value': '2'})
+        frames = []
+        while time.monotonic() < deadline:
+            frame = subscriber.get(0.1)
+            if frame and b'FLOOR' in frame:
+                frames.append(frame)
+                break
+        assert frames, "원격 이벤트 수신 안 됨"
+        payload = json.loads(frames[0].decode().split('data: ', 1)[1])
+        assert payload['node'] == 'gw_a' and payload['value'] == '2'
+        assert gw_b.system_state.to_dict()['device_id'] == 'ele_001'
+
+        # 로컬 스트림(scope=local)에는 원격 이벤트가 없어 노드 간에 되돌아가지 않음
+        assert gw_b.event_hub.stats()['published'] == 0
+    finally:
+        gw_b.cluster.stop()
+        for server in servers:
+            server.shutdown()
+    print("✓ 노드 이벤트 집계")
+
+
+if __name__ == "__main__":
+    test_coordinator_directory()
+    test_command_forwarded_to_owner()
+    test_cmd_routing_across_nodes()
+    test_peer_events_aggregated()
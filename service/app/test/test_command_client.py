@@ -0,0 +1,49 @@
+# test_command_client.py
+"""대시보드 낙관적 명령 추적 테스트 (가짜 클라이언트, 서버 없음)"""
+
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("requests")
+
+# 대시보드(service/pyqt)는 패키지가 아니므로 파일 경로로 읽음
+CLIENT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'pyqt', 'command_client.py')
+_spec = importlib.util.spec_from_file_location('command_client', CLIENT_PATH)
+command_client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(command_client)
+
+
+class FakeClient:
+    """조회 요청만 기록 (실제 HTTP 없음)"""
+
+    def __init__(self):
+        self.fetched = []
+
+    def submit(self, fn, request_id):
+        self.fetched.append(request_id)
+
+
+def test_forwarded_keeps_polling_remote_id():
+    """forwarded는 되돌리지 않고 remote_request_id로 이어서 조회, 그 결과로 확정"""
+    client = FakeClient()
+    pending = command_client.PendingCommands(client)
+    events = []
+    pending.rolled_back.connect(lambda key, status: events.append(('rollback', status)))
+    pending.confirmed.connect(lambda key, elapsed: events.append(('confirmed', key)))
+
+    pending.add('ele', 'local-1', rollback=lambda: events.append(('undo', 'ele')))
+    pending._poll()
+    pending._on_status('local-1', {'success': True, 'status': 'forwarded', 'terminal': True,
+                                   'node': 'gw-b', 'remote_request_id': 'remote-1'})
+    assert pending.is_pending('ele') and events == []
+
+    pending._poll()
+    assert client.fetched == ['local-1', 'remote-1']
+    pending._on_status('remote-1', {'success': True, 'status': 'acked', 'terminal': True})
+    assert not pending.is_pending('ele')
+    assert events == [('confirmed', 'ele')]
+    print("✓ forwarded 명령은 소유 노드 결과까지 대기")
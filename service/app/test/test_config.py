@@ -0,0 +1,187 @@
+# test_config.py
+"""설정 파일 / 무중단 다시 읽기 테스트"""
+
+import json
+import threading
+
+import pytest
+
+import app as app_module
+from app import SerialMonitorApp
+from config import diff_ports, load_config
+from models import LinkConfig
+
+DB = {'host': 'db1', 'user': 'u', 'password': 'p', 'database': 'd'}
+
+
+class FakeMonitor:
+    """연결/종료만 기록하는 모니터 (/dev/missing은 연결 실패)"""
+
+    def __init__(self, device_id, port, cmd_queue, db_handler, link=None):
+        self.device_id = device_id
+        self.port = port
+        self.db_handler = db_handler
+        self.link = link
+        self.running = False
+        self.closed = False
+
+    def connect(self, quiet=False):
+        self.running = self.port != '/dev/missing'
+        return self.running
+
+    def run(self):
+        pass
+
+    def close(self):
+        self.closed = True
+        self.running = False
+
+
+class FakeDatabase:
+    """host가 down이면 연결 실패"""
+
+    def __init__(self, **config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.conn = None
+        self.closed = False
+
+    def connect(self):
+        return self.config['host'] != 'down'
+
+    def close(self):
+        self.closed = True
+
+    def retire(self, replacement):
+        self.replaced_by = replacement
+        self.closed = True
+
+
+def _write(path, ports, db=DB):
+    path.write_text(json.dumps({'db': db, 'ports': ports}), encoding='utf-8')
+
+
+def test_load_config(tmp_path, monkeypatch):
+    """환경 변수 치환, 잘못된 설정은 ValueError"""
+    monkeypatch.setenv('TEST_DB_PASSWORD', 'secret')
+    path = tmp_path / 'config.json'
+    _write(path, {'ele_001': '/dev/ttyACM0'}, {**DB, 'password': '${TEST_DB_PASSWORD}'})
+    assert load_config(str(path))['db']['password'] == 'secret'
+
+    _write(path, {'ele_001': '/dev/ttyACM0'}, {**DB, 'password': '${TEST_DB_MISSING}'})
+    with pytest.raises(ValueError):
+        load_config(str(path))
+    _write(path, {'ele_001': {'port': '/dev/ttyACM0', 'speed': 9600}})
+    with pytest.raises(ValueError):
+        load_config(str(path))
+    print("✓ 설정 파일 검증")
+
+
+def test_diff_ports():
+    old = {'ele_001': LinkConfig('/dev/ttyACM0'), 'cur_001': LinkConfig('/dev/ttyACM1')}
+    new = {'ele_001': LinkConfig('/dev/ttyACM0'), 'cur_001': LinkConfig('/dev/ttyACM1', baudrate=115200),
+           'dht_001': LinkConfig('/dev/ttyACM2')}
+    assert diff_ports(old, new) == (['dht_001'], [], ['cur_001'])
+    assert diff_ports(new, {}) == ([], list(new), [])
+    print("✓ 포트 설정 비교")
+
+
+def test_reload_only_changed_monitors(tmp_path, monkeypatch):
+    """바뀐 장치만 다시 연결, 나머지 모니터와 상태는 유지"""
+    monkeypatch.setattr(app_module, 'SerialMonitor', FakeMonitor)
+    monkeypatch.setattr(app_module, 'DatabaseHandler', FakeDatabase)
+    ports = {'ent_001': '/dev/ttyACM1', 'ele_001': '/dev/ttyACM0', 'cur_001': '/dev/ttyACM2'}
+    path = tmp_path / 'config.json'
+    _write(path, ports)
+
+    app = SerialMonitorApp(DB, ports, config_path=str(path))
+    app._setup_monitors()
+    entrance = app.monitors['ent_001']
+    elevator = app.monitors['ele_001']
+    app.system_state.update('ent_001', 'SEN', 'RFID_ACCESS', '1')
+
+    _write(path, {'ent_001': '/dev/ttyACM1',
+                  'ele_001': {'port': '/dev/ttyACM0', 'baudrate': 115200},
+                  'dht_001': '/dev/ttyACM3',
+                  'tv_001': '/dev/missing'})
+    result = app.reload_config()
+    assert result['success']
+    assert (result['added'], result['removed'], result['changed']) == \
+        (['dht_001', 'tv_001'], ['cur_001'], ['ele_001'])
+    assert result['failed'] == ['tv_001'] and result['db'] == 'unchanged'
+
+    assert app.monitors['ent_001'] is entrance and not entrance.closed  # 출입문은 끊기지 않음
+    assert elevator.closed and app.monitors['ele_001'].link.baudrate == 115200
+    assert 'cur_001' not in app.monitors and 'dht_001' in app.monitors
+    assert 'cur_001' not in app.available_devices and 'tv_001' in app.available_devices
+    assert app.system_state.to_dict()['device_id'] == 'ent_001'
+    for monitor in app.monitors.values():
+        assert monitor.available_devices is app.available_devices
+    print("✓ 바뀐 모니터만 다시 연결")
+
+
+def test_reload_db_and_invalid_file(tmp_path, monkeypatch):
+    """DB는 새 연결이 열린 뒤 교체, 잘못된 파일/연결 실패는 기존 설정 유지"""
+    monkeypatch.setattr(app_module, 'SerialMonitor', FakeMonitor)
+    monkeypatch.setattr(app_module, 'DatabaseHandler', FakeDatabase)
+    ports = {'ele_001': '/dev/ttyACM0'}
+    path = tmp_path / 'config.json'
+    _write(path, ports)
+    app = SerialMonitorApp(DB, ports, config_path=str(path))
+    app._setup_monitors()
+    old = app.db_handler
+
+    _write(path, ports, {**DB, 'host': 'down'})
+    assert app.reload_config()['db'] == 'failed'
+    assert app.db_handler is old and not old.closed
+
+    _write(path, ports, {**DB, 'host': 'db2'})
+    client = app.flask_app.test_client()
+    response = client.post('/api/admin/reload')
+    assert response.status_code == 200 and response.get_json()['db'] == 'swapped'
+    assert old.closed and app.db_handler.config['host'] == 'db2'
+    assert app.monitors['ele_001'].db_handler is app.db_handler
+
+    path.write_text('{"db": ', encoding='utf-8')
+    response = client.post('/api/admin/reload')
+    assert response.status_code == 400
+    assert app.db_handler.config['host'] == 'db2' and 'ele_001' in app.monitors
+    print("✓ DB 연결 교체 / 잘못된 설정 무시")
+
+
+def test_attach_refuses_duplicate_device(monkeypatch):
+    """같은 device_id가 이미 있으면 attach 거부 (기존 모니터를 덮어써 고아로 만들지 않음)"""
+    monkeypatch.setattr(app_module, 'SerialMonitor', FakeMonitor)
+    monkeypatch.setattr(app_module, 'DatabaseHandler', FakeDatabase)
+    app = SerialMonitorApp(DB, {'ele_001': '/dev/ttyACM0'})
+    app._setup_monitors()
+    existing = app.monitors['ele_001']
+
+    assert not app.attach_monitor('ele_001', '/dev/ttyACM5')
+    assert app.monitors['ele_001'] is existing and not existing.closed
+    assert app.detach_monitor('ele_001') and existing.closed
+    assert app.attach_monitor('ele_001', '/dev/ttyACM5')
+    assert app.monitors['ele_001'].port == '/dev/ttyACM5'
+    assert app.available_devices == ['ele_001']
+    print("✓ 중복 attach 거부")
+
+
+def test_reload_and_watcher_share_lock(tmp_path, monkeypatch):
+    """설정 다시 읽기 중에는 핫플러그 감지가 모니터 목록을 바꾸지 못함"""
+    monkeypatch.setattr(app_module, 'SerialMonitor', FakeMonitor)
+    monkeypatch.setattr(app_module, 'DatabaseHandler', FakeDatabase)
+    path = tmp_path / 'config.json'
+    _write(path, {'ele_001': '/dev/ttyACM0'})
+    app = SerialMonitorApp(DB, {'ele_001': '/dev/ttyACM0'}, config_path=str(path))
+    app._setup_monitors()
+
+    attached = threading.Event()
+    with app.monitors_lock:
+        worker = threading.Thread(target=lambda: app.attach_monitor('dht_001', '/dev/ttyACM3')
+                                  and attached.set())
+        worker.start()
+        assert not attached.wait(0.2)  # 락을 쥔 동안 대기
+        app.reload_config()  # 같은 스레드에서는 재진입 가능
+    worker.join(2)
+    assert attached.is_set() and 'dht_001' in app.monitors
+    print("✓ attach/detach/reload 공용 락")
@@ -0,0 +1,130 @@
+# test_curtain_viewer.py
+"""커튼 로그 뷰어 테이블 모델 테스트 (가짜 행, DB/QThread 없음)"""
+
+import importlib.util
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+# parser/는 패키지가 아니고 parser.py와 이름이 겹치므로 파일 경로로 읽음
+VIEWER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'parser', 'curtain_log_viewer.py')
+_spec = importlib.util.spec_from_file_location('curtain_log_viewer', VIEWER_PATH)
+viewer = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(viewer)
+
+BASE = datetime(2026, 10, 19, 12, 0, 0)
+
+
+def _rows(*ids):
+    """id마다 LIGHT 행 하나 (created_at = BASE + id초)"""
+    return [{'id': log_id, 'device_id': 'cur_001', 'created_at': BASE + timedelta(seconds=log_id),
+             'light_value': log_id * 10, 'motor_direction': 1, 'current_step': 40, 'max_steps': 200}
+            for log_id in ids]
+
+
+def _ids(model):
+    return [model.data(model.index(row, 0)) for row in range(model.rowCount())]
+
+
+def test_prepend_keeps_id_keyset():
+    """새 행은 맨 위에, maxId는 다음 증분 조회 커서"""
+    model = viewer.CurtainLogTableModel(_rows(5, 4, 3))
+    assert model.maxId() == 5
+
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.prependRows(_rows(8, 7, 6))
+    model.prependRows([])
+    assert inserted == [(0, 2)]  # 기존 행은 다시 그리지 않음
+    assert _ids(model) == ['8', '7', '6', '5', '4', '3']
+    assert model.maxId() == 8
+    assert viewer.CurtainLogTableModel().maxId() is None
+    print("✓ id keyset 증분 삽입")
+
+
+def test_trim_by_limit_and_time_window():
+    """limit을 넘거나 시간 창 밖인 행을 아래쪽부터 제거"""
+    model = viewer.CurtainLogTableModel(_rows(10, 9, 8, 7, 6, 5))
+    model.trim(BASE, limit=4)
+    assert _ids(model) == ['10', '9', '8', '7']
+
+    # 시간 창(BASE + 9초) 밖 - 경계 값(= since_time)은 유지
+    model.trim(BASE + timedelta(seconds=9), limit=10)
+    assert _ids(model) == ['10', '9']
+    assert model.rowCount() == 2
+
+    model.trim(BASE + timedelta(seconds=100), limit=10)
+    assert model.rowCount() == 0
+    print("✓ limit / 시간 창 정리")
+
+
+def test_rows_preformatted_by_column():
+    """행은 받을 때 컬럼별 표시 문자열로 변환 (data()는 조회만)"""
+    row = {'id': 1, 'device_id': 'cur_001', 'created_at': datetime(2026, 10, 19, 8, 5, 3, 250000),
+           'light_value': 512, 'motor_direction': None, 'current_step': 0}  # max_steps 없음
+    model = viewer.CurtainLogTableModel([row])
+    assert model.columnCount() == len(viewer.COLUMNS)
+    assert [model.data(model.index(0, col)) for col in range(model.columnCount())] == \
+        ['1', 'cur_001', '2026-10-19 08:05:03', '512', '', '0', '']
+    assert model._columns[viewer.COLUMNS.index('light_value')] == ['512']
+    assert model.headerData(2, viewer.Qt.Horizontal) == 'created_at'
+    assert model.data(model.index(0, 0), viewer.Qt.EditRole) is None
+    print("✓ 컬럼별 표시 문자열")
+
+
+def test_fetch_more_pages_by_oldest_id():
+    """fetchMore는 가장 오래된 id 이전 페이지를 요청, limit까지만"""
+    requests = []
+    model = viewer.CurtainLogTableModel()
+    model.fetch_older = lambda before_id, count: requests.append((before_id, count))
+    assert not model.canFetchMore()  # 첫 조회 전
+
+    model.setRows(_rows(*range(600, 100, -1)))  # 500행
+    assert model.rowCount() == viewer.PAGE_SIZE and model.canFetchMore()
+    model.fetchMore()
+    assert requests == [(101, viewer.PAGE_SIZE)]
+
+    model.appendRows(_rows(*range(100, 0, -1)))
+    assert model.rowCount() == 600 and _ids(model)[-1] == '1'
+    model.fetchMore()
+    assert requests[-1] == (1, viewer.PAGE_SIZE)
+
+    # 보관 한도가 있으면 남은 만큼만, 한도에 닿으면 더 요청하지 않음
+    model.limit = 650
+    model.appendRows([])
+    assert model.canFetchMore()
+    model.fetchMore()
+    assert requests[-1] == (1, 50)
+    model.limit = 600
+    model.appendRows([])
+    assert not model.canFetchMore()
+    print("✓ fetchMore 페이지 커서")
+
+
+def test_async_fetch_in_flight_and_exhausted():
+    """요청 중에는 중복 fetchMore 없음, 실패하면 cancelFetch로 재요청, 끝 페이지면 중단"""
+    requests = []
+    model = viewer.CurtainLogTableModel()
+    model.fetch_older = lambda before_id, count: requests.append((before_id, count))
+    model.setRows(_rows(30, 29, 28))
+
+    model.fetchMore()
+    assert not model.canFetchMore()  # 결과가 DB 스레드에서 오기 전
+    model.cancelFetch()  # 쿼리 실패
+    assert model.canFetchMore()
+    model.fetchMore()
+    assert requests == [(28, viewer.PAGE_SIZE), (28, viewer.PAGE_SIZE)]
+
+    model.appendRows(_rows(27, 26), exhausted=True)  # PAGE_SIZE보다 적게 옴
+    assert _ids(model)[-2:] == ['27', '26'] and not model.canFetchMore()
+
+    # 새로 조회하면 다시 페이지 요청 가능, 시간 창 밖으로 잘리면 더 오래된 행은 조회하지 않음
+    model.setRows(_rows(30, 29, 28))
+    assert model.canFetchMore()
+    model.trim(BASE + timedelta(seconds=29), limit=10)
+    assert _ids(model) == ['30', '29'] and not model.canFetchMore()
+    print("✓ 비동기 페이지 요청 상태")
@@ -0,0 +1,180 @@
+# test_discovery.py
+"""포트 핫플러그 감지 / 장치 식별 테스트"""
+
+import threading
+from unittest.mock import Mock
+
+import discovery
+from app import SerialMonitorApp
+from discovery import DeviceIdentifier, PortWatcher, classify_line
+
+
+class FakeSerial:
+    """readline으로 정해진 줄을 돌려주는 포트"""
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+        self.written = []
+        self.is_open = True
+        self.in_waiting = 0
+        self.timeout = 0.2
+
+    def reset_input_buffer(self):
+        pass
+
+    def write(self, data):
+        self.written.append(data)
+
+    def readline(self):
+        return self.lines.pop(0).encode() + b"\n" if self.lines else b""
+
+    def close(self):
+        self.is_open = False
+
+
+def _identifier(lines, **kwargs):
+    ser = FakeSerial(lines)
+    options = dict(boot_delay=0, handshake_timeout=0, listen_timeout=0.5)
+    options.update(kwargs)
+    return DeviceIdentifier(serial_factory=lambda *a, **k: ser, **options), ser
+
+
+def test_classify_line():
+    """수신 메트릭으로 장치 종류 판별"""
+    assert classify_line("SEN,FLOOR,3") == 'ele'
+    assert classify_line("CMD,FLOOR,1") == 'ent'
+    assert classify_line("SEN,TEM,25") == 'dht'
+    assert classify_line("SEN,LIGHT,512") == 'cur'
+    assert classify_line("Door is closed") is None
+    print("✓ 메트릭 기반 종류 판별")
+
+
+def test_identify_handshake_and_fallback():
+    """ID 응답이 있으면 device_id, 없으면 수신 메트릭으로 종류"""
+    identifier, ser = _identifier(["Booting", "ACK,ID,ele_002"])
+    assert identifier.identify("/dev/ttyACM3") == ("ele_002", ser)
+    assert ser.written == [b"CMO,ID,?\n"] and ser.is_open
+
+    identifier, ser = _identifier(["SEN,TEM,24", "SEN,HUM,40"])
+    assert identifier.identify("/dev/ttyACM3") == ("dht", ser)
+
+    identifier, ser = _identifier(["garbage"], listen_timeout=0.05)
+    assert identifier.identify("/dev/ttyACM3") == (None, None)
+    assert not ser.is_open
+    print("✓ 핸드셰이크 / 메트릭 판별 / 실패 시 포트 닫음")
+
+
+def test_watcher_reattaches_reenumerated_device(monkeypatch):
+    """ttyACM0 → ttyACM1로 재열거된 장치를 같은 device_id로 다시 연결"""
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'},
+                           {'ele_001': '/dev/ttyACM0', 'dht_001': '/dev/ttyACM9'})
+    old = Mock(port='/dev/ttyACM0')
+    app.monitors['ele_001'] = old
+
+    ports = {'/dev/ttyACM1': '/dev/ttyACM1'}
+    monkeypatch.setattr(discovery, 'scan_ports', lambda patterns: ports)
+    identifier = Mock()
+    identifier.identify.return_value = ('ele', FakeSerial([]))
+    watcher = PortWatcher(app, identifier)
+
+    try:
+        watcher.poll_once()
+        old.close.assert_called_once()
+        monitor = app.monitors['ele_001']
+        assert monitor.port == '/dev/ttyACM1' and monitor.running
+        assert monitor.available_devices is app.available_devices
+
+        # 이미 연결된 포트는 다시 식별하지 않음, 포트가 사라지면 분리
+        watcher.poll_once()
+        assert identifier.identify.call_count == 1
+        ports.clear()
+        watcher.poll_once()
+        assert 'ele_001' not in app.monitors
+        print("✓ 재열거된 장치 재연결 / 제거된 장치 분리")
+    finally:
+        for monitor in list(app.monitors.values()):
+            monitor.close()
+
+
+def test_resolve_device_id_new_number():
+    """port_config에 없는 종류는 새 번호 배정"""
+    app = Mock(port_config={'ele_001': '/dev/x'}, monitors={'ele_001': Mock(), 'cur_001': Mock()})
+    watcher = PortWatcher(app, Mock())
+    assert watcher.resolve_device_id('ele') == 'ele_002'
+    assert watcher.resolve_device_id('cur') == 'cur_002'
+    assert watcher.resolve_device_id('dht_007') == 'dht_007'
+    print("✓ device_id 배정")
+
+
+def test_allow_list_and_exclusive_open(tmp_path):
+    """허용 목록 패턴의 포트만 검색, 식별 시 exclusive로 열기"""
+    (tmp_path / 'usb-Arduino_1').touch()
+    (tmp_path / 'usb-Modem_1').touch()
+    ports = discovery.scan_ports([str(tmp_path / 'usb-Arduino*')])
+    assert list(ports.values()) == [str(tmp_path / 'usb-Arduino_1')]
+    assert discovery.scan_ports([]) == {}
+
+    opened = []
+    identifier = DeviceIdentifier(serial_factory=lambda *a, **k: opened.append(k) or FakeSerial([]),
+                                  boot_delay=0, listen_timeout=0)
+    identifier.identify(str(tmp_path / 'usb-Arduino_1'))
+    assert opened[0]['exclusive'] is True
+    print("✓ 허용 목록 / exclusive 열기")
+
+
+def test_watcher_keeps_static_ports(tmp_path, monkeypatch):
+    """허용 목록 밖이어도 장치 파일이 있는 고정 포트 모니터는 분리하지 않음"""
+    static_port = tmp_path / 'ttyACM0'
+    static_port.touch()
+    app = Mock(port_config={}, monitors={'ele_001': Mock(port=str(static_port))},
+               monitors_lock=threading.RLock())
+    monkeypatch.setattr(discovery, 'scan_ports', lambda patterns: {})
+    watcher = PortWatcher(app, Mock(), patterns=['/dev/serial/by-id/usb-Arduino*'])
+
+    watcher.poll_once()
+    app.detach_monitor.assert_not_called()
+    static_port.unlink()
+    watcher.poll_once()
+    app.detach_monitor.assert_called_once_with('ele_001')
+    print("✓ 고정 포트 모니터 유지")
+
+
+def test_attach_applies_link_and_negotiates_outside_lock(monkeypatch):
+    """식별에 쓴 포트(9600 bps, timeout 0.2)에 장치 링크 설정을 적용, 협상 중에는 monitors_lock을 잡지 않음"""
+    import monitor as monitor_module
+
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'},
+                           {'cur_001': {'port': '/dev/ttyACM9', 'baudrate': 19200, 'timeout': 0.5,
+                                        'write_timeout': 2.0, 'negotiate_baudrate': 115200}})
+    lock_free = []
+
+    def probe():
+        acquired = app.monitors_lock.acquire(blocking=False)
+        lock_free.append(acquired)
+        if acquired:
+            app.monitors_lock.release()
+
+    def fake_negotiate(self):
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return False
+
+    monkeypatch.setattr(monitor_module.SerialMonitor, 'negotiate', fake_negotiate)
+    ser = FakeSerial([])
+    ser.baudrate = 9600
+    try:
+        assert app.attach_monitor('cur_001', '/dev/ttyACM3', ser)
+        monitor = app.monitors['cur_001']
+        assert monitor.ser is ser and monitor.running
+        assert (ser.baudrate, ser.timeout, ser.write_timeout) == (19200, 0.5, 2.0)
+        assert lock_free == [True]
+
+        # 이미 있는 device_id로 넘겨받은 포트는 닫힘
+        other = FakeSerial([])
+        assert not app.attach_monitor('cur_001', '/dev/ttyACM4', other)
+        assert not other.is_open
+        print("✓ 넘겨받은 포트에 링크 설정 / 락 밖 협상")
+    finally:
+        for monitor in list(app.monitors.values()):
+            monitor.close()
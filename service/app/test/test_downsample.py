@@ -0,0 +1,114 @@
+# test_downsample.py
+"""이력 다운샘플링 테스트"""
+
+from datetime import datetime
+from unittest.mock import Mock
+
+import numpy as np
+
+from app import SerialMonitorApp
+from downsample import downsample, lttb, minmax
+
+
+def _series(n=100_000):
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 5000.0)
+    y[12_345] = 10.0    # 피크
+    y[67_890] = -10.0   # 골
+    return x, y
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    """LTTB: 개수, 양 끝 점, 피크 유지"""
+    x, y = _series()
+    dx, dy = lttb(x, y, 500)
+
+    assert len(dx) == 500
+    assert dx[0] == 0 and dx[-1] == len(x) - 1
+    assert np.all(np.diff(dx) > 0)
+    assert 10.0 in dy and -10.0 in dy
+    print("✓ LTTB 100,000 → 500점, 피크 유지")
+
+
+def test_minmax_keeps_extremes():
+    """min/max 구간: 개수 이하, 구간별 극값 유지"""
+    x, y = _series()
+    dx, dy = minmax(x, y, 500)
+
+    assert len(dx) <= 500
+    assert np.all(np.diff(dx) > 0)
+    assert dy.max() == 10.0 and dy.min() == -10.0
+    print(f"✓ min/max 100,000 → {len(dx)}점, 극값 유지")
+
+
+def test_downsample_small_and_nan():
+    """points보다 적으면 그대로, NaN은 제외"""
+    dx, dy = downsample([1, 2, 3], [1.0, float('nan'), 3.0], 100)
+    assert list(dx) == [1.0, 3.0]
+    assert list(dy) == [1.0, 3.0]
+    print("✓ 작은 입력 / NaN 처리")
+
+
+def _app():
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'}, {})
+    return app, app.flask_app.test_client()
+
+
+def test_history_api_points_constant():
+    """/api/history points 지정 시 구간 길이와 무관하게 응답 크기 고정"""
+    app, client = _app()
+    for i in range(20_000):
+        app.history_store.append("dht_001", "TEM", 20 + (i % 7), timestamp=1000.0 + i)
+
+    full = client.get('/api/history?device_id=dht_001&metric_name=TEM').get_json()
+    assert len(full['values']) == 20_000
+
+    for end in (1999.0, 20999.0):
+        data = client.get('/api/history?device_id=dht_001&metric_name=TEM'
+                          f'&start=1000&end={end}&points=300').get_json()
+        assert data['source'] == 'memory'
+        assert len(data['timestamps']) == 300
+
+    bad = client.get('/api/history?device_id=dht_001&metric_name=TEM&method=avg')
+    assert bad.status_code == 400
+    print("✓ /api/history points=300 → 300점")
+
+
+def test_history_api_falls_back_to_db():
+    """메모리 버퍼보다 오래된 구간은 DB query_range 사용"""
+    app, client = _app()
+    app.history_store.append("dht_001", "TEM", 25, timestamp=datetime(2026, 10, 19, 12).timestamp())
+    app.db_handler.conn = Mock()
+    app.db_handler.query_range = Mock(return_value=[
+        (datetime(2026, 10, 1, 0, 0, s), float(s), None) for s in range(60)
+    ] + [(datetime(2026, 10, 1, 0, 1), None, 'ERR')])
+
+    start = datetime(2026, 10, 1).timestamp()
+    data = client.get('/api/history?device_id=dht_001&metric_name=TEM'
+                      f'&start={start}&points=10').get_json()
+
+    assert data['source'] == 'db'
+    assert data['total'] == 60
+    assert len(data['values']) == 10
+    args = app.db_handler.query_range.call_args[0]
+    assert args[:3] == ("dht_001", "TEM", datetime(2026, 10, 1))
+    print("✓ 오래된 구간 DB 조회 후 다운샘플링")
+
+
+def test_history_api_without_start_uses_db_window():
+    """버퍼가 없는 메트릭을 start 없이 조회 - DB에서 end 이전 보관 기간만큼 (500 아님)"""
+    app, client = _app()
+    app.db_handler.conn = Mock()
+    app.db_handler.query_range = Mock(return_value=[(datetime(2026, 10, 19, 11, 0), 21.5, None)])
+
+    end = datetime(2026, 10, 19, 12).timestamp()
+    response = client.get(f'/api/history?device_id=dht_002&metric_name=HUM&end={end}')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['source'] == 'db' and data['values'] == [21.5]
+    args = app.db_handler.query_range.call_args[0]
+    assert args[2:] == (datetime(2026, 10, 18, 12), datetime(2026, 10, 19, 12))
+
+    response = client.get('/api/history?device_id=dht_002&metric_name=HUM')  # end도 없음
+    assert response.status_code == 200
+    print("✓ start 없는 DB 이력 조회")
@@ -0,0 +1,61 @@
+# test_history.py
+"""최근 이력 링 버퍼 테스트"""
+
+from unittest.mock import Mock
+
+from history import MetricRingBuffer, HistoryStore
+from models import SerialData
+from monitor import SerialMonitor
+from database import DatabaseHandler
+
+
+def test_ring_buffer_wraparound_range():
+    """링 버퍼 덮어쓰기 및 구간 조회 테스트"""
+    buf = MetricRingBuffer(5)
+    for i in range(8):
+        buf.append(float(i), float(i * 10))
+    
+    # 용량 5 → 3~7만 남음
+    assert len(buf) == 5
+    timestamps, values = buf.range()
+    assert list(timestamps) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert list(values) == [30.0, 40.0, 50.0, 60.0, 70.0]
+    
+    # 물리 경계를 넘는 구간
+    timestamps, values = buf.range(4.0, 6.0)
+    assert list(timestamps) == [4.0, 5.0, 6.0]
+    assert list(values) == [40.0, 50.0, 60.0]
+    
+    assert buf.latest() == (7.0, 70.0)
+    assert list(buf.range(100.0)[0]) == []
+    print("✓ 링 버퍼 구간 조회 성공")
+
+
+def test_memory_footprint_per_million_samples():
+    """100만 샘플 메모리 사용량: 16바이트/샘플 = 16MB"""
+    buf = MetricRingBuffer(1_000_000)
+    assert buf.nbytes == 1_000_000 * MetricRingBuffer.BYTES_PER_SAMPLE
+    
+    # 가득 채워도 추가 할당 없음
+    for i in range(1_000_000 + 10):
+        buf.append(float(i), 1.0)
+    assert buf.nbytes == 16_000_000
+    print(f"✓ 100만 샘플: {buf.nbytes / 1e6:.0f}MB")
+
+
+def test_history_store_from_handle_sen():
+    """_handle_sen에서 이력 저장 테스트"""
+    store = HistoryStore(retention_sec=60, sample_interval_sec=1.0)
+    assert store.capacity == 60
+    
+    db_handler = Mock(spec=DatabaseHandler)
+    monitor = SerialMonitor("dht_001", "/dev/ttyUSB1", None, db_handler)
+    monitor.history_store = store
+    
+    monitor._handle_sen(SerialData("dht_001", "SEN", "TEM", "25.5"))
+    monitor._handle_sen(SerialData("dht_001", "SEN", "STATE", "OPEN"))  # 숫자 아님
+    
+    assert store.latest("dht_001", "TEM")[1] == 25.5
+    assert store.latest("dht_001", "STATE") is None
+    db_handler.insert_log.assert_called_with("dht_001", "SEN", "STATE", "OPEN")
+    print("✓ SEN 데이터 이력 저장 성공")
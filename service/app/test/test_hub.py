@@ -0,0 +1,102 @@
+# test_hub.py
+"""이벤트 허브 / SSE 테스트"""
+
+import json
+from unittest.mock import Mock, patch
+
+import hub
+from hub import EventHub
+from monitor import SerialMonitor
+from database import DatabaseHandler
+from app import SerialMonitorApp
+
+
+def _parse(frame: bytes) -> dict:
+    fields = dict(line.split(': ', 1) for line in frame.decode('utf-8').strip().split('\n'))
+    fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+def test_publish_serializes_once():
+    """구독자 수와 무관하게 직렬화 1회, 모든 구독자가 같은 bytes 공유"""
+    event_hub = EventHub()
+    subscribers = [event_hub.subscribe() for _ in range(100)]
+    
+    with patch.object(hub.json, 'dumps', wraps=json.dumps) as dumps:
+        event_hub.publish('state', {'device_id': 'dht_001', 'value': '25'})
+    assert dumps.call_count == 1
+    
+    frames = [s.get(timeout=0) for s in subscribers]
+    assert all(frame is frames[0] for frame in frames)
+    parsed = _parse(frames[0])
+    assert parsed['event'] == 'state'
+    assert parsed['id'] == '1'
+    assert parsed['data'] == {'device_id': 'dht_001', 'value': '25'}
+    print("✓ 구독자 100명, 직렬화 1회")
+
+
+def test_slow_subscriber_evicted():
+    """큐가 가득 찬 구독자만 제거"""
+    event_hub = EventHub(max_queue=3)
+    slow = event_hub.subscribe()
+    fast = event_hub.subscribe()
+    
+    for i in range(5):
+        event_hub.publish('state', {'i': i})
+        fast.get(timeout=0)
+    
+    assert slow.closed
+    assert not fast.closed
+    assert event_hub.stats() == {'subscribers': 1, 'published': 5, 'evicted': 1}
+    print("✓ 느린 구독자 제거")
+
+
+def test_stream_initial_and_heartbeat():
+    """stream: 초기 상태 → 이벤트 → heartbeat, 종료 시 구독 해제"""
+    event_hub = EventHub(heartbeat_sec=0.01)
+    subscriber = event_hub.subscribe()
+    stream = event_hub.stream(subscriber, b"initial")
+    
+    assert next(stream) == b"initial"
+    event_hub.publish('state', {'value': '1'})
+    assert _parse(next(stream))['data'] == {'value': '1'}
+    assert next(stream) == b": ping\n\n"
+    
+    stream.close()
+    assert event_hub.stats()['subscribers'] == 0
+    print("✓ 스트림 종료 시 구독 해제")
+
+
+def test_monitor_publishes_state():
+    """SerialMonitor._process_data → state 이벤트"""
+    event_hub = EventHub()
+    subscriber = event_hub.subscribe()
+    monitor = SerialMonitor("dht_001", "/dev/ttyUSB1", None, Mock(spec=DatabaseHandler))
+    monitor.event_hub = event_hub
+    
+    monitor._process_data("SEN,TEM,25")
+    data = _parse(subscriber.get(timeout=0))['data']
+    assert (data['device_id'], data['data_type'], data['metric_name'], data['value']) == \
+        ("dht_001", "SEN", "TEM", "25")
+    print("✓ 수신 데이터 발행")
+
+
+def test_events_endpoint():
+    """/api/events: 연결 직후 현재 상태, 이후 발행된 이벤트"""
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'}, {})
+    app.system_state.update("cur_001", "SEN", "LIGHT", "300")
+    client = app.flask_app.test_client()
+    
+    response = client.get('/api/events', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    body = iter(response.response)
+    assert _parse(next(body))['data']['value'] == "300"
+    
+    app.event_hub.publish('command', {'request_id': 'abc', 'status': 'acked'})
+    parsed = _parse(next(body))
+    assert parsed['event'] == 'command'
+    assert parsed['data']['status'] == 'acked'
+    
+    response.close()
+    assert app.event_hub.stats()['subscribers'] == 0
+    print("✓ /api/events 스트림")
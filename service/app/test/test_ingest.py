@@ -0,0 +1,125 @@
+# test_ingest.py
+"""레거시 장치 파서 플러그인 / 일괄 저장 테스트"""
+
+from unittest.mock import Mock
+
+from database import BatchedLogWriter, DatabaseHandler
+from ingest_daemon import parse_port
+from ingest_plugins import CurtainParser, DhtAssembler, EntranceParser, make_line_parser
+from monitor import SerialMonitor
+from test_migrate import FakeCursor, make_handler
+
+
+def _tuples(records):
+    return [(r.device_id, r.data_type, r.metric_name, r.value) for r in records]
+
+
+def test_curtain_and_entrance_plugins():
+    """커튼/출입문 한 줄 → 백필과 같은 메트릭"""
+    assert _tuples(CurtainParser()("cur_001,512,1,40,200", "curtain:/dev/ttyACM0")) == [
+        ("cur_001", "SEN", "LIGHT", "512"),
+        ("cur_001", "SEN", "MOTOR_DIR", "1"),
+        ("cur_001", "SEN", "CUR_STEP", "40"),
+        ("cur_001", "SEN", "MAX_STEP", "200"),
+    ]
+    assert CurtainParser()("cur_001,abc,1,40,200", "x") == []
+    
+    entrance = EntranceParser()
+    assert _tuples(entrance("valid,ent_001,AB CD", "x")) == [("ent_001", "SEN", "RFID_ACCESS", "AB CD")]
+    assert _tuples(entrance("OPENED,ent_001,-", "x")) == [("ent_001", "SEN", "MOTOR", "1")]
+    assert entrance("[DEBUG] Received: x,y,z", "x") == []
+    assert entrance("UNKNOWN,ent_001,1", "x") == []
+    print("✓ 커튼/출입문 플러그인")
+
+
+def test_dht_assembler_multiline():
+    """DHT: 세 줄이 모두 모여야 TEM/HUM 발행, 0.0도 유효"""
+    dht = DhtAssembler()
+    assert dht("DHT-01", "x") == []
+    assert dht("온도:0.0°C", "x") == []
+    assert _tuples(dht("습도:17%", "x")) == [
+        ("DHT-01", "SEN", "TEM", "0.0"),
+        ("DHT-01", "SEN", "HUM", "17"),
+    ]
+    # 발행 후 초기화
+    assert dht("습도:18%", "x") == []
+    assert dht("garbage", "x") == []
+    print("✓ DHT 여러 줄 조립")
+
+
+def test_make_line_parser_and_port_spec():
+    assert make_line_parser('cmo') is None
+    assert make_line_parser('dht') is not make_line_parser('dht')  # 포트마다 새 상태
+    assert parse_port("curtain=/dev/ttyACM0") == ("curtain", "/dev/ttyACM0")
+    try:
+        parse_port("lamp=/dev/ttyACM0")
+        assert False, "알 수 없는 종류는 거부해야 함"
+    except Exception:
+        pass
+    print("✓ 플러그인 생성 / --port 파싱")
+
+
+def test_insert_logs_single_executemany():
+    """insert_logs: 행 수와 무관하게 executemany 1회"""
+    cursor = FakeCursor()
+    handler = make_handler(cursor)
+    rows = [(None, "cur_001", "SEN", "LIGHT", i) for i in range(100)]
+    
+    assert handler.insert_logs(rows)
+    many = [e for e in cursor.executed if e[0] == DatabaseHandler.INSERT_MANY_SQL]
+    assert len(many) == 1
+    assert len(many[0][1]) == 100
+    handler.conn.commit.assert_called_once()
+    print("✓ 100행 → executemany 1회, 커밋 1회")
+
+
+def test_batched_writer_flush_and_retry():
+    """BatchedLogWriter: batch_size 단위 저장, 실패 시 보관 후 재시도"""
+    db = Mock()
+    db.insert_logs.return_value = True
+    writer = BatchedLogWriter(db, batch_size=10, max_pending=25)
+    
+    for i in range(25):
+        writer.insert_log("cur_001", "SEN", "LIGHT", str(i))
+    assert writer.flush() == 25
+    assert [len(call.args[0]) for call in db.insert_logs.call_args_list] == [10, 10, 5]
+    
+    db.insert_logs.return_value = False
+    for i in range(20):
+        writer.insert_log("cur_001", "SEN", "LIGHT", str(i))
+    assert writer.flush() == 0
+    assert writer.stats()['pending'] == 20
+    
+    # 실패 중 넘친 행은 오래된 것부터 버림
+    for i in range(10):
+        writer.insert_log("cur_001", "SEN", "LIGHT", str(100 + i))
+    assert writer.stats()['pending'] == 25
+    assert writer.stats()['dropped'] == 5
+    
+    db.insert_logs.return_value = True
+    assert writer.flush() == 25
+    assert writer.stats()['written'] == 50
+    print("✓ 일괄 저장 / 실패 재시도")
+
+
+def test_monitor_with_line_parser_uses_writer():
+    """line_parser가 있는 모니터 → 여러 행을 writer에 예약"""
+    writer = Mock(spec=BatchedLogWriter)
+    monitor = SerialMonitor("curtain:/dev/ttyACM0", "/dev/ttyACM0", None, writer,
+                            line_parser=CurtainParser())
+    
+    monitor._process_data("cur_001,512,1,40,200")
+    assert writer.insert_log.call_count == 4
+    writer.insert_log.assert_any_call("cur_001", "SEN", "LIGHT", "512")
+    print("✓ 모니터 → 플러그인 → writer")
+
+
+def test_monitor_without_queue_ignores_cmd():
+    """수집 데몬 모니터(명령 큐 없음) - CMD 줄은 무시하고 수신은 계속"""
+    writer = Mock(spec=BatchedLogWriter)
+    monitor = SerialMonitor("cmo:/dev/ttyACM0", "/dev/ttyACM0", None, writer)
+    
+    monitor._process_data("CMD,FLOOR,3")
+    monitor._process_data("SEN,TEM,25")
+    writer.insert_log.assert_called_once_with("cmo:/dev/ttyACM0", "SEN", "TEM", "25")
+    print("✓ 명령 큐 없는 모니터의 CMD 무시")
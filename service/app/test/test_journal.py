@@ -0,0 +1,186 @@
+# test_journal.py
+"""명령 저널 / 멱등 키 / 재시작 복구 테스트"""
+
+import json
+import time
+from unittest.mock import Mock
+
+from app import SerialMonitorApp
+from journal import CommandJournal
+from models import CMORequest
+from queue_processor import QueueProcessor
+
+DB_CONFIG = {'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'}
+
+
+def _cmo(value='3', timeout=30.0, **fields):
+    return CMORequest(device_id='ele_001', metric_name='FLOOR', value=value,
+                      command=f"CMO,FLOOR,{value}", timeout=timeout, **fields)
+
+
+def test_claim_and_record(tmp_path):
+    """키는 한 번만 예약되고, 상태 변화가 한 줄씩 추가됨"""
+    journal = CommandJournal(str(tmp_path / 'journal.jsonl'), fsync=False)
+    assert journal.recover() == ([], [])
+
+    cmo = _cmo()
+    assert journal.claim('retry-1', cmo.request_id) is None
+    assert journal.claim('retry-1', 'other') == cmo.request_id
+    journal.record(cmo, 'queued')
+    journal.record(cmo, 'sent')
+    journal.record(cmo, 'acked')
+    assert journal.flush()
+
+    lines = [json.loads(line) for line in open(tmp_path / 'journal.jsonl', encoding='utf-8')]
+    assert [line['op'] for line in lines] == ['accept', 'status', 'status']
+    assert lines[0]['key'] == 'retry-1' and lines[-1]['status'] == 'acked'
+    assert journal.stats()['duplicates'] == 1
+
+    journal.release('retry-2')  # 없는 키 해제는 무시
+    print("✓ 키 예약 / 상태 기록")
+
+
+def test_recover_resend_and_expire(tmp_path):
+    """미완료 요청은 timeout에 따라 재전송/만료, 끝난 요청의 키는 재시작 후에도 유지"""
+    path = str(tmp_path / 'journal.jsonl')
+    journal = CommandJournal(path, fsync=False)
+    journal.recover()
+    live = _cmo('3')
+    stale = _cmo('5', timeout=10.0, timestamp=time.time() - 60)
+    done = _cmo('7')
+    journal.claim('done-key', done.request_id)
+    journal.record(live, 'sent')
+    journal.record(stale, 'queued')
+    journal.record(done, 'acked')
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "status", "request_id"')  # 기록 중 끊긴 마지막 줄
+
+    restarted = CommandJournal(path, fsync=False)
+    resend, expired = restarted.recover()
+    assert [cmo.request_id for cmo in resend] == [live.request_id]
+    assert resend[0].timestamp == live.timestamp  # 남은 timeout 유지
+    assert [cmo.request_id for cmo in expired] == [stale.request_id]
+    assert restarted.claim('done-key', 'new') == done.request_id
+    print("✓ 재시작 복구")
+
+
+def test_compaction_drops_finished(tmp_path):
+    """키 없는 끝난 요청은 압축 때 빠짐"""
+    journal = CommandJournal(str(tmp_path / 'journal.jsonl'), fsync=False, compact_after=10)
+    journal.recover()
+    for index in range(20):
+        cmo = _cmo(str(index))
+        journal.record(cmo, 'sent')
+        journal.record(cmo, 'acked')
+    pending = _cmo('99')
+    journal.record(pending, 'queued')
+    assert journal.flush()
+
+    lines = open(tmp_path / 'journal.jsonl', encoding='utf-8').read().splitlines()
+    assert len(lines) < 10
+    assert journal.get(pending.request_id)['status'] == 'queued'
+    assert journal.stats()['open'] == 1
+    print("✓ 저널 압축")
+
+
+def _app(tmp_path):
+    app = SerialMonitorApp(DB_CONFIG, {}, journal_config={'path': str(tmp_path / 'journal.jsonl'),
+                                                          'fsync': False})
+    app.monitors['ele_001'] = Mock()
+    app.monitors['ele_001'].health.return_value = {}
+    app.queue_processor = QueueProcessor(app.cmd_queue, app.monitors)  # 처리 스레드 없이
+    app.cmd_queue.on_drop = app.queue_processor.discard
+    app._recover_commands()
+    return app
+
+
+def test_api_idempotency_key(tmp_path):
+    """같은 Idempotency-Key로 재시도하면 새로 큐에 넣지 않음"""
+    app = _app(tmp_path)
+    client = app.flask_app.test_client()
+    body = {'device_id': 'ele_001', 'metric_name': 'FLOOR', 'value': '3'}
+
+    first = client.post('/api/command', json=body, headers={'Idempotency-Key': 'call-3'}).get_json()
+    retry = client.post('/api/command', json=body, headers={'Idempotency-Key': 'call-3'}).get_json()
+    other = client.post('/api/command', json={**body, 'idempotency_key': 'call-3b'}).get_json()
+    assert retry['duplicate'] and retry['request_id'] == first['request_id']
+    assert retry['command'] == 'CMO,FLOOR,3'
+    assert other['request_id'] != first['request_id']
+    assert app.cmd_queue.qsize() == 2
+
+    # 재시작 → 큐에 있던 두 요청이 다시 큐로, 같은 키 재시도는 여전히 중복
+    app.journal.close()
+    restarted = _app(tmp_path)
+    assert restarted.cmd_queue.qsize() == 2
+    client = restarted.flask_app.test_client()
+    retry = client.post('/api/command', json=body, headers={'Idempotency-Key': 'call-3'}).get_json()
+    assert retry['duplicate'] and retry['status'] == 'queued'
+    assert client.get(f"/api/command/{first['request_id']}").get_json()['status'] == 'queued'
+    assert restarted.cmd_queue.qsize() == 2
+    print("✓ 멱등 키 API")
+
+
+def test_status_journaled_through_processor(tmp_path):
+    """QueueProcessor 상태 변화가 저널에 기록됨"""
+    journal = CommandJournal(str(tmp_path / 'journal.jsonl'), fsync=False)
+    journal.recover()
+    monitor = Mock()
+    monitor.send_command.return_value = True
+    processor = QueueProcessor(Mock(), {'ele_001': monitor})
+    processor.journal = journal
+
+    cmo = _cmo()
+    processor.track(cmo)
+    processor._process_cmo(cmo)
+    processor.handle_ack('ele_001', 'FLOOR', '3')
+    assert journal.get(cmo.request_id)['status'] == 'acked'
+    assert journal.stats()['open'] == 0
+    print("✓ 처리 결과 저널 기록")
+
+
+def test_record_does_not_block_on_disk(tmp_path, monkeypatch):
+    """record는 파일 기록을 기다리지 않음 - fsync는 기록 스레드가 모아서 한 번에"""
+    import threading
+    import journal as journal_module
+
+    journal = CommandJournal(str(tmp_path / 'journal.jsonl'), fsync=True)
+    journal.recover()
+    release = threading.Event()
+    syncs = []
+
+    def slow_fsync(fd):
+        release.wait(5)
+        syncs.append(fd)
+
+    monkeypatch.setattr(journal_module.os, 'fsync', slow_fsync)
+    cmos = [_cmo(str(index)) for index in range(20)]
+    started = time.monotonic()
+    for cmo in cmos:
+        journal.record(cmo, 'queued')
+    assert time.monotonic() - started < 1  # 첫 fsync가 막혀 있어도 바로 반환
+    assert journal.get(cmos[-1].request_id)['status'] == 'queued'
+
+    release.set()
+    assert journal.flush()
+    assert len(syncs) < len(cmos)  # 여러 줄을 한 번의 fsync로
+    journal.close()
+    lines = open(tmp_path / 'journal.jsonl', encoding='utf-8').read().splitlines()
+    assert len(lines) == len(cmos)
+    print("✓ 저널 group commit")
+
+
+def test_status_api_marks_terminal(tmp_path):
+    """상태 조회 응답의 terminal - 대시보드는 이 값으로 대기를 끝냄 (dropped/expired/rejected 포함)"""
+    app = _app(tmp_path)
+    client = app.flask_app.test_client()
+    body = {'device_id': 'ele_001', 'metric_name': 'FLOOR', 'value': '3'}
+    request_id = client.post('/api/command', json=body).get_json()['request_id']
+    assert client.get(f"/api/command/{request_id}").get_json()['terminal'] is False
+
+    cmo = app.cmd_queue.get(timeout=1)
+    app.queue_processor.discard(cmo, 'dropped')
+    result = client.get(f"/api/command/{request_id}").get_json()
+    assert result['status'] == 'dropped' and result['terminal'] is True
+    app.journal.close()
+    print("✓ 상태 조회 terminal")
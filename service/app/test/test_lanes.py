@@ -0,0 +1,105 @@
+# test_lanes.py
+"""장치별 제한 크기 명령 큐 테스트"""
+
+import time
+from queue import Empty
+from unittest.mock import Mock
+
+import pytest
+
+from app import SerialMonitorApp
+from lanes import CommandLanes, LaneFull
+from models import CMORequest
+from queue_processor import QueueProcessor
+
+
+def _cmo(device_id, metric_name="MOTOR", value="OPEN", timeout=10.0):
+    return CMORequest(device_id, metric_name, value, f"CMO,{metric_name},{value}", timeout=timeout)
+
+
+def _drain(lanes):
+    items = []
+    while True:
+        try:
+            items.append(lanes.get(block=False))
+        except Empty:
+            return items
+
+
+def test_reject_and_drop_oldest():
+    """reject는 LaneFull, drop_oldest는 가장 오래된 요청을 버림"""
+    dropped = []
+    lanes = CommandLanes(max_per_device=2, policies={'ele_001': 'drop_oldest'})
+    lanes.on_drop = lambda cmo, status: dropped.append((cmo.value, status))
+
+    lanes.put(_cmo('cur_001', value='1'))
+    lanes.put(_cmo('cur_001', value='2'))
+    with pytest.raises(LaneFull) as info:
+        lanes.put(_cmo('cur_001', value='3'))
+    assert info.value.depth == 2 and info.value.retry_after >= 1
+
+    for floor in ('1', '2', '3'):
+        lanes.put(_cmo('ele_001', 'FLOOR', floor))
+    assert dropped == [('1', 'dropped')]
+    assert lanes.stats()['rejected'] == 1 and lanes.qsize() == 4
+    print("✓ reject / drop_oldest")
+
+
+def test_coalesce_keeps_position():
+    """coalesce: 같은 메트릭 대기 요청을 새 값으로 교체 (층 호출은 값마다 별도)"""
+    dropped = []
+    lanes = CommandLanes(policy='coalesce')
+    lanes.on_drop = lambda cmo, status: dropped.append((cmo.value, status))
+
+    lanes.put(_cmo('cur_001', 'MOTOR', 'OPEN'))
+    lanes.put(_cmo('cur_001', 'MODE', 'AUTO'))
+    lanes.put(_cmo('cur_001', 'MOTOR', 'CLOSE'))
+    lanes.put(_cmo('ele_001', 'FLOOR', '1'))
+    lanes.put(_cmo('ele_001', 'FLOOR', '2'))
+
+    assert dropped == [('OPEN', 'superseded')]
+    values = [cmo.value for cmo in _drain(lanes)]
+    assert values[:1] == ['CLOSE'] and sorted(values) == ['1', '2', 'AUTO', 'CLOSE']
+    print("✓ coalesce")
+
+
+def test_round_robin_and_expired_shedding():
+    """장치를 돌아가며 꺼내고, timeout이 지난 요청은 전송 전에 버림"""
+    dropped = []
+    lanes = CommandLanes()
+    lanes.on_drop = lambda cmo, status: dropped.append((cmo.device_id, status))
+
+    for _ in range(5):
+        lanes.put(_cmo('cur_001'))
+    lanes.put(_cmo('ele_001', 'FLOOR', '3'))
+    stale = _cmo('dht_001', 'AIR', 'ON', timeout=0.01)
+    lanes.put(stale)
+    time.sleep(0.02)
+
+    devices = [cmo.device_id for cmo in _drain(lanes)]
+    assert devices[:2] == ['cur_001', 'ele_001']
+    assert 'dht_001' not in devices and dropped == [('dht_001', 'expired')]
+    with pytest.raises(Empty):
+        lanes.get(timeout=0.01)
+    print("✓ 장치 순환 / 만료 요청 제거")
+
+
+def test_command_api_returns_429():
+    """lane이 가득 차면 /api/command 429 + Retry-After, 결과는 rejected"""
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'},
+                           {}, queue_config={'max_per_device': 1})
+    app.monitors['cur_001'] = Mock()
+    app.monitors['cur_001'].health.return_value = {}
+    app.queue_processor = QueueProcessor(app.cmd_queue, app.monitors)
+    app.cmd_queue.on_drop = app.queue_processor.discard
+    client = app.flask_app.test_client()
+
+    body = {'device_id': 'cur_001', 'metric_name': 'MOTOR', 'value': 'OPEN'}
+    assert client.post('/api/command', json=body).status_code == 200
+    response = client.post('/api/command', json=body)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    data = response.get_json()
+    assert app.queue_processor.get_result(data['request_id'])['status'] == 'rejected'
+    assert client.get('/api/health').get_json()['queue']['rejected'] == 1
+    print("✓ /api/command 429")
@@ -0,0 +1,71 @@
+# test_link.py
+"""장치별 링크 설정 / 속도 협상 테스트 (pty 가상 장치)"""
+
+import time
+
+from models import LinkConfig
+from monitor import SerialMonitor
+from app import SerialMonitorApp
+from simulator import VirtualDevice, benchmark
+
+
+def test_link_config_from_port_config():
+    """port_config 값: 경로 문자열 또는 dict"""
+    assert LinkConfig.from_config('/dev/ttyACM0') == LinkConfig(port='/dev/ttyACM0')
+    link = LinkConfig.from_config({'port': '/dev/ttyACM1', 'baudrate': 57600, 'write_timeout': 0.5})
+    assert link.baudrate == 57600 and link.write_timeout == 0.5
+
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'},
+                           {'cur_001': {'port': '/dev/ttyACM1', 'baudrate': 57600}, 'ele_001': '/dev/ttyACM0'})
+    assert app.links['cur_001'].baudrate == 57600
+    assert app.links['ele_001'].baudrate == 9600
+    print("✓ 링크 설정 변환")
+
+
+def _connect(device, **link):
+    monitor = SerialMonitor('cur_001', device.path, None, None,
+                            link=LinkConfig(port=device.path, negotiate_timeout=0.3,
+                                            negotiate_attempts=2, **link))
+    monitor._dispatch = lambda parsed: None
+    assert monitor.connect()
+    monitor.close()
+    return monitor
+
+
+def test_negotiation_switches_both_sides():
+    """ACK,BAUD를 받으면 장치와 모니터 모두 새 속도"""
+    device = VirtualDevice(["SEN,LIGHT,1"])
+    device.start()
+    try:
+        monitor = _connect(device, negotiate_baudrate=115200)
+        deadline = time.monotonic() + 1
+        while device.baudrate != 115200 and time.monotonic() < deadline:
+            time.sleep(0.01)  # 장치는 ACK 전송을 마친 뒤 전환
+        assert monitor.baudrate == 115200 and device.baudrate == 115200
+        assert monitor.health()['baudrate'] == 115200
+        assert "CMO,BAUD,115200" in device.commands
+    finally:
+        device.stop()
+    print("✓ 속도 협상")
+
+
+def test_negotiation_fallback_without_firmware_support():
+    """CMO,BAUD를 무시하는 펌웨어면 기존 속도 유지"""
+    device = VirtualDevice(["SEN,LIGHT,1"], negotiate=False)
+    device.start()
+    try:
+        monitor = _connect(device, negotiate_baudrate=115200)
+        assert monitor.baudrate == 9600 and device.baudrate == 9600
+        assert device.commands.count("CMO,BAUD,115200") == 2
+    finally:
+        device.stop()
+    print("✓ 미지원 펌웨어 → 9600 유지")
+
+
+def test_benchmark_throughput_gain():
+    """시뮬레이터: 협상 후 처리량 증가"""
+    base = benchmark(0.5)
+    fast = benchmark(0.5, negotiate_baudrate=115200)
+    assert base['bytes_per_sec'] < 1000
+    assert fast['bytes_per_sec'] > 5 * base['bytes_per_sec']
+    print(f"✓ 9600: {base['bytes_per_sec']} B/s → 115200: {fast['bytes_per_sec']} B/s")
@@ -0,0 +1,183 @@
+# test_migrate.py
+"""통합 로그 스키마 / 마이그레이션 / 백필 테스트"""
+
+import os
+from unittest.mock import MagicMock
+
+from database import DatabaseHandler, split_value
+from migrate import (Backfiller, LegacySource, MIGRATIONS_DIR, list_migrations,
+                     map_curtain, map_entrance, map_generic, split_statements)
+
+
+class FakeCursor:
+    """execute 기록 + 스크립트된 조회 결과"""
+    
+    def __init__(self, results=None):
+        self.executed = []
+        self.results = list(results or [])
+        self.lastrowid = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        return False
+    
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if sql.startswith("INSERT INTO metrics"):
+            self.lastrowid += 1
+    
+    def executemany(self, sql, params):
+        self.executed.append((sql, list(params)))
+    
+    def fetchone(self):
+        return self.results.pop(0) if self.results else None
+    
+    def fetchall(self):
+        return self.results.pop(0) if self.results else []
+
+
+def make_handler(cursor):
+    handler = DatabaseHandler("localhost", "user", "pw", "db")
+    handler.conn = MagicMock()
+    handler.conn.cursor.return_value = cursor
+    return handler
+
+
+def test_migration_files():
+    """마이그레이션 파일 파싱 테스트"""
+    versions = [v for v, _ in list_migrations()]
+    assert versions[0] == '001'
+    
+    with open(os.path.join(MIGRATIONS_DIR, '001_unified_log.sql'), encoding='utf-8') as f:
+        statements = split_statements(f.read())
+    assert any('ix_log_device_metric_ts (device_id, metric_id, timestamp)' in s for s in statements)
+    assert all(not s.endswith(';') for s in statements)
+    print(f"✓ 001 마이그레이션: {len(statements)}개 문장")
+
+
+def test_insert_log_typed_values():
+    """insert_log - 숫자/문자 컬럼 분리 및 metric_id 캐시"""
+    assert split_value("25.5") == (25.5, None)
+    assert split_value("OPEN") == (None, "OPEN")
+    
+    cursor = FakeCursor()
+    handler = make_handler(cursor)
+    
+    assert handler.insert_log("dht_001", "SEN", "TEM", "25.5")
+    assert handler.insert_log("dht_001", "SEN", "TEM", "26.0")
+    assert handler.insert_log("ent_001", "SEN", "RFID_ACCESS", "AB12CD")
+    
+    metric_inserts = [e for e in cursor.executed if e[0].startswith("INSERT INTO metrics")]
+    assert len(metric_inserts) == 2  # TEM은 한 번만 조회
+    
+    log_inserts = [e[1] for e in cursor.executed if e[0] == DatabaseHandler.INSERT_SQL]
+    assert log_inserts == [
+        ("dht_001", 1, 25.5, None),
+        ("dht_001", 1, 26.0, None),
+        ("ent_001", 2, None, "AB12CD"),
+    ]
+    print("✓ 타입 분리 저장 성공")
+
+
+def test_legacy_mappers():
+    """구 테이블 행 → 통합 로그 행 매핑"""
+    rows = map_curtain({'id': 1, 'device_id': 'cur_001', 'created_at': 't',
+                        'light_value': 500, 'motor_direction': 1,
+                        'current_step': 100, 'max_steps': 2662})
+    assert [r[3] for r in rows] == ['LIGHT', 'MOTOR_DIR', 'CUR_STEP', 'MAX_STEP']
+    
+    assert map_entrance({'event_type': 'valid', 'device_id': 'ent_001',
+                         'card_uid': 'AB12', 'created_at': 't'}) == \
+        [('t', 'ent_001', 'SEN', 'RFID_ACCESS', 'AB12')]
+    assert map_entrance({'event_type': 'UNKNOWN', 'device_id': 'ent_001',
+                         'card_uid': 'AB12', 'created_at': 't'}) == []
+    print("✓ 구 테이블 매핑 성공")
+
+
+def test_backfill_batch_keyset():
+    """백필 배치 - 진행 위치 이후 행만 읽고 진행 위치 갱신"""
+    source_rows = [
+        {'log_id': 11, 'timestamp': 't1', 'device_id': 'dht_001',
+         'data_type': 'SEN', 'metric_name': 'TEM', 'value': '25'},
+        {'log_id': 12, 'timestamp': 't2', 'device_id': 'cur_001',
+         'data_type': 'SEN', 'metric_name': 'MOTOR', 'value': 'OPEN'},
+    ]
+    cursor = FakeCursor(results=[{'last_id': 10}, source_rows])
+    handler = make_handler(cursor)
+    
+    count = Backfiller(handler, batch_size=2).run_batch(LegacySource('logs', 'log_id', map_generic))
+    assert count == 2
+    
+    select = next(e for e in cursor.executed if e[0].startswith("SELECT * FROM `logs`"))
+    assert select[1] == (10, 2)
+    
+    inserted = next(e[1] for e in cursor.executed if e[0] == Backfiller.INSERT_SQL)
+    assert inserted == [('t1', 'dht_001', 1, 25.0, None), ('t2', 'cur_001', 2, None, 'OPEN')]
+    
+    progress = next(e[1] for e in cursor.executed if e[0].startswith("INSERT INTO backfill_progress"))
+    assert progress == ('logs', 12, 2)
+    print("✓ 키셋 배치 백필 성공")
+
+
+def test_partition_migration_leaves_pmax_empty():
+    """002 - 기존 행 구간은 월 파티션으로, pmax는 빈 채로 시작"""
+    with open(os.path.join(MIGRATIONS_DIR, '002_partition_log_entries.sql'), encoding='utf-8') as f:
+        statements = split_statements(f.read())
+    assert statements[-3:] == ['PREPARE partition_stmt FROM @partition_sql',
+                               'EXECUTE partition_stmt',
+                               'DEALLOCATE PREPARE partition_stmt']
+    months = next(s for s in statements if s.startswith('SET @month_partitions'))
+    assert 'MIN(timestamp)' in ''.join(statements) and 'WITH RECURSIVE' in months
+    assert not any(s.startswith('ALTER TABLE log_entries PARTITION BY') for s in statements)
+    print(f"✓ 002 마이그레이션: {len(statements)}개 문장")
+
+
+def test_retired_handler_forwards_writes(monkeypatch):
+    """교체된 핸들러 - 옛 핸들러를 들고 있던 쓰기는 새 핸들러로, 옛 접속 정보로 재연결하지 않음"""
+    import database
+    
+    old_cursor, new_cursor = FakeCursor(), FakeCursor()
+    old, new = make_handler(old_cursor), make_handler(new_cursor)
+    old_conn = old.conn
+    
+    old.retire(new)
+    assert old.conn is None and old_conn.close.called
+    assert old.insert_log("dht_001", "SEN", "TEM", "25")
+    assert old.insert_logs([(None, "dht_001", "SEN", "HUM", "40")])
+    assert not old_cursor.executed
+    assert [e[0] for e in new_cursor.executed if not e[0].startswith("INSERT INTO metrics")] == \
+        [DatabaseHandler.INSERT_SQL, DatabaseHandler.INSERT_MANY_SQL]
+    
+    monkeypatch.setattr(database.pymysql, 'connect', MagicMock(side_effect=AssertionError("재연결")))
+    old._reconnect()
+    assert not old.connect()
+    print("✓ 교체된 핸들러의 쓰기를 새 연결로")
+
+
+def test_metric_id_cached_after_commit():
+    """commit이 실패하면 metric_id를 캐시하지 않고 다음 저장에서 다시 조회"""
+    import pymysql
+    
+    cursor = FakeCursor()
+    handler = make_handler(cursor)
+    handler.conn.commit.side_effect = [pymysql.err.OperationalError(2013, "Lost connection"), None]
+    handler._reconnect = MagicMock()
+    
+    assert not handler.insert_log("dht_001", "SEN", "TEM", "25.5")
+    assert handler.metric_ids == {} and handler.uncommitted_metric_ids == {}
+    handler.conn.rollback.assert_called_once()
+    assert handler.insert_log("dht_001", "SEN", "TEM", "26.0")
+    assert handler.metric_ids == {("SEN", "TEM"): 2}
+    metric_inserts = [e for e in cursor.executed if e[0].startswith("INSERT INTO metrics")]
+    assert len(metric_inserts) == 2  # 롤백된 id를 재사용하지 않음
+    
+    # 일괄 저장 실패도 롤백, 롤백 자체가 실패해도 예외를 밖으로 내지 않음
+    handler.conn.commit.side_effect = pymysql.err.OperationalError(2013, "Lost connection")
+    handler.conn.rollback.side_effect = pymysql.err.InterfaceError(0, "")
+    handler.metric_ids.clear()
+    assert not handler.insert_logs([(None, "dht_001", "SEN", "HUM", "40")])
+    assert handler.conn.rollback.call_count == 2
+    assert handler.metric_ids == {} and handler.uncommitted_metric_ids == {}
+    print("✓ commit 후 metric_id 캐시")
@@ -0,0 +1,57 @@
+# test_recording.py
+"""DB 기록 정책 테스트"""
+
+from recording import RecordingFilter, RecordingPolicy
+
+
+def test_abs_deadband_and_heartbeat():
+    """절대 데드밴드 + 하트비트 테스트"""
+    rf = RecordingFilter({'TEM': RecordingPolicy(mode='abs', threshold=0.5, heartbeat=60.0)})
+    
+    assert rf.should_record("dht_001", "TEM", "25.0", now=0.0)      # 첫 샘플
+    assert not rf.should_record("dht_001", "TEM", "25.3", now=3.0)  # 데드밴드 내
+    assert rf.should_record("dht_001", "TEM", "25.6", now=6.0)      # 0.6 변화
+    assert not rf.should_record("dht_001", "TEM", "25.6", now=9.0)
+    assert rf.should_record("dht_001", "TEM", "25.6", now=66.0)     # 하트비트
+    
+    stats = rf.stats()["dht_001:TEM"]
+    assert stats == {'recorded': 3, 'suppressed': 2}
+    print("✓ 데드밴드/하트비트 동작 확인")
+
+
+def test_pct_change_and_interval_policies():
+    """변화율 / 변경 시 / 최소 주기 정책 테스트"""
+    rf = RecordingFilter({
+        'cur:LIGHT': RecordingPolicy(mode='pct', threshold=10.0),
+        'MOTOR_DIR': RecordingPolicy(mode='change'),
+        'FLOOR': RecordingPolicy(mode='interval', min_interval=5.0),
+    })
+    
+    assert rf.should_record("cur_001", "LIGHT", "500", now=0.0)
+    assert not rf.should_record("cur_001", "LIGHT", "540", now=1.0)  # 8%
+    assert rf.should_record("cur_001", "LIGHT", "560", now=2.0)      # 12%
+    
+    assert rf.should_record("cur_001", "MOTOR_DIR", "1", now=0.0)
+    assert not rf.should_record("cur_001", "MOTOR_DIR", "1", now=1.0)
+    assert rf.should_record("cur_001", "MOTOR_DIR", "-1", now=2.0)
+    
+    assert rf.should_record("ele_001", "FLOOR", "1", now=0.0)
+    assert not rf.should_record("ele_001", "FLOOR", "2", now=1.0)
+    assert rf.should_record("ele_001", "FLOOR", "2", now=6.0)
+    
+    # 정책 없는 메트릭은 모두 기록
+    assert rf.should_record("ent_001", "RFID_ACCESS", "AB12", now=0.0)
+    assert rf.should_record("ent_001", "RFID_ACCESS", "AB12", now=0.1)
+    assert rf.totals() == {'recorded': 8, 'suppressed': 3}
+    print("✓ 변화율/변경/주기 정책 동작 확인")
+
+
+def test_steady_sensor_write_reduction():
+    """변화 없는 3초 주기 센서 → 하트비트만 기록"""
+    rf = RecordingFilter()  # 기본 정책
+    for i in range(200):
+        rf.should_record("dht_001", "TEM", "24.0" if i % 2 else "24.2", now=i * 3.0)
+    
+    recorded = rf.stats()["dht_001:TEM"]['recorded']
+    assert recorded <= 200 // 10
+    print(f"✓ 200개 중 {recorded}개만 기록")
@@ -0,0 +1,98 @@
+# test_retention.py
+"""로그 파티션 관리 / 보관 기간 정리 테스트"""
+
+from datetime import datetime
+from unittest.mock import Mock
+
+from retention import Partition, PartitionManager, parse_bound
+
+
+def make_manager(**kwargs):
+    return PartitionManager(Mock(), **kwargs)
+
+
+def test_plan_new_day_partitions():
+    """오늘부터 precreate일 뒤까지 파티션 생성 계획"""
+    manager = make_manager(granularity='day', precreate=2)
+    existing = [Partition('p00000000', datetime(2000, 1, 1)), Partition('pmax', None)]
+    
+    new = manager.plan_new(existing, datetime(2026, 10, 19, 13, 0))
+    assert [(p.name, p.upper_bound) for p in new] == [
+        ('p20261019', datetime(2026, 10, 20)),
+        ('p20261020', datetime(2026, 10, 21)),
+        ('p20261021', datetime(2026, 10, 22)),
+    ]
+    
+    # 이미 만들어진 구간은 다시 만들지 않음
+    existing = existing[:1] + new + existing[1:]
+    assert [p.name for p in manager.plan_new(existing, datetime(2026, 10, 20, 1, 0))] == ['p20261022']
+    print("✓ 일 단위 파티션 생성 계획")
+
+
+def test_plan_new_month_partitions_year_boundary():
+    manager = make_manager(granularity='month', precreate=1)
+    new = manager.plan_new([Partition('pmax', None)], datetime(2026, 12, 5))
+    assert [(p.name, p.upper_bound) for p in new] == [
+        ('p202612', datetime(2027, 1, 1)),
+        ('p202701', datetime(2027, 2, 1)),
+    ]
+    print("✓ 월 단위 파티션 (연도 경계)")
+
+
+def test_drop_expired_archives_first():
+    """만료 파티션 - 아카이브 성공 시에만 DROP"""
+    archiver = Mock()
+    archiver.export_range.side_effect = [True, False]
+    manager = make_manager(retention_days=30, archiver=archiver)
+    manager.list_partitions = Mock(return_value=[
+        Partition('p00000000', datetime(2000, 1, 1)),
+        Partition('p20260901', datetime(2026, 9, 2)),
+        Partition('p20261001', datetime(2026, 10, 2)),
+        Partition('pmax', None),
+    ])
+    manager._execute = Mock(return_value=[])
+    
+    dropped = manager.drop_expired(datetime(2026, 10, 19))
+    
+    # p20261001은 2026-10-02 이후 행이 없지만 cutoff(2026-09-19)보다 늦으므로 유지
+    assert dropped == ['p00000000']
+    archiver.export_range.assert_any_call(None, datetime(2000, 1, 1))
+    archiver.export_range.assert_any_call(datetime(2000, 1, 1), datetime(2026, 9, 2))
+    manager._execute.assert_called_once_with("ALTER TABLE `log_entries` DROP PARTITION p00000000")
+    print("✓ 아카이브 실패 파티션은 삭제 보류")
+
+
+def test_parse_bound():
+    assert parse_bound("'2026-10-20 00:00:00'") == datetime(2026, 10, 20)
+    assert parse_bound("MAXVALUE") is None
+
+
+def test_ddl_uses_own_connection(monkeypatch):
+    """파티션 DDL은 db_handler.lock 밖의 전용 연결에서 실행, 설정이 바뀌면 다시 연결"""
+    import retention
+    
+    handler = Mock()
+    handler.config = {'host': 'db1'}
+    handler.lock.__enter__ = Mock(side_effect=AssertionError("handler lock 사용"))
+    connections = []
+    
+    def fake_connect(**config):
+        conn = Mock()
+        conn.config = config
+        conn.cursor.return_value.__enter__ = Mock(return_value=conn.cursor.return_value)
+        conn.cursor.return_value.__exit__ = Mock(return_value=False)
+        conn.cursor.return_value.fetchall.return_value = [('pmax', 'MAXVALUE')]
+        connections.append(conn)
+        return conn
+    
+    monkeypatch.setattr(retention.pymysql, 'connect', fake_connect)
+    manager = PartitionManager(handler)
+    assert manager.list_partitions() == [Partition('pmax', None)]
+    manager.list_partitions()
+    assert len(connections) == 1 and connections[0].config == {'host': 'db1', 'autocommit': True}
+    
+    handler.config = {'host': 'db2'}  # 설정 다시 읽기로 DB 교체
+    manager.list_partitions()
+    assert len(connections) == 2 and connections[0].close.called
+    assert connections[1].config['host'] == 'db2'
+    print("✓ 파티션 DDL 전용 연결")
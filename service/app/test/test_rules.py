@@ -0,0 +1,101 @@
+# test_rules.py
+"""CMD 라우팅 테이블 / 자동화 규칙 테스트"""
+
+import json
+import os
+import time
+from queue import Queue
+from unittest.mock import Mock
+
+from models import SerialData
+from monitor import SerialMonitor
+from rules import RoutingTable, RuleEngine
+
+RULES = {
+    'routes': {'FLOOR': 'ele'},
+    'rules': [
+        {'name': 'precall',
+         'when': {'device': 'ent', 'type': 'SEN', 'metric': 'RFID_ACCESS'},
+         'then': {'device': 'ele', 'metric': 'FLOOR', 'value': '1'},
+         'cooldown': 10},
+        {'name': 'bright',
+         'when': {'device': 'cur_001', 'metric': 'LIGHT', 'op': '>', 'value': 800},
+         'then': {'device': 'cur', 'metric': 'MOTOR', 'value': 'CLOSE'}},
+        {'name': 'mirror',
+         'when': {'device': 'dht', 'metric': 'TEM'},
+         'then': {'device': 'hvac', 'metric': 'SET', 'value': '$value'}},
+    ]
+}
+
+DEVICES = ['ent_001', 'ele_001', 'ele_002', 'cur_001']
+
+
+def _engine():
+    engine = RuleEngine(RULES)
+    engine.update_devices(DEVICES)
+    return engine
+
+
+def test_routing_table():
+    """라우팅: 설정된 metric, 이름=종류 대체, device_id 직접 지정"""
+    table = RoutingTable({'FLOOR': 'ele'}, DEVICES)
+    assert table.route('FLOOR') == 'ele_001'
+    assert table.route('cur') == 'cur_001'
+    assert table.route('hvac') is None
+    assert table.resolve('ele_002') == 'ele_002'
+    print("✓ 라우팅 테이블")
+
+
+def test_rules_fire_with_cooldown_and_counters():
+    """조건/쿨다운/대상 없음/값 변환 실패 카운터"""
+    engine = _engine()
+
+    cmos = engine.evaluate(SerialData('ent_001', 'SEN', 'RFID_ACCESS', 'A1B2'))
+    assert [(c.device_id, c.command) for c in cmos] == [('ele_001', 'CMO,FLOOR,1')]
+    assert engine.evaluate(SerialData('ent_001', 'SEN', 'RFID_ACCESS', 'A1B2')) == []
+
+    assert engine.evaluate(SerialData('cur_001', 'SEN', 'LIGHT', '500')) == []
+    assert engine.evaluate(SerialData('cur_001', 'SEN', 'LIGHT', 'bad')) == []
+    assert engine.evaluate(SerialData('cur_001', 'SEN', 'LIGHT', '900'))[0].command == 'CMO,MOTOR,CLOSE'
+    assert engine.evaluate(SerialData('dht_001', 'SEN', 'TEM', '25')) == []
+    assert engine.evaluate(SerialData('dht_001', 'SEN', 'HUM', '40')) == []
+
+    stats = {rule['name']: rule for rule in engine.stats()['rules']}
+    assert stats['precall']['fired'] == 1 and stats['precall']['suppressed'] == 1
+    assert stats['bright']['matched'] == 1 and stats['bright']['errors'] == 1
+    assert stats['mirror']['unroutable'] == 1
+    print("✓ 규칙 실행 / 쿨다운 / 카운터")
+
+
+def test_monitor_evaluates_rules_inline():
+    """모니터 수신 처리 중 규칙 결과를 명령 큐에 추가, CMD는 라우팅 테이블 사용"""
+    cmd_queue = Queue()
+    monitor = SerialMonitor('ent_001', '/dev/ttyACM1', cmd_queue, Mock())
+    monitor.rules = _engine()
+
+    monitor._process_data("SEN,RFID_ACCESS,A1B2")
+    monitor._process_data("CMD,FLOOR,3")
+    assert [cmd_queue.get_nowait().command for _ in range(2)] == ['CMO,FLOOR,1', 'CMO,FLOOR,3']
+    print("✓ 모니터 인라인 규칙")
+
+
+def test_no_match_overhead():
+    """일치하는 규칙이 없는 수신 데이터 평가 비용 (마이크로초 단위)"""
+    engine = _engine()
+    parsed = SerialData('dht_001', 'SEN', 'HUM', '40')
+    count = 100_000
+    started = time.perf_counter()
+    for _ in range(count):
+        engine.evaluate(parsed)
+    per_call = (time.perf_counter() - started) / count
+    assert per_call < 20e-6
+    print(f"✓ 규칙 없음 평가 {per_call * 1e6:.2f}µs")
+
+
+def test_shipped_rules_file_loads():
+    """rules.json 형식 확인"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rules.json')
+    engine = RuleEngine.load(path)
+    with open(path, encoding='utf-8') as f:
+        assert len(engine.rules) == len(json.load(f)['rules'])
+    print("✓ rules.json 로드")
@@ -0,0 +1,121 @@
+# test_workers.py
+"""공유 메모리 링 / 다중 프로세스 수집 테스트"""
+
+import multiprocessing
+from unittest.mock import Mock
+
+from app import SerialMonitorApp, SystemState
+from models import SerialData
+from shm_ring import ShmRing
+from workers import IngestWorkerPool, RemoteMonitor, encode_record, partition_ports
+
+
+def test_ring_roundtrip_and_wraparound():
+    """레코드 순서 유지, 끝을 넘는 레코드, 가득 찬 경우"""
+    ring = ShmRing.create(64)
+    try:
+        for round_ in range(20):
+            payload = f"SEN,TEM,{round_}".encode()
+            assert ring.put(payload)
+            assert ring.put(payload * 2)
+            assert ring.get() == payload
+            assert ring.get() == payload * 2
+        assert ring.get() is None
+
+        assert ring.put(b"x" * 40)
+        assert not ring.put(b"y" * 40)
+        assert ring.dropped == 1
+        print("✓ 링 왕복 / 경계 넘김 / 가득 참")
+    finally:
+        ring.close()
+
+
+def test_worker_full_ring_counts_one_drop():
+    """링이 가득 찬 채 full_wait가 지나면 레코드 하나당 dropped 1 (재시도 횟수가 아님)"""
+    import threading
+    from models import LinkConfig
+    from workers import WorkerMonitor
+
+    ring = ShmRing.create(64)
+    try:
+        assert ring.put(b"x" * 56)  # 가득 참
+        monitor = WorkerMonitor("dht_001", LinkConfig("/dev/ttyUSB0"), ring, threading.Lock())
+        monitor.full_wait = 0.05
+        monitor._dispatch(SerialData("dht_001", "SEN", "TEM", "25"))
+        monitor._dispatch(SerialData("dht_001", "SEN", "TEM", "26"))
+        assert ring.dropped == 2
+
+        ring.get()  # 공간이 생기면 넣고 dropped는 그대로
+        monitor._dispatch(SerialData("dht_001", "SEN", "TEM", "27"))
+        assert ring.dropped == 2 and ring.used() > 0
+        print("✓ 가득 찬 링 - 버린 레코드만 셈")
+    finally:
+        ring.close()
+
+
+def _producer(name, capacity, count):
+    ring = ShmRing.attach(name, capacity)
+    for i in range(count):
+        while not ring.put(encode_record("dht_001", SerialData("dht_001", "SEN", "TEM", str(i)))):
+            pass
+    ring.close()
+
+
+def test_ring_across_processes():
+    """다른 프로세스가 넣은 레코드를 순서대로 모두 받음"""
+    ring = ShmRing.create(4096)
+    count = 5000
+    try:
+        process = multiprocessing.get_context('spawn').Process(
+            target=_producer, args=(ring.name, ring.capacity, count))
+        process.start()
+
+        values = []
+        while len(values) < count:
+            values += [p.decode().rsplit('\x1f', 1)[1] for p in ring.get_many()]
+        process.join(5)
+
+        assert values == [str(i) for i in range(count)]
+        print(f"✓ 프로세스 간 {count}개 레코드 전달")
+    finally:
+        ring.close()
+
+
+def test_pool_dispatches_to_remote_monitors():
+    """링 레코드 → RemoteMonitor._dispatch, 명령은 작업 프로세스 큐로"""
+    assert partition_ports({'a': 1, 'b': 2, 'c': 3}, 2) == [{'a': 1, 'c': 3}, {'b': 2}]
+
+    pool = IngestWorkerPool({'ele_001': '/dev/null0', 'dht_001': '/dev/null1'}, 2,
+                            ring_capacity=4096)
+    try:
+        db = Mock()
+        monitors = pool.create_monitors(Mock(), db)
+        state = SystemState()
+        for monitor in monitors.values():
+            assert isinstance(monitor, RemoteMonitor) and monitor.connect()
+            monitor.system_state = state
+
+        ring_index = 1  # dht_001은 두 번째 묶음
+        pool.rings[ring_index].put(encode_record("dht_001", SerialData("dht_001", "SEN", "TEM", "25")))
+        assert pool.drain_once(ring_index) == 1
+        db.insert_log.assert_called_once_with("dht_001", "SEN", "TEM", "25")
+        assert state.to_dict()['value'] == "25"
+
+        assert monitors['ele_001'].send_command("CMO,FLOOR,3")
+        assert pool.command_queues[0].get(timeout=1) == ('ele_001', "CMO,FLOOR,3")
+        print("✓ 링 수신 처리 / 명령 큐 전달")
+    finally:
+        pool.stop()
+
+
+def test_app_uses_worker_pool():
+    """worker_processes 지정 시 모니터가 RemoteMonitor로 구성됨"""
+    app = SerialMonitorApp({'host': 'localhost', 'user': 'u', 'password': 'p', 'database': 'd'},
+                           {'ele_001': '/dev/null0'}, worker_processes=1)
+    try:
+        app._setup_monitors()
+        assert isinstance(app.monitors['ele_001'], RemoteMonitor)
+        assert app.monitors['ele_001'].event_hub is app.event_hub
+        print("✓ 앱 작업 프로세스 모드 구성")
+    finally:
+        app.worker_pool.stop()
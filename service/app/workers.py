@@ -0,0 +1,230 @@
+# workers.py
+"""다중 프로세스 수집 - 포트 읽기/파싱은 작업 프로세스, 상태/DB/API는 메인 프로세스
+
+작업 프로세스마다 port_config 일부를 맡아 SerialMonitor로 읽고 파싱한 뒤,
+파싱 결과를 공유 메모리 링(shm_ring)에 넣는다. 메인 프로세스는 작업 프로세스마다
+수신 스레드 하나로 링을 비우고, 해당 포트의 RemoteMonitor로 기존 처리
+(_dispatch: 상태 갱신, 푸시, SEN 저장, ACK, CMD)를 그대로 수행한다.
+명령(CMO)은 빈도가 낮으므로 작업 프로세스별 multiprocessing.Queue로 보낸다.
+"""
+
+import multiprocessing
+import threading
+import time
+from queue import Empty, Full
+from typing import Dict, List
+
+from models import LinkConfig, SerialData
+from monitor import SerialMonitor
+from shm_ring import ShmRing
+
+_SEPARATOR = '\x1f'
+
+
+def encode_record(source_id: str, parsed: SerialData) -> bytes:
+    """(수신 포트의 device_id, 파싱 결과) → 링 레코드"""
+    return _SEPARATOR.join((source_id, parsed.device_id, parsed.data_type,
+                            parsed.metric_name, str(parsed.value))).encode('utf-8')
+
+
+def decode_record(payload: bytes):
+    """링 레코드 → (수신 포트의 device_id, SerialData)"""
+    source_id, device_id, data_type, metric_name, value = \
+        payload.decode('utf-8').split(_SEPARATOR, 4)
+    return source_id, SerialData(device_id, data_type, metric_name, value)
+
+
+def partition_ports(port_config: Dict[str, object], processes: int) -> List[Dict[str, object]]:
+    """port_config를 processes개로 나눔 (순서대로 돌아가며 배정, 빈 묶음 제외)"""
+    groups = [{} for _ in range(max(1, processes))]
+    for index, (device_id, port) in enumerate(port_config.items()):
+        groups[index % len(groups)][device_id] = port
+    return [group for group in groups if group]
+
+
+class WorkerMonitor(SerialMonitor):
+    """작업 프로세스용 모니터 - 파싱 결과를 처리하지 않고 링에 넣음"""
+    
+    def __init__(self, device_id: str, link: LinkConfig, ring: ShmRing, ring_lock: threading.Lock):
+        super().__init__(device_id, link.port, None, None, link=link)
+        self.ring = ring
+        self.ring_lock = ring_lock  # 같은 프로세스의 포트 스레드들이 한 링을 공유 (생산자 1개 유지)
+        self.full_wait = 0.5  # 링이 가득 찼을 때 기다리는 최대 시간 (초)
+    
+    def _dispatch(self, parsed):
+        payload = encode_record(self.device_id, parsed)
+        deadline = time.monotonic() + self.full_wait
+        while True:
+            with self.ring_lock:
+                # 재시도마다 put 실패로 세지 않도록 공간이 있을 때만 넣음 (생산자 1개라 확인 후 put은 성공)
+                if self.ring.fits(payload) and self.ring.put(payload):
+                    return
+                if time.monotonic() > deadline:
+                    self.ring.dropped += 1  # 버린 레코드 하나당 한 번
+                    dropped = self.ring.dropped
+                    break
+            time.sleep(0.001)
+        print(f"[WORKER] {self.port} 링 가득 참, 레코드 버림 (누적 {dropped})")
+
+
+def _run_port(monitor: WorkerMonitor):
+    """수신 (연결 전이거나 끊기면 monitor.run 안에서 backoff 후 재연결)"""
+    monitor.running = True
+    monitor.connect()
+    monitor.run()
+
+
+def worker_main(ring_name: str, ring_capacity: int, links: Dict[str, LinkConfig],
+                command_queue, stop_event):
+    """작업 프로세스 진입점 - 맡은 포트를 읽고, 명령 큐의 CMO를 해당 포트로 전송"""
+    ring = ShmRing.attach(ring_name, ring_capacity)
+    ring_lock = threading.Lock()
+    monitors = {device_id: WorkerMonitor(device_id, link, ring, ring_lock)
+                for device_id, link in links.items()}
+    for monitor in monitors.values():
+        threading.Thread(target=_run_port, args=(monitor,), daemon=True,
+                         name=f"Worker-{monitor.device_id}").start()
+    
+    try:
+        while not stop_event.is_set():
+            try:
+                device_id, command = command_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            monitor = monitors.get(device_id)
+            if not monitor or not monitor.send_command(command):
+                print(f"[WORKER] {device_id} 명령 전송 실패: {command}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for monitor in monitors.values():
+            monitor.close()
+        ring.close()
+
+
+class RemoteMonitor(SerialMonitor):
+    """메인 프로세스용 모니터 - 포트는 작업 프로세스가 가지고 있음
+    
+    수신 처리(_dispatch 이하)는 SerialMonitor 그대로, 전송만 작업 프로세스로 넘긴다.
+    """
+    
+    def __init__(self, device_id: str, port: str, cmd_queue, db_handler, command_queue):
+        super().__init__(device_id, port, cmd_queue, db_handler)
+        self.command_queue = command_queue
+    
+    def connect(self, quiet: bool = False) -> bool:
+        self.running = True
+        return True
+    
+    def run(self):
+        """수신은 IngestWorkerPool 수신 스레드가 담당"""
+    
+    def health(self) -> dict:
+        """포트 연결 상태는 작업 프로세스가 관리 (여기서는 알 수 없음)"""
+        return {'port': self.port, 'state': 'worker'}
+    
+    def send_command(self, command: str) -> bool:
+        if not self.running:
+            return False
+        try:
+            self.command_queue.put_nowait((self.device_id, command))
+            return True
+        except Full:
+            print(f"[ERROR] {self.device_id} 명령 큐 가득 참")
+            return False
+    
+    def close(self):
+        self.running = False
+
+
+class IngestWorkerPool:
+    """작업 프로세스 묶음 - 프로세스마다 링 1개, 명령 큐 1개, 메인 쪽 수신 스레드 1개"""
+    
+    def __init__(self, port_config: Dict[str, object], processes: int, ring_capacity: int = 1 << 20):
+        self.ring_capacity = ring_capacity
+        links = {device_id: LinkConfig.from_config(value) for device_id, value in port_config.items()}
+        self.groups = partition_ports(links, processes)
+        self.context = multiprocessing.get_context('spawn')
+        self.stop_event = self.context.Event()
+        self.rings = [ShmRing.create(ring_capacity) for _ in self.groups]
+        self.command_queues = [self.context.Queue(maxsize=1000) for _ in self.groups]
+        self.monitors: Dict[str, RemoteMonitor] = {}
+        self.processes = []
+        self.threads = []
+        self.running = False
+        self.received = [0] * len(self.groups)
+    
+    def create_monitors(self, cmd_queue, db_handler) -> Dict[str, RemoteMonitor]:
+        """포트마다 RemoteMonitor 생성 (app.py에서 기존 모니터처럼 연결)"""
+        for index, group in enumerate(self.groups):
+            for device_id, link in group.items():
+                self.monitors[device_id] = RemoteMonitor(
+                    device_id, link.port, cmd_queue, db_handler, self.command_queues[index])
+        return self.monitors
+    
+    def start(self):
+        """작업 프로세스와 수신 스레드 시작"""
+        self.running = True
+        for index, group in enumerate(self.groups):
+            process = self.context.Process(
+                target=worker_main,
+                args=(self.rings[index].name, self.ring_capacity, group,
+                      self.command_queues[index], self.stop_event),
+                daemon=True,
+                name=f"IngestWorker-{index}"
+            )
+            process.start()
+            self.processes.append(process)
+            
+            thread = threading.Thread(target=self._drain, args=(index,), daemon=True,
+                                      name=f"RingReader-{index}")
+            thread.start()
+            self.threads.append(thread)
+        print(f"[✓] 수집 작업 프로세스 {len(self.processes)}개 시작 "
+              f"(포트 {sum(len(g) for g in self.groups)}개)")
+    
+    def drain_once(self, index: int, limit: int = 256) -> int:
+        """링 index의 레코드를 처리하고 처리한 개수 반환"""
+        records = self.rings[index].get_many(limit)
+        for payload in records:
+            try:
+                source_id, parsed = decode_record(payload)
+                monitor = self.monitors.get(source_id)
+                if monitor:
+                    monitor._dispatch(parsed)
+            except Exception as e:
+                print(f"[ERROR] 링 레코드 처리 오류: {e}")
+        self.received[index] += len(records)
+        return len(records)
+    
+    def _drain(self, index: int):
+        """수신 스레드 - 비어 있으면 1ms부터 최대 20ms까지 늘려가며 대기"""
+        idle = 0.001
+        while self.running:
+            if self.drain_once(index):
+                idle = 0.001
+            else:
+                time.sleep(idle)
+                idle = min(idle * 2, 0.02)
+    
+    def stop(self, timeout: float = 3.0):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=1)
+        for ring in self.rings:
+            ring.close()
+        for command_queue in self.command_queues:
+            command_queue.close()
+    
+    def stats(self) -> List[dict]:
+        return [{
+            'ports': list(group),
+            'alive': index < len(self.processes) and self.processes[index].is_alive(),
+            'received': self.received[index],
+            'ring_used': self.rings[index].used() if self.running else 0,
+        } for index, group in enumerate(self.groups)]
@@ -0,0 +1,213 @@
+"""대시보드 명령 전송 클라이언트 (비동기, keep-alive 세션)"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import requests
+from PyQt6 import QtCore
+
+# 더 바뀌지 않는 명령 상태 - 서버 응답의 terminal 값(journal.TERMINAL_STATUSES)이 우선,
+# terminal을 주지 않는 이전 서버용으로 같은 목록을 둔다
+TERMINAL_STATUSES = {'acked', 'timeout', 'failed', 'superseded', 'rejected', 'dropped',
+                     'expired', 'forwarded'}
+# 서버에서는 끝난 상태지만 명령은 다른 노드에서 처리 중 - remote_request_id로 이어서 조회
+FORWARDED = 'forwarded'
+
+
+class CommandClient(QtCore.QObject):
+    """/api/command 요청을 작업 스레드에서 보내고 결과를 시그널로 전달
+
+    같은 key(버튼)의 요청이 처리 중이면 새 요청은 무시하므로
+    연속 클릭에도 GUI 스레드는 막히지 않고 요청이 쌓이지 않는다.
+    """
+
+    # key, 응답 JSON(dict), 오류 메시지 ('' 이면 성공)
+    finished = QtCore.pyqtSignal(str, object, str)
+    # key, 처리 중 여부
+    busy_changed = QtCore.pyqtSignal(str, bool)
+
+    def __init__(self, api_url, max_workers=4, timeout=5, parent=None):
+        super().__init__(parent)
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="command")
+        self._in_flight = {}   # key -> 완료 콜백
+        self._lock = threading.Lock()
+        self.finished.connect(self._on_finished)
+
+    def is_busy(self, key):
+        with self._lock:
+            return key in self._in_flight
+
+    def send(self, key, device_id, metric_name, value, on_done=None, timeout=None):
+        """명령 전송 예약 - 같은 key가 처리 중이면 False
+
+        on_done(result, error)는 GUI 스레드에서 호출된다.
+        timeout은 서버가 ACK를 기다릴 시간 (None이면 서버 기본값).
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight[key] = on_done
+        self.busy_changed.emit(key, True)
+
+        payload = {
+            'device_id': device_id,
+            'metric_name': metric_name,
+            'value': value
+        }
+        if timeout is not None:
+            payload['timeout'] = timeout
+        self.executor.submit(self._post, key, payload)
+        return True
+
+    def _post(self, key, payload):
+        """작업 스레드: 요청 후 결과 시그널 발생"""
+        try:
+            response = self.session.post(
+                f"{self.api_url}/api/command",
+                json=payload,
+                timeout=self.timeout
+            )
+            result = response.json()
+            error = '' if result.get('success') else str(result.get('error'))
+        except (requests.RequestException, ValueError) as e:
+            result, error = {}, f"명령 전송 실패: {e}"
+        self.finished.emit(key, result, error)
+
+    def _on_finished(self, key, result, error):
+        """GUI 스레드: 처리 중 상태 해제 후 콜백 호출"""
+        with self._lock:
+            on_done = self._in_flight.pop(key, None)
+        self.busy_changed.emit(key, False)
+        if error:
+            print(f"[ERROR] {key}: {error}")
+        if on_done:
+            on_done(result, error)
+
+    def fetch_status(self, request_id):
+        """요청 처리 결과 조회 (작업 스레드에서 호출, 실패 시 None)"""
+        try:
+            response = self.session.get(
+                f"{self.api_url}/api/command/{request_id}",
+                timeout=self.timeout
+            )
+            return response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+
+    def close(self):
+        """작업 스레드와 세션 정리"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+@dataclass
+class PendingCommand:
+    """ACK를 기다리는 명령 - UI에는 이미 반영된 상태"""
+    key: str
+    request_id: str
+    rollback: Callable[[], None]
+    on_confirm: Optional[Callable[[], None]]
+    started_at: float   # 클릭 시각 (time.monotonic)
+    deadline: float
+    checking: bool = False
+
+
+class PendingCommands(QtCore.QObject):
+    """낙관적으로 반영한 명령을 request_id로 추적해 ACK면 확정, 아니면 되돌림
+
+    서버의 /api/command/<request_id> 상태를 poll_interval_ms마다 확인한다.
+    다른 노드로 전달된(forwarded) 명령은 되돌리지 않고 그 노드의 결과가 나올 때까지 확인한다.
+    같은 key(버튼)의 새 명령은 이전 명령을 대체하며, 이전 명령은 되돌리지 않는다.
+    """
+
+    # key, 클릭부터 ACK 확인까지 걸린 시간(초)
+    confirmed = QtCore.pyqtSignal(str, float)
+    # key, 상태 (timeout/failed/superseded/lost)
+    rolled_back = QtCore.pyqtSignal(str, str)
+    _status_received = QtCore.pyqtSignal(str, object)
+
+    def __init__(self, client, poll_interval_ms=200, grace=2.0, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.grace = grace
+        self._pending = {}   # key -> PendingCommand
+        self._status_received.connect(self._on_status)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(poll_interval_ms)
+        self._timer.timeout.connect(self._poll)
+
+    def add(self, key, request_id, rollback, on_confirm=None, timeout=10.0, started_at=None):
+        now = time.monotonic()
+        self._pending[key] = PendingCommand(
+            key, request_id, rollback, on_confirm,
+            started_at if started_at is not None else now,
+            now + timeout + self.grace
+        )
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def handle_result(self, result):
+        """서버가 푸시한 명령 처리 결과 반영 (어느 스레드에서나 호출 가능)"""
+        request_id = result.get('request_id')
+        if request_id:
+            self._status_received.emit(request_id, {'success': True, **result})
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def _poll(self):
+        """대기 중인 명령 상태 조회 요청 (응답은 _on_status에서 처리)"""
+        now = time.monotonic()
+        for pending in list(self._pending.values()):
+            if now > pending.deadline:
+                # 서버 응답도 없이 기한이 지남 (서버 재시작 등)
+                self._resolve(pending, 'lost')
+            elif not pending.checking:
+                pending.checking = True
+                self.client.submit(self._fetch, pending.request_id)
+        if not self._pending:
+            self._timer.stop()
+
+    def _fetch(self, request_id):
+        self._status_received.emit(request_id, self.client.fetch_status(request_id))
+
+    def _on_status(self, request_id, result):
+        """GUI 스레드: 상태에 따라 확정/되돌림"""
+        pending = next((p for p in self._pending.values() if p.request_id == request_id), None)
+        if pending is None:
+            return
+        pending.checking = False
+        if not result or not result.get('success'):
+            return
+        status = result.get('status')
+        if status == FORWARDED:
+            # 상태 조회 API가 전달한 요청 id를 소유 노드로 넘겨 주므로 그 id로 계속 확인
+            pending.request_id = result.get('remote_request_id') or pending.request_id
+            return
+        terminal = result.get('terminal')
+        if terminal is None:
+            terminal = status in TERMINAL_STATUSES
+        if terminal:
+            self._resolve(pending, status)
+
+    def _resolve(self, pending, status):
+        del self._pending[pending.key]
+        if status == 'acked':
+            if pending.on_confirm:
+                pending.on_confirm()
+            self.confirmed.emit(pending.key, time.monotonic() - pending.started_at)
+        else:
+            print(f"[ERROR] {pending.key}: 명령 미확인 ({status}) - 되돌림")
+            pending.rollback()
+            self.rolled_back.emit(pending.key, status)
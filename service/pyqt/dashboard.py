@@ -1,5 +1,6 @@
 """IoT 시스템 대시보드 UI (그래프 포함)"""
 
+import json
 import sys
 import threading
 import time
@@ -9,11 +10,18 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from command_client import CommandClient, PendingCommands
+from history_panel import HistoryPanel
+
 
 class GraphCanvas(FigureCanvas):
-    """그래프를 그리는 캔버스 클래스"""
+    """그래프를 그리는 캔버스 클래스
+
+    선(line) 객체는 한 번만 만들고 샘플마다 set_data로 갱신한다.
+    use_blit이면 축/범례가 그려진 배경을 캐시해 두고 선만 다시 그려 blit한다.
+    """
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, use_blit=True):
         self.fig = Figure(figsize=(8, 6))
         super().__init__(self.fig)
         self.setParent(parent)
@@ -24,70 +32,156 @@ class GraphCanvas(FigureCanvas):
         self.max_points = 50
         self.temp_data = deque(maxlen=self.max_points)
         self.hum_data = deque(maxlen=self.max_points)
-        self.index_data = deque(maxlen=self.max_points)
         self.current_index = 0
         
+        self.use_blit = use_blit
+        self._background = None
+        
+        # 폴링 스레드에서 받은 샘플 (UI 스케줄러가 한 번에 반영)
+        self._pending_samples = []
+        self._pending_lock = threading.Lock()
+        
         self.setup_plot()
+        self.mpl_connect('draw_event', self._on_draw)
     
     def setup_plot(self):
-        """그래프 초기 설정"""
+        """그래프 초기 설정 (축, 선, 범례는 여기서 한 번만 생성)"""
         self.ax1.clear()
         self.ax2.clear()
         
         self.ax1.tick_params(axis='y', labelcolor='red')
-        self.ax1.set_ylim(15, 35)
+        self.ax1.set_ylim(0, 35)
         self.ax1.grid(True, alpha=0.3)
         
         self.ax2.tick_params(axis='y', labelcolor='blue')
         self.ax2.set_ylim(0, 100)
         
+        # x는 버퍼 내 위치(0 ~ max_points-1)로 고정 → 축이 움직이지 않아 배경 재사용 가능
+        self.ax1.set_xlim(-0.5, self.max_points - 0.5)
         self.ax1.set_xticks([])
         
+        self.line_temp, = self.ax1.plot([], [], 'r-o', linewidth=2, markersize=4,
+                                        label='Temperature', animated=self.use_blit)
+        self.line_hum, = self.ax2.plot([], [], 'b-o', linewidth=2, markersize=4,
+                                       label='Humidity', animated=self.use_blit)
+        
+        lines = [self.line_temp, self.line_hum]
+        self.ax1.legend(lines, [l.get_label() for l in lines], loc='upper left', fontsize=9)
+        
         self.fig.tight_layout()
     
+    def _on_draw(self, event):
+        """전체 다시 그리기(최초 표시, 크기 변경) 후 배경 캐시"""
+        if not self.use_blit:
+            return
+        self._background = self.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+    
+    def _draw_lines(self):
+        self.ax1.draw_artist(self.line_temp)
+        self.ax2.draw_artist(self.line_hum)
+    
     def update_graph(self, temperature, humidity):
         """그래프 업데이트"""
-        self.index_data.append(self.current_index)
         self.temp_data.append(temperature)
         self.hum_data.append(humidity)
         self.current_index += 1
+        self.refresh()
+    
+    def push_sample(self, temperature, humidity):
+        """샘플만 쌓아 둠 (스레드 안전, 그리지 않음)"""
+        with self._pending_lock:
+            self._pending_samples.append((temperature, humidity))
+    
+    def flush_samples(self):
+        """쌓인 샘플을 한 번에 반영하고 한 번만 다시 그림 (GUI 스레드)"""
+        with self._pending_lock:
+            samples, self._pending_samples = self._pending_samples, []
+        if not samples:
+            return
+        for temperature, humidity in samples:
+            self.temp_data.append(temperature)
+            self.hum_data.append(humidity)
+        self.current_index += len(samples)
+        self.refresh()
+    
+    def refresh(self):
+        """현재 버퍼로 선 데이터 갱신 후 다시 그림"""
+        x = range(len(self.temp_data))
+        self.line_temp.set_data(x, self.temp_data)
+        self.line_hum.set_data(x, self.hum_data)
         
-        self.ax1.clear()
-        self.ax2.clear()
-        
-        line1 = self.ax1.plot(list(self.index_data), list(self.temp_data), 
-                             'r-o', linewidth=2, markersize=4, label='Temperature')
-        self.ax1.tick_params(axis='y', labelcolor='red')
-        self.ax1.set_ylim(0, 35)
-        self.ax1.grid(True, alpha=0.3)
-        
-        line2 = self.ax2.plot(list(self.index_data), list(self.hum_data), 
-                             'b-o', linewidth=2, markersize=4, label='Humidity')
-        self.ax2.tick_params(axis='y', labelcolor='blue')
-        self.ax2.set_ylim(0, 100)
-        
-        self.ax1.set_xticks([])
-        
-        lines = line1 + line2
-        labels = [l.get_label() for l in lines]
-        self.ax1.legend(lines, labels, loc='upper left', fontsize=9)
+        if self.use_blit and self._background is not None:
+            self.restore_region(self._background)
+            self._draw_lines()
+            self.blit(self.fig.bbox)
+        else:
+            self.draw()
+
+
+class UiUpdateScheduler(QtCore.QObject):
+    """UI 변경을 dirty 집합에 모았다가 GUI 스레드에서 초당 최대 max_fps회 적용
+
+    같은 key로 여러 번 표시되면 마지막 변경만 적용되므로
+    이벤트가 몰려도 다시 그리는 횟수는 max_fps를 넘지 않는다.
+    """
+    
+    def __init__(self, max_fps=10, parent=None):
+        super().__init__(parent)
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self.marked_count = 0
+        self.applied_count = 0
         
-        self.fig.tight_layout()
-        self.draw()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(max(1, int(1000 / max_fps)))
+        self._timer.timeout.connect(self.flush)
+    
+    def start(self):
+        self._timer.start()
+    
+    def stop(self):
+        self._timer.stop()
+    
+    def mark_dirty(self, key, apply):
+        """key에 대한 변경 등록 (어느 스레드에서나 호출 가능)"""
+        with self._lock:
+            # 다시 표시된 key는 뒤로 옮겨 적용 순서가 마지막 변경 순서를 따르게 함
+            self._dirty.pop(key, None)
+            self._dirty[key] = apply
+            self.marked_count += 1
+    
+    def flush(self):
+        """등록된 변경을 한 번씩 적용 (GUI 스레드)"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        for key, apply in dirty.items():
+            try:
+                apply()
+            except Exception as e:
+                print(f"[ERROR] UI 업데이트 실패 {key}: {e}")
+        self.applied_count += len(dirty)
 
 
 class DisplayManager:
     """데이터 파서 및 디스플레이 매니저"""
     
-    def __init__(self, lcd_temp, lcd_hum, graph_canvas):
+    def __init__(self, lcd_temp, lcd_hum, graph_canvas, scheduler=None):
         self.lcd_temp = lcd_temp
         self.lcd_hum = lcd_hum
         self.graph_canvas = graph_canvas
+        self.scheduler = scheduler
         self.latest_temp = None
         self.latest_hum = None
     
+    def _schedule(self, key, apply):
+        if self.scheduler:
+            self.scheduler.mark_dirty(key, apply)
+        else:
+            apply()
+    
     def update_display(self, data):
-        """시리얼 데이터를 파싱하여 LCD와 그래프 업데이트"""
+        """시리얼 데이터를 파싱하여 LCD와 그래프 업데이트 예약"""
         try:
             print("[DEBUG] update_display: " + data)
             if data.startswith("SEN"):
@@ -95,14 +189,17 @@ class DisplayManager:
                 if len(parts) >= 3:
                     if parts[1] == "TEM":
                         self.latest_temp = int(parts[2])
-                        self.lcd_temp.display(self.latest_temp)
+                        value = self.latest_temp
+                        self._schedule('lcd_temp', lambda: self.lcd_temp.display(value))
                     elif parts[1] == "HUM":
                         self.latest_hum = int(parts[2])
-                        self.lcd_hum.display(self.latest_hum)
+                        value = self.latest_hum
+                        self._schedule('lcd_hum', lambda: self.lcd_hum.display(value))
 
-                # 그래프는 temp와 hum 둘 다 있으면 업데이트
+                # 그래프는 temp와 hum 둘 다 있으면 샘플 추가 (그리기는 묶어서)
                 if self.latest_temp is not None and self.latest_hum is not None:
-                    self.graph_canvas.update_graph(self.latest_temp, self.latest_hum)
+                    self.graph_canvas.push_sample(self.latest_temp, self.latest_hum)
+                    self._schedule('graph', self.graph_canvas.flush_samples)
         except Exception as e:
             print(f"[ERROR] update_display: {e}")
 
@@ -111,7 +208,12 @@ class Ui_Dialog(object):
 
     def __init__(self):
         self.api_url = "http://localhost:5000"
-        self.polling_interval = 0.05
+        self.polling_interval = 0.05  # 이벤트 스트림을 못 쓸 때만 폴링
+        self.stream_retry_interval = 5.0  # 폴링 후 스트림 재연결까지 (초)
+        self._event_response = None
+        self.max_ui_fps = 10  # UI 갱신 최대 횟수 (초당)
+        self.command_timeout = 10.0  # 명령 ACK 대기 시간 (초)
+        self.elevator_call_timeout = 60.0  # 호출 ACK는 도착 시에 옴
         self.polling_thread = None
         self.running = True
         
@@ -173,6 +275,12 @@ class Ui_Dialog(object):
         self.label_ele_1f = QtWidgets.QLabel(parent=self.groupBox_ele)
         self.label_ele_1f.setGeometry(QtCore.QRect(190, 200, 16, 18))
         self.label_ele_1f.setObjectName("label_ele_1f")
+        self.label_cmd_rtt = QtWidgets.QLabel(parent=dialog)
+        self.label_cmd_rtt.setGeometry(QtCore.QRect(40, 495, 341, 18))
+        self.label_cmd_rtt.setObjectName("label_cmd_rtt")
+        self.pushButton_history = QtWidgets.QPushButton(parent=dialog)
+        self.pushButton_history.setGeometry(QtCore.QRect(40, 525, 151, 30))
+        self.pushButton_history.setObjectName("pushButton_history")
         self.line = QtWidgets.QFrame(parent=self.groupBox_ele)
         self.line.setGeometry(QtCore.QRect(150, 40, 20, 211))
         self.line.setFrameShape(QtWidgets.QFrame.Shape.VLine)
@@ -261,11 +369,16 @@ class Ui_Dialog(object):
         layout.addWidget(self.graph_canvas)
         self.widget_graph.setLayout(layout)
         
+        # UI 갱신 스케줄러 (폴링 스레드의 변경을 묶어서 GUI 스레드에서 적용)
+        self.ui_scheduler = UiUpdateScheduler(self.max_ui_fps, parent=dialog)
+        self.ui_scheduler.start()
+        
         # 디스플레이 매니저 생성
         self.display_manager = DisplayManager(
             self.lcdNumber_temp,
             self.lcdNumber_hu,
-            self.graph_canvas
+            self.graph_canvas,
+            self.ui_scheduler
         )
 
         # 버튼 클릭 이벤트 연결
@@ -280,6 +393,30 @@ class Ui_Dialog(object):
         self.pushButton_curClose.clicked.connect(self.curtain_close)
         self.pushButton_curStop.clicked.connect(self.curtain_stop)
         self.pushButton_curAuto.clicked.connect(self.curtain_enable_auto)
+        self.pushButton_history.clicked.connect(self.open_history)
+        self.history_panel = None
+        
+        # 명령 전송 클라이언트 (버튼 클릭이 GUI 스레드를 막지 않도록)
+        self.command_client = CommandClient(self.api_url, parent=dialog)
+        self.command_buttons = {
+            'entrance': self.pushButton_e,
+            'elevator_1f': self.pushButton_1f,
+            'elevator_2f': self.pushButton_2f,
+            'elevator_3f': self.pushButton_3f,
+            'air': self.pushButton_air,
+            'heat': self.pushButton_heat,
+            'humi': self.pushButton_humi,
+            'curtain_open': self.pushButton_curOpen,
+            'curtain_close': self.pushButton_curClose,
+            'curtain_stop': self.pushButton_curStop,
+            'curtain_auto': self.pushButton_curAuto,
+        }
+        self.command_client.busy_changed.connect(self._on_command_busy)
+        
+        # ACK 대기 중인 명령 (화면에는 먼저 반영, ACK/타임아웃으로 확정/되돌림)
+        self.pending_commands = PendingCommands(self.command_client, parent=dialog)
+        self.pending_commands.confirmed.connect(self._on_command_confirmed)
+        self.pending_commands.rolled_back.connect(self._on_command_rolled_back)
         self.progressBar_cur.setRange(0, 100)
 
         # 커튼 상태 관리
@@ -323,314 +460,157 @@ class Ui_Dialog(object):
         self.pushButton_curAuto.setText(_translate("Dialog", "커튼 Auto 복귀"))
         self.label_5.setText(_translate("Dialog", "커튼 열림 정도"))
         self.label_curState.setText(_translate("Dialog", " "))
+        self.pushButton_history.setText(_translate("Dialog", "센서 이력"))
+
+    def open_history(self):
+        """센서 이력 패널 열기 (장기간 온도/습도/조도)"""
+        if self.history_panel is None:
+            self.history_panel = HistoryPanel(self.api_url)
+            self.history_panel.show_last(24 * 3600)
+        self.history_panel.show()
+        self.history_panel.raise_()
+
+    def _send_command(self, key, device_id, metric_name, value, apply=None, rollback=None,
+                      on_confirm=None, expect_ack=True, timeout=None):
+        """명령을 비동기로 전송하고 결과를 기다리지 않고 바로 화면에 반영
+
+        apply는 즉시 호출되고, 전송 실패 시 또는 ACK 없이 타임아웃되면 rollback이 호출된다.
+        ACK를 보내지 않는 장치 명령은 expect_ack=False (전송 실패 시에만 되돌림).
+        """
+        if self.command_client.is_busy(key):
+            return False
+        started_at = time.monotonic()
+
+        def on_done(result, error):
+            if error:
+                if rollback:
+                    rollback()
+                self.label_cmd_rtt.setText(f"명령 실패: {key}")
+            elif expect_ack and result.get('request_id'):
+                self.pending_commands.add(key, result['request_id'], rollback or (lambda: None),
+                                          on_confirm, timeout or self.command_timeout, started_at)
+
+        if not self.command_client.send(key, device_id, metric_name, value, on_done, timeout):
+            return False
+        if apply:
+            apply()
+        return True
+
+    def _on_command_busy(self, key, busy):
+        """요청 처리 중에는 해당 버튼 비활성화"""
+        button = self.command_buttons.get(key)
+        if button is not None:
+            button.setEnabled(not busy)
+
+    def _on_command_confirmed(self, key, rtt):
+        """ACK 확인 - 클릭부터 ACK까지 걸린 시간 표시"""
+        self.label_cmd_rtt.setText(f"응답 확인: {key} ({rtt * 1000:.0f}ms)")
+
+    def _on_command_rolled_back(self, key, status):
+        self.label_cmd_rtt.setText(f"응답 없음: {key} ({status})")
 
     def entrance_open(self):
         """출입문 열기"""
-        try:
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'ent_001',
-                    'metric_name': 'MOTOR',
-                    'value': '1'
-                },
-                timeout=5
-            )
-
-            if response.json().get('success'):
-                self.label_e_approv.setText("✅")
-            else:
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._send_command('entrance', 'ent_001', 'MOTOR', '1',
+                           apply=lambda: self.label_e_approv.setText("✅"),
+                           rollback=lambda: self.label_e_approv.setText(" "),
+                           expect_ack=False)
+
+    def _elevator_call(self, floor, label):
+        """엘리베이터 호출 (이미 호출된 층이면 취소)
+
+        호출의 ACK,FLOOR,n은 도착 시에 오므로 확인되면 표시를 지운다.
+        """
+        key = f'elevator_{floor}f'
+        if label.text() == "✅":
+            self._send_command(key, 'ele_001', 'CANCEL', floor,
+                               apply=lambda: label.setText(" "),
+                               rollback=lambda: label.setText("✅"))
+        else:
+            self._send_command(key, 'ele_001', 'FLOOR', floor,
+                               apply=lambda: label.setText("✅"),
+                               rollback=lambda: label.setText(" "),
+                               on_confirm=lambda: label.setText(" "),
+                               timeout=self.elevator_call_timeout)
 
     def elevator_1f_call(self):
         """엘리베이터 1층 호출"""
-        try:
-            if self.label_ele_1f.text() == "✅":
-                response = requests.post(
-                    f"{self.api_url}/api/command",
-                    json={
-                        'device_id': 'ele_001',
-                        'metric_name': 'CANCEL',
-                        'value': '1'
-                    },
-                    timeout=5
-                )
-                if response.json().get('success'):
-                    self.label_ele_1f.setText(" ")
-                else:
-                    print(f"[ERROR] {response.json().get('error')}")
-            else:
-                response = requests.post(
-                    f"{self.api_url}/api/command",
-                    json={
-                        'device_id': 'ele_001',
-                        'metric_name': 'FLOOR',
-                        'value': '1'
-                    },
-                    timeout=5
-                )
-                if response.json().get('success'):
-                    self.label_ele_1f.setText("✅")
-                else:
-                    print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._elevator_call('1', self.label_ele_1f)
 
     def elevator_2f_call(self):
         """엘리베이터 2층 호출"""
-        try:
-            if self.label_ele_2f.text() == "✅":
-                response = requests.post(
-                    f"{self.api_url}/api/command",
-                    json={
-                        'device_id': 'ele_001',
-                        'metric_name': 'CANCEL',
-                        'value': '2'
-                    },
-                    timeout=5
-                )
-                if response.json().get('success'):
-                    self.label_ele_2f.setText(" ")
-                else:
-                    print(f"[ERROR] {response.json().get('error')}")
-            else:
-                response = requests.post(
-                    f"{self.api_url}/api/command",
-                    json={
-                        'device_id': 'ele_001',
-                        'metric_name': 'FLOOR',
-                        'value': '2'
-                    },
-                    timeout=5
-                )
-                if response.json().get('success'):
-                    self.label_ele_2f.setText("✅")
-                else:
-                    print(f"[ERROR] {response.json().get('error')}")
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._elevator_call('2', self.label_ele_2f)
 
     def elevator_3f_call(self):
         """엘리베이터 3층 호출"""
-        try:
-            if self.label_ele_3f.text() == "✅":
-                response = requests.post(
-                    f"{self.api_url}/api/command",
-                    json={
-                        'device_id': 'ele_001',
-                        'metric_name': 'CANCEL',
-                        'value': '3'
-                    },
-                    timeout=5
-                )
-                if response.json().get('success'):
-                    self.label_ele_3f.setText("")
-                else:
-                    print(f"[ERROR] {response.json().get('error')}")
-            else:
-                response = requests.post(
-                    f"{self.api_url}/api/command",
-                    json={
-                        'device_id': 'ele_001',
-                        'metric_name': 'FLOOR',
-                        'value': '3'
-                    },
-                    timeout=5
-                )
-                if response.json().get('success'):
-                    self.label_ele_3f.setText("✅")
-                else:
-                    print(f"[ERROR] {response.json().get('error')}")
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._elevator_call('3', self.label_ele_3f)
+
+    @staticmethod
+    def _next_mode(state):
+        """ON → OFF → Auto 순환: (다음 상태, 전송 값)"""
+        if state == 0:
+            return 1, '1'
+        if state == 1:
+            return 2, '0'
+        return 0, '-1'
+
+    def _control_home(self, key, metric_name, state_attr, label):
+        """에어컨/히터/가습기 모드 전환"""
+        texts = {0: "Auto", 1: "ON", 2: "OFF"}
+        previous = getattr(self, state_attr)
+        state, value = self._next_mode(previous)
+
+        def set_state(new_state):
+            setattr(self, state_attr, new_state)
+            label.setText(texts[new_state])
+
+        self._send_command(key, 'dht_001', metric_name, value,
+                           apply=lambda: set_state(state),
+                           rollback=lambda: set_state(previous))
 
     def control_air(self):
         """에어컨 제어 (ON/OFF/Auto)"""
-        try:
-            if self.air_state == 0:
-                value = '1'
-                self.air_state = 1
-                self.label_airState.setText("ON")
-
-            elif self.air_state == 1:
-                value = '0'
-                self.air_state = 2
-                self.label_airState.setText("OFF")
-            else:
-                value = '-1'
-                self.air_state = 0
-                self.label_airState.setText("Auto")
-            
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'dht_001',
-                    'metric_name': 'AIR',
-                    'value': value
-                },
-                timeout=5
-            )
-
-            if not response.json().get('success'):
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._control_home('air', 'AIR', 'air_state', self.label_airState)
 
     def control_heat(self):
         """히터 제어 (ON/OFF/Auto)"""
-        try:
-            if self.heat_state == 0:
-                value = '1'
-                self.heat_state = 1
-                self.label_heatState.setText("ON")
-            elif self.heat_state == 1:
-                value = '0'
-                self.heat_state = 2
-                self.label_heatState.setText("OFF")
-            else:
-                value = '-1'
-                self.heat_state = 0
-                self.label_heatState.setText("Auto")
-            
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'dht_001',
-                    'metric_name': 'HEAT',
-                    'value': value
-                },
-                timeout=5
-            )
-
-            if not response.json().get('success'):
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._control_home('heat', 'HEAT', 'heat_state', self.label_heatState)
 
     def control_hum(self):
         """가습기 제어 (ON/OFF/Auto)"""
-        try:
-            if self.hum_state == 0:
-                value = '1'
-                self.hum_state = 1
-                self.label_humiState.setText("ON")
-            elif self.hum_state == 1:
-                value = '0'
-                self.hum_state = 2
-                self.label_humiState.setText("OFF")
-            else:
-                value = '-1'
-                self.hum_state = 0
-                self.label_humiState.setText("Auto")
-            
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'dht_001',
-                    'metric_name': 'HUMI',
-                    'value': value
-                },
-                timeout=5
-            )
-
-            if not response.json().get('success'):
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._control_home('humi', 'HUMI', 'hum_state', self.label_humiState)
 
-    def curtain_open(self):
-        """커튼 열기"""
-        try:
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'cur_001',
-                    'metric_name': 'MOTOR',
-                    'value': 'OPEN'
-                },
-                timeout=5
-            )
-
-            if response.json().get('success'):
+    def _curtain_command(self, key, metric_name, value, manual, expect_ack=True):
+        """커튼 명령 - 요청 표시는 즉시, 실패하면 이전 모드/메시지로 복원"""
+        previous = (self.curtain_auto_mode, self.curtain_status_message)
+
+        def apply():
+            if manual:
                 self._mark_manual_mode_requested()
-                self._set_curtain_status_message("요청:OPEN")
-            else:
-                print(f"[ERROR] {response.json().get('error')}")
+            self._set_curtain_status_message(f"요청:{value}")
+
+        def rollback():
+            self.curtain_auto_mode = previous[0]
+            self._set_curtain_status_message(previous[1])
+
+        self._send_command(key, 'cur_001', metric_name, value,
+                           apply=apply, rollback=rollback, expect_ack=expect_ack)
 
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+    def curtain_open(self):
+        """커튼 열기"""
+        self._curtain_command('curtain_open', 'MOTOR', 'OPEN', manual=True)
 
     def curtain_close(self):
         """커튼 닫기"""
-        try:
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'cur_001',
-                    'metric_name': 'MOTOR',
-                    'value': 'CLOSE'
-                },
-                timeout=5
-            )
-
-            if response.json().get('success'):
-                self._mark_manual_mode_requested()
-                self._set_curtain_status_message("요청:CLOSE")
-            else:
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._curtain_command('curtain_close', 'MOTOR', 'CLOSE', manual=True)
 
     def curtain_stop(self):
         """커튼 정지"""
-        try:
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'cur_001',
-                    'metric_name': 'MOTOR',
-                    'value': 'STOP'
-                },
-                timeout=5
-            )
-
-            if response.json().get('success'):
-                self._mark_manual_mode_requested()
-                self._set_curtain_status_message("요청:STOP")
-            else:
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        self._curtain_command('curtain_stop', 'MOTOR', 'STOP', manual=True)
 
     def curtain_enable_auto(self):
-        """커튼 AUTO 모드 활성화"""
-        try:
-            response = requests.post(
-                f"{self.api_url}/api/command",
-                json={
-                    'device_id': 'cur_001',
-                    'metric_name': 'MODE',
-                    'value': 'AUTO'
-                },
-                timeout=5
-            )
-
-            if response.json().get('success'):
-                self._set_curtain_status_message("요청:AUTO")
-            else:
-                print(f"[ERROR] {response.json().get('error')}")
-
-        except requests.RequestException as e:
-            print(f"[ERROR] 명령 전송 실패: {e}")
+        """커튼 AUTO 모드 활성화 (펌웨어가 MODE에는 ACK를 보내지 않음)"""
+        self._curtain_command('curtain_auto', 'MODE', 'AUTO', manual=False, expect_ack=False)
 
     def _handle_curtain_direction(self, value):
         """커튼 방향 처리"""
@@ -685,7 +665,10 @@ class Ui_Dialog(object):
             self.curtain_auto_mode = False
 
     def handle_serial_data(self, state: dict):
-        """상태에 따라 UI 업데이트"""
+        """상태에 따라 UI 업데이트 예약 (폴링 스레드에서 호출)
+
+        위젯은 GUI 스레드의 ui_scheduler가 초당 max_ui_fps회까지만 갱신한다.
+        """
         if not state:
             return
         device_id = state.get('device_id')
@@ -694,16 +677,22 @@ class Ui_Dialog(object):
         value = state.get('value', '')
         
         # 그래프와 LCD 업데이트용 데이터 생성
-        if data_type == "SEN":
-            if device_id[:3] == "dht":
-                if metric_name == 'HUM':
-                    serial_data = f"SEN,{metric_name},{value}"
-                    self.display_manager.update_display(serial_data)
-                
-                elif metric_name == 'TEM':
-                    serial_data = f"SEN,{metric_name},{value}"
-                    self.display_manager.update_display(serial_data)
+        if data_type == "SEN" and device_id[:3] == "dht":
+            if metric_name in ('HUM', 'TEM'):
+                serial_data = f"SEN,{metric_name},{value}"
+                self.display_manager.update_display(serial_data)
+            return
+
+        # SEN은 같은 메트릭의 마지막 값만, ACK는 층별로 각각 적용
+        key = (device_id, data_type, metric_name)
+        if data_type == "ACK":
+            key += (value,)
+        self.ui_scheduler.mark_dirty(
+            key, lambda: self._apply_state(device_id, data_type, metric_name, value))
 
+    def _apply_state(self, device_id, data_type, metric_name, value):
+        """상태를 위젯에 반영 (GUI 스레드)"""
+        if data_type == "SEN":
             if device_id[:3] == "ent":
                 if metric_name == 'RFID_ACCESS':
                     self.le_e_id.setText(str(value))
@@ -750,24 +739,77 @@ class Ui_Dialog(object):
                         self.label_ele_3f.setText(" ")
 
     def start_polling(self):
-        """상태 폴링 시작"""
+        """상태 수신 시작 (이벤트 스트림, 실패 시 폴링)"""
         self.polling_thread = threading.Thread(
-            target=self._poll_state,
+            target=self._receive_state,
             daemon=True
         )
         self.polling_thread.start()
 
     def stop_polling(self):
-        """상태 폴링 중지"""
+        """상태 수신 중지"""
         self.running = False
+        if self._event_response is not None:
+            self._event_response.close()
         if self.polling_thread:
             self.polling_thread.join(timeout=2)
 
-    def _poll_state(self):
-        """주기적으로 서버에서 상태 조회"""
+    def _receive_state(self):
+        """/api/events 스트림으로 상태 수신
+
+        스트림을 쓸 수 없으면 stream_retry_interval 동안 /api/state를 폴링한 뒤 다시 연결한다.
+        """
+        session = requests.Session()
         while self.running:
             try:
-                response = requests.get(
+                self._read_event_stream(session)
+            except Exception as e:
+                # stop_polling이 응답을 닫은 경우도 여기로 옴
+                if self.running:
+                    print(f"[ERROR] 이벤트 스트림 끊김: {e}")
+            if self.running:
+                self._poll_state(session, time.time() + self.stream_retry_interval)
+        session.close()
+
+    def _read_event_stream(self, session):
+        """SSE 이벤트를 읽어 state는 화면에, command는 대기 중인 명령에 반영"""
+        response = session.get(
+            f"{self.api_url}/api/events",
+            stream=True,
+            timeout=(2, 60)  # 서버가 15초마다 ping을 보냄
+        )
+        response.raise_for_status()
+        self._event_response = response
+        try:
+            event, data = 'message', []
+            for line in response.iter_lines(decode_unicode=True):
+                if not self.running:
+                    break
+                if line:
+                    field, _, content = line.partition(': ')
+                    if field == 'event':
+                        event = content
+                    elif field == 'data':
+                        data.append(content)
+                    continue
+
+                # 빈 줄 = 이벤트 끝
+                if data:
+                    payload = json.loads('\n'.join(data))
+                    if event == 'state':
+                        self.handle_serial_data(payload)
+                    elif event == 'command':
+                        self.pending_commands.handle_result(payload)
+                event, data = 'message', []
+        finally:
+            self._event_response = None
+            response.close()
+
+    def _poll_state(self, session, until):
+        """until까지 주기적으로 서버에서 상태 조회"""
+        while self.running and time.time() < until:
+            try:
+                response = session.get(
                     f"{self.api_url}/api/state",
                     timeout=2
                 )
@@ -781,7 +823,6 @@ class Ui_Dialog(object):
 
             time.sleep(self.polling_interval)
 
-
 def main():
     """메인 함수"""
     app = QtWidgets.QApplication(sys.argv)
@@ -795,6 +836,10 @@ def main():
         sys.exit(app.exec())
     finally:
         ui.stop_polling()
+        ui.ui_scheduler.stop()
+        ui.command_client.close()
+        if ui.history_panel:
+            ui.history_panel.shutdown()
 
 
 if __name__ == "__main__":
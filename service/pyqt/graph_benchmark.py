@@ -0,0 +1,70 @@
+"""대시보드 온습도 그래프 프레임 시간 벤치마크 (오프스크린)
+
+사용법:
+    python graph_benchmark.py [--seconds 3]
+
+1, 10, 100 updates/sec로 GraphCanvas.update_graph를 호출하며
+blit 모드와 전체 다시 그리기(draw) 모드의 프레임 시간을 비교한다.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtCore, QtWidgets
+
+from dashboard import GraphCanvas
+
+
+def run(app, canvas, rate, seconds):
+    """rate(회/초)로 seconds 동안 갱신하고 프레임 시간(ms) 목록 반환"""
+    frames = []
+    count = max(5, int(rate * seconds))
+    timer = QtCore.QTimer()
+    timer.setInterval(int(1000 / rate))
+
+    def tick():
+        i = len(frames)
+        start = time.perf_counter()
+        canvas.update_graph(22 + (i % 7) * 0.5, 45 + (i % 11))
+        frames.append((time.perf_counter() - start) * 1000)
+        if len(frames) >= count:
+            timer.stop()
+            app.quit()
+
+    timer.timeout.connect(tick)
+    timer.start()
+    app.exec()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    print(f"{'mode':<8}{'rate':>6}{'frames':>8}{'mean ms':>10}{'p95 ms':>10}{'cpu %':>8}")
+    for use_blit in (True, False):
+        for rate in (1, 10, 100):
+            canvas = GraphCanvas(use_blit=use_blit)
+            canvas.resize(521, 201)
+            canvas.show()
+            app.processEvents()
+
+            frames = run(app, canvas, rate, args.seconds)
+            mean = statistics.mean(frames)
+            p95 = sorted(frames)[int(len(frames) * 0.95) - 1]
+            # 초당 rate 프레임을 그리는 데 쓰는 시간 비율 (100% 이상이면 따라가지 못함)
+            cpu = mean * rate / 10
+            mode = "blit" if use_blit else "draw"
+            print(f"{mode:<8}{rate:>6}{len(frames):>8}{mean:>10.2f}{p95:>10.2f}{cpu:>8.1f}")
+            canvas.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""센서 이력 패널 - 보이는 시간 구간만 화면 해상도만큼 요청"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from PyQt6 import QtCore, QtWidgets
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+# (표시 이름, device_id, metric_name)
+DEFAULT_SERIES = [
+    ("온도", "dht_001", "TEM"),
+    ("습도", "dht_001", "HUM"),
+    ("조도", "cur_001", "LIGHT"),
+]
+
+# (버튼 이름, 구간 길이(초))
+RANGES = [
+    ("1시간", 3600),
+    ("1일", 24 * 3600),
+    ("7일", 7 * 24 * 3600),
+    ("30일", 30 * 24 * 3600),
+]
+
+
+def format_time(x, _pos=None):
+    """epoch 초 → 축 라벨"""
+    try:
+        return datetime.fromtimestamp(x).strftime('%m-%d\n%H:%M:%S')
+    except (ValueError, OverflowError, OSError):
+        return ''
+
+
+class HistoryPanel(QtWidgets.QWidget):
+    """이동/확대할 때마다 보이는 구간을 /api/history로 다시 요청하는 이력 그래프
+
+    요청 점 개수는 그래프 폭(픽셀)과 같으므로 구간이 1시간이든 30일이든
+    응답 크기가 일정하다. 연속 이동/확대는 debounce_ms 동안 모아 한 번만 요청하고,
+    늦게 도착한 이전 요청의 응답은 버린다.
+    """
+
+    data_received = QtCore.pyqtSignal(int, object)
+
+    def __init__(self, api_url, series=None, method='lttb', debounce_ms=250, parent=None):
+        super().__init__(parent)
+        self.api_url = api_url
+        self.series = series or DEFAULT_SERIES
+        self.method = method
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history")
+        self.generation = 0
+        self.fetch_count = 0
+
+        self.setWindowTitle("센서 이력")
+        self.resize(900, 480)
+        self._setup_ui()
+
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.fetch_visible)
+        self.data_received.connect(self._on_data)
+
+    def _setup_ui(self):
+        layout = QtWidgets.QVBoxLayout(self)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.combo_series = QtWidgets.QComboBox()
+        for name, device_id, metric_name in self.series:
+            self.combo_series.addItem(f"{name} ({device_id})")
+        self.combo_series.currentIndexChanged.connect(lambda _: self.fetch_visible())
+        controls.addWidget(self.combo_series)
+
+        for name, seconds in RANGES:
+            button = QtWidgets.QPushButton(name)
+            button.clicked.connect(lambda _, s=seconds: self.show_last(s))
+            controls.addWidget(button)
+        controls.addStretch()
+
+        self.label_status = QtWidgets.QLabel(" ")
+        controls.addWidget(self.label_status)
+        layout.addLayout(controls)
+
+        self.figure = Figure(figsize=(9, 4))
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.grid(True, alpha=0.3)
+        self.ax.xaxis.set_major_formatter(FuncFormatter(format_time))
+        self.line, = self.ax.plot([], [], linewidth=1)
+        self.ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+        layout.addWidget(NavigationToolbar(self.canvas, self))
+        layout.addWidget(self.canvas)
+
+    def show_last(self, seconds):
+        """최근 seconds초 구간 표시 (xlim 변경으로 다시 요청됨)"""
+        now = time.time()
+        self.ax.set_xlim(now - seconds, now)
+        self.canvas.draw_idle()
+
+    def _on_xlim_changed(self, _ax):
+        self._debounce.start()
+
+    def fetch_visible(self):
+        """현재 보이는 구간을 그래프 폭만큼의 점으로 요청"""
+        self._debounce.stop()
+        start, end = self.ax.get_xlim()
+        points = max(2, int(self.ax.bbox.width))
+        _name, device_id, metric_name = self.series[self.combo_series.currentIndex()]
+
+        self.generation += 1
+        self.fetch_count += 1
+        params = {
+            'device_id': device_id,
+            'metric_name': metric_name,
+            'start': start,
+            'end': end,
+            'points': points,
+            'method': self.method,
+        }
+        self.executor.submit(self._fetch, self.generation, params)
+
+    def _fetch(self, generation, params):
+        """작업 스레드: /api/history 요청"""
+        try:
+            response = self.session.get(f"{self.api_url}/api/history", params=params, timeout=10)
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            data = {'success': False, 'error': str(e)}
+        self.data_received.emit(generation, data)
+
+    def _on_data(self, generation, data):
+        """GUI 스레드: 최신 요청의 응답만 반영"""
+        if generation != self.generation:
+            return
+        if not data.get('success'):
+            self.label_status.setText(f"조회 실패: {data.get('error')}")
+            return
+
+        timestamps, values = data['timestamps'], data['values']
+        self.line.set_data(timestamps, values)
+        if values:
+            low, high = min(values), max(values)
+            margin = (high - low) * 0.05 or 1.0
+            # y축만 조정 (xlim은 사용자가 보고 있는 구간 유지)
+            self.ax.set_ylim(low - margin, high + margin)
+        self.label_status.setText(
+            f"{len(values)} / {data.get('total', len(values))}점 ({data.get('source', '')})")
+        self.canvas.draw_idle()
+
+    def shutdown(self):
+        """작업 스레드와 세션 정리"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+def main():
+    app = QtWidgets.QApplication(sys.argv)
+    panel = HistoryPanel(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:5000")
+    panel.show()
+    panel.show_last(24 * 3600)
+    try:
+        sys.exit(app.exec())
+    finally:
+        panel.shutdown()
+
+
+if __name__ == "__main__":
+    main()